@@ -1,442 +1,135 @@
-import streamlit as st
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
-import requests
-from bs4 import BeautifulSoup
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
-import json
+import os
 import time
-import yfinance as yf
-import cloudscraper
 
-# 크기 조정 상수
-SCALE = 0.75
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+
+# plotly / bs4 는 시작 시간을 줄이기 위해 사용하는 함수 안에서 import
+
+from charts import (
+    CORRELATION_MAX_TICKERS,
+    HEATMAP_GROUPED,
+    HEATMAP_MAX_ROWS,
+    HEATMAP_MODES,
+    HEATMAP_TOP,
+    SCALE,
+    build_correlation_figure,
+    build_group_line_figure,
+    build_sector_grid_figure,
+    build_team_return_figure,
+    heatmap_rows,
+    results_fingerprint,
+    show_figure,
+    sign_colors,
+)
+from engine import (
+    INTRADAY_INTERVALS, LABEL_COLUMNS, LivePoller, chart_history, format_age, load_universe,
+    patch_result_frame, result_frame, return_matrices, run_analysis, session_footprint,
+)
+from export import ARTIFACTS, FORMATS, MIME, ResultTables, as_float
+from history import FundamentalsHistory
+from table_index import TableIndex, page_slice
+from indices import REBALANCE, WEIGHTINGS, build_indices
+from risk import RISK_FIELDS, benchmark_close, risk_report
+from rolling import RollingStats
+from cache_registry import governed_cache_data, memory_report, purge, purge_ticker, registered
+from httpcache import http_stats
+from profiling import Profiler, available_tracers, section
+from resilience import breakers, flight, quarantine, swr_caches
+
+# 캐시 비우기 등 관리자 기능 (DASHBOARD_ADMIN=1 일 때만 표시)
+ADMIN_MODE = os.environ.get("DASHBOARD_ADMIN") == "1"
+
+# 구간별 소요 시간 측정 기본값 (DASHBOARD_PROFILE=1 이면 처음부터 켜짐)
+PROFILE_DEFAULT = os.environ.get("DASHBOARD_PROFILE") == "1"
+
+# 포트폴리오 표 페이지 크기 (현재 페이지의 행만 스타일을 적용해 전송)
+TABLE_PAGE_SIZES = [50, 100, 200, 500]
+
+# 내보내기 형식 (표시 이름 → export 형식)
+EXPORT_FORMATS = {"Parquet": "parquet", "Arrow IPC": "arrow"}
 
 # 페이지 설정
 st.set_page_config(page_title="투자 포트폴리오 대시보드", layout="wide")
 
 # 데이터 로드
-@st.cache_data
+@governed_cache_data(max_entries=1)
 def load_portfolio_data():
-    data = """팀,자산,섹터,기업명,티커
-청팀,기회자산,우주경제,Rocket Lab,RKLB
-청팀,기회자산,우주경제,Lockheed Martin,LMT
-청팀,기회자산,우주경제,Raytheon Technologies Corporation,RTX
-청팀,기회자산,우주경제,Boeing,BA
-청팀,기회자산,우주경제,Northrop Grumman,NOC
-청팀,기회자산,우주경제,AST SpaceMobile,ASTS
-청팀,기회자산,우주경제,Virgin Galactic,SPCE
-청팀,기회자산,우주경제,JOBY Aviation,JOBY
-청팀,기회자산,우주경제,Archer Aviation,ACHR
-청팀,기회자산,장수과학,Intellia Therapeutics,NTLA
-청팀,기회자산,장수과학,CRISPR Therapeutics,CRSP
-청팀,기회자산,장수과학,Recursion Pharmaceuticals,RXRX
-청팀,기회자산,장수과학,Beam Therapeutics,BEAM
-청팀,기회자산,장수과학,UniQure,QURE
-청팀,기회자산,장수과학,Tempus AI,TEM
-청팀,기회자산,장수과학,HIMS&HERS,HIMS
-청팀,기회자산,양자컴퓨터,IonQ,IONQ
-청팀,기회자산,양자컴퓨터,D-Wave Quantum,QBTS
-청팀,기회자산,양자컴퓨터,Rigetti Computing,RGTI
-청팀,기회자산,양자컴퓨터,IBM,IBM
-청팀,기회자산,양자컴퓨터,Quantum Computing,QUBT
-청팀,성장자산,미래에너지(SMR),NuScale Power,SMR
-청팀,성장자산,미래에너지(SMR),Oklo,OKLO
-청팀,성장자산,미래에너지(SMR),Nano Nuclear Energy,NNE
-청팀,성장자산,미래에너지(SMR),BWX Technologies,BWXT
-청팀,성장자산,미래에너지(SMR),Centrus Energy Corp.,LEU
-청팀,성장자산,미래에너지(SMR),Uranium Energy,UEC
-청팀,성장자산,미래에너지(SMR),Cameco (US-listed),CCJ
-청팀,기회자산,합성생물학,Ginkgo Bioworks,DNA
-청팀,기회자산,합성생물학,Twist Bioscience,TWST
-청팀,기회자산,합성생물학,10x Genomics,TXG
-청팀,기회자산,합성생물학,Appsella Biologics,ABCL
-청팀,기회자산,양자 암호,Arqit,ARQQ
-청팀,기회자산,양자 암호,SEALSQ,LAES
-청팀,기회자산,양자 암호,BTQ,BTQ
-청팀,기회자산,BCI,ClearPoint Neuro,CLPT
-청팀,기회자산,BCI,NeuroPace,NPCE
-청팀,기회자산,무선 전력 전송 플랫폼,Energous Corporation,WATT
-청팀,기회자산,대기 물 수,AirJoule Technologies Corporation,AIRJ
-청팀,성장자산,스테이블코인/핀테크,Coinbase,COIN
-청팀,성장자산,스테이블코인/핀테크,Robinhood,HOOD
-청팀,성장자산,스테이블코인/핀테크,Circle,CRCL
-청팀,성장자산,스테이블코인/핀테크,Block,XYZ
-청팀,성장자산,스테이블코인/핀테크,MicroStrategy,MSTR
-청팀,성장자산,스테이블코인/핀테크,Bitmine Immersion Technologies,BMNR
-백팀,성장자산,AI,Palantir,PLTR
-백팀,성장자산,AI,Salesforce,CRM
-백팀,성장자산,AI,Super Micro Computer,SMCI
-백팀,성장자산,AI,AppLovin,APP
-백팀,성장자산,AI,Datadog,DDOG
-백팀,성장자산,AI,Figma Inc.,FIG
-백팀,성장자산,AI,UiPath Inc.,PATH
-백팀,성장자산,AI,Symbotic Inc.,SYM
-백팀,성장자산,클라우드,Nebius Group,NBIS
-백팀,성장자산,클라우드,IREN Limited,IREN
-백팀,성장자산,클라우드,CoreWeave,CRWV
-백팀,성장자산,미래에너지(수소/암모니아),Bloom Energy,BE
-백팀,성장자산,미래에너지(수소/암모니아),Plug Power,PLUG
-백팀,성장자산,미래에너지(수소/암모니아),Air Products,APD
-백팀,성장자산,미래에너지(수소/암모니아),Linde,LIN
-백팀,성장자산,미래에너지(수소/암모니아),CF Industries,CF
-백팀,성장자산,미래에너지(수소/암모니아),Ballard Power Systems,BLDP
-백팀,성장자산,미래에너지(수소/암모니아),FuelCell Energy,FCEL
-백팀,성장자산,미래에너지(전고체배터리),QuantumScape,QS
-백팀,성장자산,미래에너지(전고체배터리),Solid Power,SLDP
-백팀,성장자산,미래에너지(ESS),Fluence Energy,FLNC
-백팀,성장자산,미래에너지(ESS),EnerSys,ENS
-백팀,성장자산,미래에너지(ESS),Eos Energy Enterprises,EOSE
-백팀,성장자산,미래에너지(ESS),Tesla (Energy),TSLA
-백팀,성장자산,미래에너지(ESS),Enphase Energy,ENPH
-백팀,성장자산,미래에너지(ESS),Eaton,ETN
-백팀,성장자산,미래에너지(재생에너지),Duke Energy,DUK
-백팀,성장자산,미래에너지(재생에너지),GE Vernova,GEV
-백팀,성장자산,미래에너지(재생에너지),NextEra Energy,NEE
-백팀,성장자산,미래에너지(재생에너지),AES Corporation,AES
-백팀,성장자산,미래에너지(재생에너지),Constellation Energy,CEG
-백팀,성장자산,미래에너지(재생에너지),Talen Energy Corporation,TLN
-백팀,성장자산,미래에너지(재생에너지),American Electric Power Company,AEP
-백팀,성장자산,미래에너지(재생에너지),Vistra Energy,VST
-백팀,성장자산,미래에너지(재생에너지),First Solar,FSLR
-백팀,성장자산,전통에너지,Exxon Mobil,XOM
-백팀,성장자산,전통에너지,Chevron,CVX
-백팀,성장자산,전통에너지,Marathon Petroleum,MPC
-백팀,성장자산,전통에너지,Shell plc,SHEL
-백팀,성장자산,전통에너지,ConocoPhillips,COP
-백팀,성장자산,전통에너지,Occidental Petroleum,OXY
-백팀,성장자산,전통에너지,Devon Energy,DVN
-백팀,성장자산,전통에너지,Valero Energy,VLO
-백팀,성장자산,전통에너지,Southern Company,SO
-백팀,성장자산,데이터 인프라(냉각),Vertiv,VRT
-백팀,성장자산,데이터 인프라(냉각),Carrier Global,CARR
-백팀,성장자산,데이터 인프라(냉각),Honeywell International,HON
-백팀,성장자산,데이터 인프라(냉각),Johnson Controls,JCI
-백팀,성장자산,데이터 인프라(네트워크),Arista Networks,ANET
-백팀,성장자산,데이터 인프라(네트워크),Credo,CRDO
-백팀,성장자산,데이터 인프라(네트워크),Astera Labs,ALAB
-백팀,성장자산,데이터 인프라(네트워크),Marvell Technology,MRVL
-백팀,성장자산,데이터 인프라(네트워크),Hewlett Packard Enterprise,HPE
-백팀,성장자산,데이터 인프라(네트워크),Cisco,CSCO
-백팀,성장자산,데이터 인프라(네트워크),Ciena,CIEN
-백팀,성장자산,데이터 인프라(로직반도체),NVIDIA,NVDA
-백팀,성장자산,데이터 인프라(로직반도체),Micron Technology,MU
-백팀,성장자산,데이터 인프라(로직반도체),AMD,AMD
-백팀,성장자산,데이터 인프라(로직반도체),Intel,INTC
-백팀,성장자산,데이터 인프라(로직반도체),Broadcom,AVGO
-백팀,성장자산,데이터 인프라(로직반도체),TSMC,TSM
-백팀,성장자산,데이터 인프라(로직반도체),Analog Devices,ADI
-백팀,성장자산,데이터 인프라(로직반도체),Wolfspeed,WOLF
-백팀,성장자산,데이터 인프라(로직반도체),Lam Research,LRCX
-백팀,성장자산,데이터 인프라(로직반도체),On Semiconductor,ON
-백팀,성장자산,데이터 인프라(로직반도체),Synopsys,SNPS
-백팀,성장자산,데이터 인프라(하이퍼스케일),Amazon (AWS),AMZN
-백팀,성장자산,데이터 인프라(하이퍼스케일),Microsoft (Azure),MSFT
-백팀,성장자산,데이터 인프라(하이퍼스케일),Alphabet (GCP),GOOGL
-백팀,성장자산,데이터 인프라(하이퍼스케일),Meta Platforms,META
-백팀,성장자산,데이터 인프라(하이퍼스케일),Apple,AAPL
-백팀,성장자산,데이터 인프라(하이퍼스케일),Oracle Cloud,ORCL
-백팀,성장자산,데이터 인프라(하이퍼스케일),Pure Storage,PSTG
-백팀,성장자산,데이터 인프라(리츠),Equinix,EQIX
-백팀,성장자산,데이터 인프라(리츠),Digital Realty,DLR
-백팀,성장자산,데이터 인프라(리츠),CyrusOne,CONE
-백팀,성장자산,데이터 인프라(리츠),Continental Building Co.,CONL
-백팀,성장자산,사이버보안,Palo Alto Networks,PANW
-백팀,성장자산,사이버보안,CrowdStrike,CRWD
-백팀,성장자산,사이버보안,Zscaler,ZS
-백팀,성장자산,필수소비재,Kenvue Inc.,KVUE
-백팀,성장자산,필수소비재,Procter & Gamble,PG
-백팀,성장자산,필수소비재,Coca-Cola,KO
-백팀,성장자산,필수소비재,PepsiCo,PEP
-백팀,성장자산,필수소비재,Walmart,WMT
-백팀,성장자산,필수소비재,Costco,COST
-백팀,성장자산,필수소비재,Colgate-Palmolive,CL
-백팀,성장자산,필수소비재,Kimberly-Clark,KMB
-백팀,성장자산,필수소비재,Target Corporation,TGT
-백팀,성장자산,필수소비재,Kraft Heinz Co,KHC
-백팀,성장자산,필수소비재,Philip Morris Intl,PM
-백팀,성장자산,필수소비재,Unilever PLC,UL
-백팀,성장자산,필수소비재,Altria Group Inc,MO
-백팀,성장자산,필수소비재,3M Company,MMM
-백팀,성장자산,결재시스템,Visa,V
-백팀,성장자산,결재시스템,Mastercard,MA
-백팀,성장자산,결재시스템,American Express,AXP
-백팀,성장자산,결재시스템,PayPal,PYPL
-백팀,성장자산,결재시스템,Block,XYZ
-백팀,성장자산,결재시스템,SoFi Technologies,SOFI
-백팀,성장자산,결재시스템,Toast Inc.,TOST
-백팀,성장자산,결재시스템,Affirm Holdings Inc.,AFRM
-백팀,성장자산,결재시스템,Global Payments Inc.,GPN
-백팀,성장자산,결재시스템,Zillow Group Inc.,Z
-백팀,성장자산,금융/자산운용,BlackRock,BLK
-백팀,성장자산,금융/자산운용,JPMorgan Chase,JPM
-백팀,성장자산,금융/자산운용,Morgan Stanley,MS
-백팀,성장자산,금융/자산운용,Goldman Sachs,GS
-백팀,성장자산,금융/자산운용,Bank of America,BAC
-백팀,성장자산,금융/자산운용,Citi Group,C
-백팀,성장자산,금융/자산운용,HSBC Holdings,HSBC
-백팀,성장자산,금융/자산운용,Blackstone Inc.,BX
-백팀,성장자산,금융/자산운용,CME Group Inc.,CME
-백팀,성장자산,금융/자산운용,Bank of New York Mellon,BK
-백팀,성장자산,금융/자산운용,Chubb Limited,CB
-백팀,성장자산,명품소비재,Ferrari N.V.,RACE
-백팀,성장자산,명품소비재,Williams-Sonoma Inc.,WSM
-백팀,성장자산,명품소비재,Tapestry,TPR
-백팀,성장자산,명품소비재,Estée Lauder,EL
-백팀,성장자산,명품소비재,Lululemon Athletica,LULU
-백팀,성장자산,명품소비재,Cullen/Frost Bankers,CFR
-백팀,성장자산,명품소비재,Old Republic Intl,OR
-백팀,성장자산,명품소비재,LVMH Moët Hennessy Louis Vuitton,MC
-백팀,성장자산,명품소비재,Brunswick Corporation,BC
-백팀,성장자산,명품소비재,LVMH Moët Hennessy Louis Vuitton,LVMUY
-백팀,성장자산,명품소비재,Ralph Lauren,RL
-백팀,성장자산,명품소비재,Capri Holdings*,CPRI
-백팀,성장자산,명품소비재,Canada Goose,GOOS
-백팀,성장자산,헬스케어,UnitedHealth,UNH
-백팀,성장자산,헬스케어,Natera,NTRA
-백팀,성장자산,헬스케어,Johnson & Johnson,JNJ
-백팀,성장자산,헬스케어,Thermo Fisher,TMO
-백팀,성장자산,헬스케어,Abbott Labs,ABT
-백팀,성장자산,헬스케어,Intuitive Surgical,ISRG
-백팀,성장자산,헬스케어,Pfizer,PFE
-백팀,성장자산,헬스케어,Merck & Co.,MRK
-백팀,성장자산,헬스케어,Moderna,MRNA
-백팀,성장자산,헬스케어,Eli Lilly,LLY
-백팀,성장자산,물&식량,Xylem,XYL
-백팀,성장자산,물&식량,Ecolab,ECL
-백팀,성장자산,물&식량,American Water Works,AWK
-백팀,성장자산,물&식량,DuPont,DD
-백팀,성장자산,물&식량,Nestlé,NSRGY"""
-
-    from io import StringIO
-    # df = pd.read_csv(StringIO(data))
-    df = pd.read_csv(
-        StringIO(data),
-        on_bad_lines='skip',  # Skip problematic rows
-        engine='python'       # Use Python engine (more forgiving)
-    )
-    return df
+    return load_universe()
+
+
+# 이동평균선이 포함된 상세 차트 데이터 (분석 기간 주가 재사용 + 부족한 앞쪽 구간만 조회)
+@governed_cache_data(ttl=3600, max_entries=50)
+def get_chart_history(ticker, interval, first_date, last_date, _price_data):
+    return chart_history(ticker, _price_data, interval)
+
+
+# 리스크 지표/상관계수 (분석 결과 지문 단위 캐시: 결과가 같으면 rerun 시 다시 계산하지 않음)
+@governed_cache_data(max_entries=10)
+def get_risk_report(fingerprint, start_date, end_date, _results):
+    return risk_report(return_matrices(_results)['close'], benchmark_close(start_date, end_date))
+
 
+# 팀/자산/섹터 지수 (분석 결과 지문 + 산출 방식 단위 캐시)
+@governed_cache_data(max_entries=16)
+def get_indices(fingerprint, weighting, rebalance, _results):
+    return build_indices(_results, WEIGHTINGS[weighting], REBALANCE[rebalance])
 
-@st.cache_data(ttl=86400)
-def get_finviz_metric(ticker: str, metric_name: str):
+
+def session_rolling_stats(results, fingerprint, window, rsi_period):
     """
-    Finviz 'snapshot-table2'에서 label 기반으로 재무지표 추출
-    예: metric_name = "Debt/Eq", "Current Ratio", "ROE", "Market Cap"
+    세션의 롤링 통계 (종목 전체 행렬)
+    구간 설정이 같으면 이전 계산을 이어서 사용하고, 결과가 바뀌었으면(새 봉/장중 갱신) 바뀐 행만 다시 계산
     """
-    try:
-        url = f"https://finviz.com/quote.ashx?t={ticker}"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
-        }
-        res = requests.get(url, headers=headers, timeout=20)
-        if res.status_code != 200:
-            print(f"[{ticker}] HTTP {res.status_code}")
-            return "-"
-
-        soup = BeautifulSoup(res.text, "html.parser")
-        table = soup.find("table", {"class": "snapshot-table2"})
-        if table is None:
-            print(f"[{ticker}] snapshot-table2 not found")
-            return "-"
-
-        cells = table.find_all("td")
-        for i in range(0, len(cells) - 1, 2):
-            label = cells[i].get_text(strip=True)
-            value = cells[i + 1].get_text(strip=True)
-            if label.lower() == metric_name.lower():
-                clean = value.split("*")[0].replace("%", "").replace(",", "")
-                try:
-                    return float(clean)
-                except ValueError:
-                    return clean
-        return "-"
-    except Exception as e:
-        print(f"[{ticker}] {metric_name} error: {e}")
-        return "-"
-
-@st.cache_data(ttl=86400)
-def get_market_cap(ticker: str):
+    stats = st.session_state.get('rolling_stats')
+    if stats is None or (stats.window, stats.rsi_period) != (window, rsi_period):
+        stats = RollingStats(return_matrices(results)['close'], window, rsi_period)
+    elif st.session_state.get('rolling_fingerprint') != fingerprint:
+        stats.update(return_matrices(results)['close'])
+    st.session_state['rolling_stats'] = stats
+    st.session_state['rolling_fingerprint'] = fingerprint
+    return stats
+
+
+def session_result_tables(results, fingerprint):
     """
-    Finviz에서 시가총액 가져오기
-    반환값: 문자열 (예: "150.5B", "1.2T") 또는 "-"
+    세션의 결과 테이블/수익률 행렬 (히트맵과 내보내기가 공유)
+    st.cache_data 는 반환값을 매번 복사(pickle)하므로 세션에 그대로 보관하고 결과가 바뀌었을 때만 다시 생성
     """
-    market_cap = get_finviz_metric(ticker, "Market Cap")
-    return market_cap if market_cap != "-" else "-"
-
-# Finviz API에서 재무제표 데이터 가져오기
-@st.cache_data(ttl=86400)
-def get_finviz_data(ticker, statement, item):
-    try:
-        statement_map = {"IS": "IQ", "BS": "BQ", "CF": "CQ"}
-        statement_map = {
-                      "ISQ": "IQ",  # Income Statement Quarterly
-                      "BSQ": "BQ",  # Balance Sheet Quarterly
-                      "CFQ": "CQ",  # Cash Flow Quarterly
-                      "ISA": "IA",  # Income Statement Annual
-                      "BSA": "BA",  # Balance Sheet Annual
-                      "CFA": "CA"   # Cash Flow Annual
-                    }
-        url = f"https://finviz.com/api/statement.ashx?t={ticker}&so=F&s={statement_map[statement]}"
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'application/json, text/javascript, */*; q=0.01',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Referer': f'https://finviz.com/quote.ashx?t={ticker}',
-            'X-Requested-With': 'XMLHttpRequest'
-        }
-        
-        session = requests.Session()
-        response = session.get(url, headers=headers, timeout=15)
-        
-        if response.status_code != 200:
-            print(f"[WARNING] {ticker} API HTTP {response.status_code}")
-            return None
-        
-        time.sleep(0.01)  # Rate limiting
-        
-        data = response.json()
-
-        if data and 'data' in data and item in data['data']:
-            values = data['data'][item]
-            if values and len(values) > 0:
-                value = values[0]
-                if value == '-' or value is None:
-                    return None
-                try:
-                    return float(value)
-                except:
-                    return None
-        
-        return None
-        
-    except requests.exceptions.Timeout:
-        print(f"[WARNING] {ticker} API Timeout")
-        return None
-    except Exception as e:
-        print(f"[WARNING] {ticker} API 조회 실패: {e}")
-        return None
-
-# 주가 데이터 가져오기 (Yahoo Finance Chart API - Google Apps Script 방식)
-@st.cache_data(ttl=3600)
-def get_stock_data(ticker, start_date, end_date):
-    if isinstance(start_date, str):
-        start_date = datetime.strptime(start_date, '%Y-%m-%d')
-    else:
-        start_date = datetime.combine(start_date, datetime.min.time())
+    tables = st.session_state.get('result_tables')
+    if tables is None or st.session_state.get('result_tables_fingerprint') != fingerprint:
+        tables = ResultTables(results)
+        st.session_state['result_tables'] = tables
+        st.session_state['result_tables_fingerprint'] = fingerprint
+    return tables
 
-    if isinstance(end_date, str):
-        end_date = datetime.strptime(end_date, '%Y-%m-%d')
-    else:
-        end_date = datetime.combine(end_date, datetime.min.time())
 
-    try:
-        start_timestamp = int(start_date.replace(hour=0, minute=0, second=0, microsecond=0).timestamp())
-        end_timestamp = int(end_date.replace(hour=23, minute=59, second=59, microsecond=999000).timestamp())
-
-        url = f"https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
-        params = {'period1': start_timestamp, 'period2': end_timestamp, 'interval': '1d'}
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-
-        response = requests.get(url, params=params, headers=headers, timeout=20)
-        if response.status_code != 200:
-            print(f"HTTP {response.status_code} for {ticker}")
-            return None
-
-        data = response.json()
-        if not data.get('chart') or not data['chart'].get('result') or len(data['chart']['result']) == 0:
-            print(f"Invalid API response for {ticker}")
-            return None
-
-        result = data['chart']['result'][0]
-        timestamps = result.get('timestamp', [])
-        if not timestamps:
-            print(f"No timestamps for {ticker}")
-            return None
-
-        indicators_list = result.get('indicators', {}).get('quote', [])
-        if not indicators_list or len(indicators_list) == 0:
-            print(f"No indicators for {ticker}")
-            return None
-
-        indicators = indicators_list[0]
-        opens = indicators.get('open', [])
-        highs = indicators.get('high', [])
-        lows = indicators.get('low', [])
-        closes = indicators.get('close', [])
-        volumes = indicators.get('volume', [])
-
-        data_list = []
-        for i in range(len(timestamps)):
-            if (closes[i] is not None and opens[i] is not None and highs[i] is not None and lows[i] is not None):
-                date = datetime.fromtimestamp(timestamps[i])
-                data_list.append({
-                    'Date': date,
-                    'Open': float(opens[i]),
-                    'High': float(highs[i]),
-                    'Low': float(lows[i]),
-                    'Close': float(closes[i]),
-                    'Volume': int(volumes[i]) if volumes[i] is not None else 0
-                })
-
-        if not data_list:
-            print(f"No valid data for {ticker}")
-            return None
-
-        df = pd.DataFrame(data_list)
-        df = df.set_index('Date')
-        df = df.sort_index()
-        return df
-
-    except Exception as e:
-        print(f"Error fetching data for {ticker}: {e}")
-        return None
-
-# 이동평균선이 포함된 주가 데이터 가져오기 (최근 1년 6개월)
-@st.cache_data(ttl=3600)
-def get_stock_data_with_ma(ticker, interval="1d"):
-    """최근 1년 6개월 데이터를 가져오고 이동평균선 계산"""
-    try:
-        import yfinance as yf
-        
-        # 기간 설정 - 이동평균선 계산을 위해 충분한 데이터 필요
-        if interval == "1d":
-            period = "3y"  # 일봉: 3년치 데이터
-            ma_periods = [200, 240, 365]
-            display_days = 547  # 1년 6개월
-        else:  # 1wk
-            period = "10y"  # 주봉: 10년치 데이터 (충분한 데이터 확보)
-            ma_periods = [200, 240, 365]
-            display_weeks = 78  # 1년 6개월
-        
-        yf_ticker = yf.Ticker(ticker)
-        df = yf_ticker.history(period=period, interval=interval)
-        
-        if df is None or df.empty:
-            # period로 실패하면 max로 시도
-            df = yf_ticker.history(period="max", interval=interval)
-        
-        if df is None or df.empty:
-            return None
-        
-        df = df[["Open", "High", "Low", "Close", "Volume"]].copy()
-        
-        # 이동평균선 계산
-        for ma_period in ma_periods:
-            df[f"MA{ma_period}"] = df["Close"].rolling(ma_period).mean()
-        df.dropna(inplace=True)
+def session_memory_footprint():
+    """
+    세션 분석 결과의 메모리 사용량 - 진단 expander 는 접혀 있어도 매 rerun 실행되므로
+    결과가 바뀌었을 때만 다시 계산 (deep memory_usage 는 종목 수에 비례해 느림)
+    """
+    fingerprint = st.session_state.get('results_fingerprint')
+    if st.session_state.get('footprint_fingerprint') != fingerprint or 'footprint' not in st.session_state:
+        st.session_state['footprint'] = session_footprint(st.session_state['results'], st.session_state['result_df'])
+        st.session_state['footprint_fingerprint'] = fingerprint
+    return st.session_state['footprint']
+
+
+def show_export(tables, end_date):
+    """결과 테이블/행렬 다운로드 (Parquet 또는 memory-map 으로 읽을 수 있는 Arrow IPC)"""
+    with st.expander("📦 결과 내보내기"):
+        label = st.radio("형식", list(EXPORT_FORMATS), horizontal=True, key="export_format")
+        fmt = EXPORT_FORMATS[label]
+        for col, name in zip(st.columns(len(ARTIFACTS)), ARTIFACTS):
+            with col:
+                st.download_button(
+                    name, tables.payload(name, fmt), file_name=f"{name}_{end_date:%Y%m%d}{FORMATS[fmt]}",
+                    mime=MIME[fmt], use_container_width=True, key=f"export_{name}",
+                )
+        st.caption(f"{len(tables.frames['close'].columns)}개 종목 × {len(tables.frames['close'])}일")
 
-        df_display = df
-        
-        return df_display if not df_display.empty else None
-        
-    except Exception as e:
-        print(f"Error fetching data with MA for {ticker}: {e}")
-        return None
 
 # -----------------------------
 # 색상 강조 함수
@@ -478,9 +171,88 @@ def highlight_market_cap(val):
         return ""
     return ""
 
+def stale_cell_styles(df, stale_fields):
+    """stale 로 표시된 셀을 회색으로 표시하는 Styler.apply(axis=None) 용 스타일 프레임"""
+    styles = pd.DataFrame("", index=df.index, columns=df.columns)
+    for idx, fields in stale_fields.items():
+        for field in fields:
+            if field in styles.columns:
+                styles.at[idx, field] = "background-color: #eeeeee; color: #9e9e9e"
+    return styles
+
+
+def session_table_index(columns, risk_metrics, key):
+    """
+    포트폴리오 표의 검색/정렬 인덱스 (표시 컬럼 + 리스크 지표)
+    분석 결과와 기간(key)이 같으면 세션에 보관한 인덱스를 재사용
+    """
+    cached = st.session_state.get('table_index')
+    if cached is None or cached[0] != key:
+        frame = st.session_state['result_df'][columns].copy()
+        for col in RISK_FIELDS:
+            frame.insert(frame.columns.get_loc('갱신 지연'), col, frame['티커'].map(risk_metrics[col]))
+        cached = (key, TableIndex(frame))
+        st.session_state['table_index'] = cached
+    return cached[1]
+
+
+def table_controls(table_index):
+    """검색/섹터/정렬/페이지 입력 → (현재 페이지의 행 위치, 첫 행 번호)"""
+    col1, col2, col3, col4 = st.columns([3, 3, 2, 1])
+    with col1:
+        text = st.text_input("검색 (티커/기업명/섹터/팀)", key="table_search")
+    with col2:
+        sectors = st.multiselect("섹터", sorted(table_index.frame['섹터'].astype(str).unique()), key="table_sectors")
+    with col3:
+        sort_columns = [c for c in table_index.frame.columns if c not in ('팀', '자산', '갱신 지연')]
+        sort = st.selectbox("정렬", ["기본 순서"] + sort_columns, key="table_sort")
+    with col4:
+        descending = st.toggle("내림차순", key="table_desc")
+    positions = table_index.query(text, sectors, None if sort == "기본 순서" else sort, not descending)
+
+    col1, col2, col3 = st.columns([1, 1, 4])
+    with col1:
+        page_size = st.selectbox("페이지 크기", TABLE_PAGE_SIZES, index=TABLE_PAGE_SIZES.index(200),
+                                 key="table_page_size")
+    page = 1
+    if len(positions) > page_size:
+        with col2:
+            page = st.number_input("페이지", min_value=1, step=1, key="table_page")
+    page_positions, pages = page_slice(positions, page, page_size)
+    page = min(page, pages)
+    with col3:
+        st.caption(f"{len(positions)}/{len(table_index)}개 종목 · {page}/{pages} 페이지")
+    return page_positions, (page - 1) * page_size + 1
+
+
+@governed_cache_data(max_entries=50)
+def get_fundamentals_history(ticker, version):
+    """종목의 재무 지표 이력 (version 이 같으면 part 파일을 다시 읽지 않음)"""
+    return FundamentalsHistory().series(ticker)
+
+
+def show_fundamentals_history(ticker):
+    """선택한 종목의 재무 지표 변화 (로컬 이력, 값이 바뀐 날만 기록되므로 계단형)"""
+    import plotly.graph_objects as go
+
+    history = get_fundamentals_history(ticker, FundamentalsHistory().version())
+    if len(history) < 2:
+        st.caption("📜 재무 지표 이력: 분석을 다시 실행해 값이 바뀐 기록이 쌓이면 변화가 표시됩니다.")
+        return
+    with st.expander(f"📜 재무 지표 변화 ({history.index[0]:%Y-%m-%d} ~ {history.index[-1]:%Y-%m-%d})"):
+        field = st.selectbox("지표", list(history.columns), key="history_field")
+        fig = go.Figure(go.Scatter(x=history.index, y=history[field], mode="lines+markers", line_shape="hv"))
+        fig.update_layout(height=int(300 * SCALE), margin=dict(t=20, b=20), yaxis_title=field)
+        st.plotly_chart(fig, use_container_width=True)
+        st.dataframe(history.sort_index(ascending=False).style.format(precision=2, na_rep="-"),
+                     use_container_width=True)
+
+
 # 개별 종목 차트 표시 함수
 def display_stock_chart(selected_data, start_date):
     """선택된 종목의 상세 차트를 표시"""
+    import plotly.graph_objects as go
+
     if selected_data['price_data'] is not None:
         st.markdown("---")
         st.subheader(f"📈 {selected_data['기업명']} ({selected_data['티커']}) 상세 차트")
@@ -510,7 +282,11 @@ def display_stock_chart(selected_data, start_date):
         interval = "1d" if "일봉" in chart_interval else "1wk"
         
         # 이동평균선이 포함된 데이터 가져오기
-        df_chart = get_stock_data_with_ma(selected_data['티커'], interval)
+        price_data = selected_data['price_data']
+        df_chart = get_chart_history(
+            selected_data['티커'], interval,
+            price_data.index[0].date(), price_data.index[-1].date(), price_data
+        )
         
         if df_chart is not None and not df_chart.empty:
             # 캔들스틱 차트 생성
@@ -604,13 +380,12 @@ def display_stock_chart(selected_data, start_date):
         with col1:
             if selected_data['daily_changes'] is not None:
                 changes = selected_data['daily_changes'].dropna()
-                colors = ['green' if x >= 0 else 'red' for x in changes]
 
                 fig_change = go.Figure()
                 fig_change.add_trace(go.Bar(
                     x=changes.index,
                     y=changes.values,
-                    marker_color=colors,
+                    marker_color=sign_colors(changes.values),
                     name='일일 변동률'
                 ))
                 fig_change.update_layout(
@@ -652,13 +427,12 @@ def display_stock_chart(selected_data, start_date):
         with col2:
             if selected_data['cumulative_returns'] is not None:
                 returns = selected_data['cumulative_returns'].dropna()
-                colors = ['green' if x >= 0 else 'red' for x in returns]
 
                 fig_return = go.Figure()
                 fig_return.add_trace(go.Bar(
                     x=returns.index,
                     y=returns.values,
-                    marker_color=colors,
+                    marker_color=sign_colors(returns.values),
                     name='누적 수익률'
                 ))
                 fig_return.update_layout(
@@ -698,6 +472,38 @@ def display_stock_chart(selected_data, start_date):
                 st.plotly_chart(fig_return, use_container_width=True)
 
 # 메인 앱
+def poll_live(interval):
+    """폴링 주기가 되었으면 다음 batch 종목의 장중 봉을 조회하여 바뀐 행만 갱신"""
+    poller = st.session_state.get('live_poller')
+    if poller is None or poller.interval != interval:
+        poller = st.session_state['live_poller'] = LivePoller(interval)
+
+    results = st.session_state['results']
+    if poller.seconds_until_next(len(results)) > 0:
+        return poller
+    updated = poller.poll(results)
+    if updated:
+        patch_result_frame(st.session_state['result_df'], results, updated)
+        st.session_state['results_fingerprint'] = results_fingerprint(st.session_state['result_df'])
+    st.session_state['live_updated_at'] = datetime.now().strftime('%H:%M:%S')
+    return poller
+
+
+def live_refresh_countdown(seconds):
+    """
+    다음 폴링까지 기다린 뒤 다시 실행
+    1초마다 st 호출을 하므로 기다리는 동안 위젯을 조작하면 바로 중단되고 새로 실행됨
+    """
+    placeholder = st.sidebar.empty()
+    deadline = time.monotonic() + seconds
+    while (left := deadline - time.monotonic()) > 0:
+        placeholder.caption(
+            f"마지막 갱신 {st.session_state.get('live_updated_at', '-')} · 다음 갱신까지 {int(left)}초"
+        )
+        time.sleep(min(1, left))
+    st.rerun()
+
+
 def main():
     st.title("📊 투자 포트폴리오 대시보드")
 
@@ -730,111 +536,166 @@ def main():
     with col2:
         return_y_max = st.number_input("최대값", value=50, key="return_max")
 
+    # 롤링 통계 구간을 2열로 배치
+    st.sidebar.subheader("📐 롤링 통계")
+    col1, col2 = st.sidebar.columns(2)
+    with col1:
+        rolling_window = st.number_input("구간 (일)", min_value=2, value=20, key="rolling_window")
+    with col2:
+        rsi_period = st.number_input("RSI 기간", min_value=2, value=14, key="rsi_period")
+
+    st.sidebar.subheader("⏱️ 분석 제한 시간")
+    analysis_timeout = st.sidebar.number_input(
+        "제한 시간 (초, 0 = 무제한)", min_value=0, value=600, step=60, key="analysis_timeout"
+    )
+
     analyze_button = st.sidebar.button("🔍 분석 시작", type="primary", use_container_width=True)
 
+    # 실시간 모드: 분석 결과에 당일 장중 봉만 반영 (전체 분석은 다시 하지 않음)
+    st.sidebar.subheader("📡 실시간 모드")
+    live_mode = st.sidebar.toggle("장중 자동 갱신", key="live_mode")
+    live_interval = st.sidebar.selectbox(
+        "봉 간격", list(INTRADAY_INTERVALS), key="live_interval", disabled=not live_mode
+    )
+
+    # 프로파일링: 다음 실행부터 구간/fetcher/HTTP 소요 시간을 측정하여 사이드바 아래에 표시
+    st.sidebar.subheader("🧭 프로파일링")
+    profile_mode = st.sidebar.toggle("구간별 소요 시간 측정", value=PROFILE_DEFAULT, key="profile_mode")
+    st.sidebar.selectbox("trace 수집", ["없음"] + available_tracers(), key="profile_trace", disabled=not profile_mode)
+
+    # 동시 요청 병합 카운터
+    with st.sidebar.expander("🔧 진단"), section("진단"):
+        flight_stats = flight.stats()
+        if flight_stats:
+            st.dataframe(
+                pd.DataFrame.from_dict(flight_stats, orient="index")
+                .rename(columns={"calls": "호출", "executed": "실행", "coalesced": "병합"}),
+                use_container_width=True
+            )
+        else:
+            st.caption("아직 호출 기록이 없습니다.")
+        st.caption(f"진행 중인 요청: {flight.in_flight()}")
+
+        breaker_stats = breakers.snapshot()
+        if breaker_stats:
+            st.dataframe(
+                pd.DataFrame.from_dict(breaker_stats, orient="index")
+                .rename(columns={"state": "상태", "failures": "연속 실패", "short_circuited": "차단"}),
+                use_container_width=True
+            )
+            if st.button("회로 초기화", key="reset_breakers"):
+                for host in breaker_stats:
+                    breakers.get(host).reset()
+                st.rerun()
+
+        # 데이터가 없다고 응답한 종목 (격리 기간 동안 요청하지 않음)
+        quarantined = quarantine.snapshot()
+        if quarantined:
+            st.caption(f"격리된 종목: {len(quarantine.quarantined())}개 (조회 생략 {quarantine.stats['skipped']}회)")
+            st.dataframe(
+                pd.DataFrame([
+                    {"티커": q["ticker"], "endpoint": q["endpoint"], "사유": q["kind"], "실패": q["failures"],
+                     "남은 기간": format_age(q["remaining"]) if q["remaining"] else "재조회 대기"}
+                    for q in quarantined
+                ]),
+                use_container_width=True, hide_index=True
+            )
+            if ADMIN_MODE:
+                release_symbols = st.multiselect(
+                    "격리 해제할 종목", sorted({q["ticker"] for q in quarantined}), key="release_tickers"
+                )
+                if st.button("격리 해제", key="release_button", disabled=not release_symbols):
+                    # 실패 결과가 남아 있는 fetcher 캐시도 함께 비워야 다음 분석에서 바로 다시 조회
+                    for symbol in release_symbols:
+                        quarantine.release(symbol)
+                        purge_ticker(symbol)
+                    st.rerun()
+        else:
+            st.caption("격리된 종목이 없습니다.")
+
+        st.dataframe(
+            pd.DataFrame({cache.__name__: cache.stats for cache in swr_caches}).T
+            .rename(columns={"hits": "적중", "misses": "미스", "stale_served": "이전 값 제공",
+                             "refreshes": "백그라운드 갱신", "refresh_failures": "갱신 실패"}),
+            use_container_width=True
+        )
+
+        # 엔드포인트별 HTTP 전송량 (압축/304/max-age 로 절약한 바이트)
+        endpoint_stats = http_stats()
+        if endpoint_stats:
+            http_df = pd.DataFrame.from_dict(endpoint_stats, orient="index")
+            byte_columns = ["wire_bytes", "body_bytes", "saved_bytes"]
+            http_df[byte_columns] = (http_df[byte_columns] / 1024).round(1)
+            st.dataframe(
+                http_df.rename(columns={"requests": "요청", "not_modified": "304", "fresh": "요청 생략",
+                                        "wire_bytes": "전송(KB)", "body_bytes": "본문(KB)",
+                                        "saved_bytes": "절약(KB)"}),
+                use_container_width=True
+            )
+
+        # 캐시별 메모리 사용량
+        st.dataframe(memory_report(), use_container_width=True, hide_index=True)
+
+        # 이 세션이 보관하는 분석 결과의 메모리 사용량
+        if 'results' in st.session_state:
+            footprint = session_memory_footprint()
+            st.caption(
+                f"세션 메모리: {footprint['total'] / 1024 / 1024:.2f} MB "
+                f"(주가 {footprint['price_data'] / 1024:.0f} KB, 수익률 {footprint['series'] / 1024:.0f} KB, "
+                f"테이블 {footprint['table'] / 1024:.0f} KB)"
+            )
+
+        if ADMIN_MODE:
+            purge_names = st.multiselect("비울 캐시", [cache.name for cache in registered()], key="purge_caches")
+            if st.button("선택 캐시 비우기", key="purge_button", disabled=not purge_names):
+                purge(purge_names)
+                st.rerun()
+            purge_symbol = st.text_input("티커 캐시 비우기", key="purge_ticker").strip().upper()
+            if st.button("티커 항목 삭제", key="purge_ticker_button", disabled=not purge_symbol):
+                st.toast(f"{purge_symbol}: {purge_ticker(purge_symbol)}개 항목 삭제")
+
     portfolio_df = load_portfolio_data()
 
+    poller = None
+    if live_mode and 'results' in st.session_state and not analyze_button:
+        with section("실시간 폴링"):
+            poller = poll_live(live_interval)
+
     tab1, tab2, tab3 = st.tabs(["📈 포트폴리오 분석", "📊 트렌드 분석", "🔥 일일변동률 히트맵"])
 
-    with tab1:
+    with tab1, section("탭1 포트폴리오"):
         if analyze_button or 'results' in st.session_state:
             if analyze_button:
                 st.info("데이터를 가져오는 중... 시간이 걸릴 수 있습니다.")
-                results = []
                 progress_bar = st.progress(0)
 
-                for idx, row in portfolio_df.iterrows():
-                    ticker = row['티커']
-                    progress_bar.progress((idx + 1) / len(portfolio_df))
-                    stock_data = get_stock_data(ticker, start_date, end_date)
-                    
-                    # 시가총액 가져오기
-                    market_cap = get_market_cap(ticker)
-
-                    if stock_data is not None and len(stock_data) > 0:
-                        base_price = stock_data['Close'].iloc[0]
-                        current_price = stock_data['Close'].iloc[-1]
-                        highest_price = stock_data['Close'].max()
-
-                        return_from_base = ((current_price - base_price) / base_price) * 100
-                        return_from_high = ((current_price - highest_price) / highest_price) * 100
-
-                        if len(stock_data) > 1:
-                            daily_return = current_price - stock_data['Close'].iloc[-2]
-                            daily_return_pct = ((current_price - stock_data['Close'].iloc[-2]) / stock_data['Close'].iloc[-2]) * 100
-                        else:
-                            daily_return = 0
-                            daily_return_pct = 0
-
-                        daily_changes = stock_data['Close'].pct_change() * 100
-                        cumulative_returns = ((stock_data['Close'] / base_price) - 1) * 100
-
-                        # Finviz에서 재무 데이터 가져오기
-                        debt_ratio = get_finviz_metric(ticker, "Debt/Eq") * 100
-                        current_ratio = get_finviz_metric(ticker, "Current Ratio") * 100
-                        roe = get_finviz_metric(ticker, "ROE")
-                        total_cash = get_finviz_data(ticker, "BSQ", "Cash & Short Term Investments")
-                        free_cash_flow = get_finviz_data(ticker, "CFA", "Free Cash Flow")
-
-                        runway = "-"
-                        if total_cash and free_cash_flow and free_cash_flow < 0:
-                            runway = round(total_cash / abs(free_cash_flow), 1)
-
-                        results.append({
-                            '팀': row['팀'],
-                            '자산': row['자산'],
-                            '섹터': row['섹터'],
-                            '기업명': row['기업명'],
-                            '티커': ticker,
-                            '시가총액': market_cap,
-                            '기준가': round(base_price, 2),
-                            '최고가': round(highest_price, 2),
-                            '현재가': round(current_price, 2),
-                            '누적수익률(기준가)': round(return_from_base, 2),
-                            '누적수익률(최고가)': round(return_from_high, 2),
-                            '일일수익': round(daily_return, 2),
-                            '일일수익률': round(daily_return_pct, 2),
-                            '부채비율': round(debt_ratio, 2) if isinstance(debt_ratio, (int, float)) else "-",
-                            '유동비율': round(current_ratio, 2) if isinstance(current_ratio, (int, float)) else "-",
-                            'ROE': round(roe, 2) if isinstance(roe, (int, float)) else "-",
-                            'Runway(년)': runway,
-                            'Total Cash(M$)': round(total_cash, 2) if total_cash else "-",
-                            'FCF(M$)': round(free_cash_flow, 2) if free_cash_flow else "-",
-                            'price_data': stock_data,
-                            'daily_changes': daily_changes[1:],
-                            'cumulative_returns': cumulative_returns
-                        })
-                    else:
-                        results.append({
-                            '팀': row['팀'],
-                            '자산': row['자산'],
-                            '섹터': row['섹터'],
-                            '기업명': row['기업명'],
-                            '티커': ticker,
-                            '시가총액': market_cap,
-                            '기준가': "-",
-                            '최고가': "-",
-                            '현재가': "-",
-                            '누적수익률(기준가)': "-",
-                            '누적수익률(최고가)': "-",
-                            '일일수익': "-",
-                            '일일수익률': "-",
-                            '부채비율': "-",
-                            '유동비율': "-",
-                            'ROE': "-",
-                            'Runway(년)': "-",
-                            'Total Cash(M$)': "-",
-                            'FCF(M$)': "-",
-                            'price_data': None,
-                            'daily_changes': None,
-                            'cumulative_returns': None
-                        })
+                # 중단된 이전 실행이 있으면 완료된 종목은 체크포인트에서 이어받음
+                # 시작일이 같고 종료일만 늘어났으면 마지막 완료 실행에 새 봉만 이어 붙임
+                with section("분석 실행 (fetch)"):
+                    results, run_info = run_analysis(
+                        portfolio_df, start_date, end_date,
+                        timeout=analysis_timeout,
+                        progress=lambda done, total: progress_bar.progress(done / total)
+                    )
+                if run_info['resumed']:
+                    st.info(f"♻️ 이전 실행에서 완료된 {run_info['resumed']}개 종목을 이어받고 나머지만 조회했습니다.")
+                if run_info['extended']:
+                    st.info(f"➕ 이전 분석 결과에 새 거래일만 이어 붙였습니다 ({run_info['extended']}개 종목).")
+                if run_info['quarantined']:
+                    st.info(f"🚫 데이터가 없는 종목 {len(run_info['quarantined'])}개는 조회를 건너뛰었습니다: "
+                            f"{', '.join(run_info['quarantined'][:20])}"
+                            f"{' 외' if len(run_info['quarantined']) > 20 else ''} (🔧 진단에서 확인)")
 
                 progress_bar.empty()
-                st.success("✅ 분석 완료!")
+                stale_count = sum(1 for r in results if r['stale_fields'])
+                if stale_count:
+                    st.warning(f"⏳ {stale_count}개 종목의 일부 데이터가 이전 값이거나 누락되었습니다 (회색 셀, '갱신 지연' 컬럼 참고).")
+                else:
+                    st.success("✅ 분석 완료!")
 
                 st.session_state['results'] = results
-                st.session_state['result_df'] = pd.DataFrame(results)
+                st.session_state['result_df'] = result_frame(results)
+                st.session_state['results_fingerprint'] = results_fingerprint(st.session_state['result_df'])
 
             else:
                 results = st.session_state['results']
@@ -844,7 +705,7 @@ def main():
 
             display_columns = ['팀', '자산', '섹터', '기업명', '티커', '시가총액', '기준가', '최고가', '현재가',
                                '누적수익률(기준가)', '누적수익률(최고가)', '일일수익', '일일수익률',
-                               '부채비율', '유동비율', 'ROE', 'Runway(년)', 'Total Cash(M$)', 'FCF(M$)']
+                               '부채비율', '유동비율', 'ROE', 'Runway(년)', 'Total Cash(M$)', 'FCF(M$)', '갱신 지연']
 
             def highlight_returns(val):
                 if isinstance(val, (int, float)):
@@ -852,25 +713,41 @@ def main():
                     return f'color: {color}'
                 return ''
 
-            # 표시용 DataFrame 생성
-            display_df = st.session_state['result_df'][display_columns].copy()
+            # 리스크 지표 (MDD/변동성/베타)
+            with section("리스크 지표"):
+                risk_metrics, _ = get_risk_report(
+                    st.session_state['results_fingerprint'], start_date, end_date, st.session_state['results']
+                )
+
+            # 검색/정렬은 인덱스에서 행 위치만 고르고, 현재 페이지의 행만 표시용으로 변환
+            with section("표 검색/정렬"):
+                table_index = session_table_index(
+                    display_columns, risk_metrics, (st.session_state['results_fingerprint'], start_date, end_date)
+                )
+                positions, first_number = table_controls(table_index)
+            display_df = table_index.frame.iloc[positions].copy()
+            stale_fields = st.session_state['result_df']['stale_fields'].iloc[positions]
             
             # Finviz 링크 컬럼 추가
             display_df['Finviz'] = display_df['티커'].apply(
                 lambda ticker: f"https://finviz.com/quote.ashx?t={ticker}&p=d"
             )
+
+            # category 컬럼은 편집기에서 선택 상자로 표시되므로 문자열로 변환
+            display_df[LABEL_COLUMNS] = display_df[LABEL_COLUMNS].astype(str)
             
             # 숫자 컬럼 포맷팅 (소수점 2자리) - 시가총액 제외
             float_cols = [
                 '기준가', '최고가', '현재가',
                 '누적수익률(기준가)', '누적수익률(최고가)', '일일수익', '일일수익률',
                 '부채비율', '유동비율', 'ROE', 'Runway(년)', 'Total Cash(M$)', 'FCF(M$)'
-            ]
+            ] + RISK_FIELDS
 
-            for col in float_cols:
-                display_df[col] = display_df[col].apply(
-                    lambda x: f"{x:.2f}" if isinstance(x, (int, float)) else x
-                )
+            with section("표 포맷"):
+                for col in float_cols:
+                    display_df[col] = display_df[col].apply(
+                        lambda x: "-" if pd.isna(x) else f"{x:.2f}"
+                    )
 
             
             
@@ -878,7 +755,7 @@ def main():
             display_df.insert(0, '선택', False)
 
             # 번호 컬럼 추가
-            display_df.insert(1, '번호', range(1, len(display_df) + 1))
+            display_df.insert(1, '번호', range(first_number, first_number + len(display_df)))
 
             
 
@@ -898,35 +775,37 @@ def main():
                      subset=["누적수익률(기준가)", "누적수익률(최고가)", "일일수익", "일일수익률", "ROE"])
                 .map(highlight_low_debt_ratio, subset=["부채비율"])
                 .map(highlight_market_cap, subset=["시가총액"])
+                .apply(stale_cell_styles, axis=None, stale_fields=stale_fields)
             )
             
             # 테이블 표시 (편집 가능)
-            edited_df = st.data_editor(
-                display_df,
-                use_container_width=True,
-                height=int(600 * SCALE),
-                hide_index=True,
-                column_config={
-                    "번호": st.column_config.NumberColumn(
-                        "번호",
-                        help="종목 순번",
-                        width="small",
-                        disabled=True
-                    ),
-                    "선택": st.column_config.CheckboxColumn(
-                        "선택",
-                        help="차트를 보고 싶은 종목을 선택하세요 (단일 선택)",
-                        default=False,
-                    ),
-                    "Finviz": st.column_config.LinkColumn(
-                        "Finviz",
-                        help="Finviz 차트 보기",
-                        width="small"
-                    )
-                },
-                disabled=[col for col in display_df.columns if col not in ['선택']],
-                key='stock_table'
-            )
+            with section("표 렌더 (스타일 적용)"):
+                edited_df = st.data_editor(
+                    display_df,
+                    use_container_width=True,
+                    height=int(600 * SCALE),
+                    hide_index=True,
+                    column_config={
+                        "번호": st.column_config.NumberColumn(
+                            "번호",
+                            help="종목 순번",
+                            width="small",
+                            disabled=True
+                        ),
+                        "선택": st.column_config.CheckboxColumn(
+                            "선택",
+                            help="차트를 보고 싶은 종목을 선택하세요 (단일 선택)",
+                            default=False,
+                        ),
+                        "Finviz": st.column_config.LinkColumn(
+                            "Finviz",
+                            help="Finviz 차트 보기",
+                            width="small"
+                        )
+                    },
+                    disabled=[col for col in display_df.columns if col not in ['선택']],
+                    key='stock_table'
+                )
 
             # 선택된 종목 확인
             selected_rows = edited_df[edited_df['선택'] == True]
@@ -952,211 +831,107 @@ def main():
             elif len(selected_rows) == 1:
                 # 단일 선택된 경우
                 st.session_state.selected_ticker = selected_rows.iloc[0]['티커']
-                selected_row = selected_rows.iloc[0]
             else:
-                # 선택 해제된 경우
-                if 'selected_ticker' in st.session_state:
+                # 선택 해제된 경우 (다른 페이지/검색 결과 밖에 있는 선택은 유지)
+                if st.session_state.get('selected_ticker') in set(edited_df['티커']):
                     del st.session_state.selected_ticker
-                selected_row = None
 
             
             
             # 차트 표시
-            if len(selected_rows) == 1:
+            selected_ticker = st.session_state.get('selected_ticker')
+            result_df = st.session_state['result_df']
+            selected_matches = result_df[result_df['티커'] == selected_ticker]
+            if len(selected_matches):
                 st.markdown("---")
-                selected_ticker = selected_row['티커']
-                selected_data = st.session_state['result_df'][
-                    st.session_state['result_df']['티커'] == selected_ticker
-                ].iloc[0]
+                if len(selected_rows) == 0:
+                    st.caption(f"선택한 종목 {selected_ticker} 은 현재 페이지에 없습니다.")
+                selected_data = selected_matches.iloc[0]
                 
-                display_stock_chart(selected_data, start_date)
-            elif len(selected_rows) == 0:
+                with section("상세 차트"):
+                    display_stock_chart(selected_data, start_date)
+                with section("재무 지표 이력"):
+                    show_fundamentals_history(selected_ticker)
+            else:
                 st.info("💡 차트를 보려면 테이블에서 종목의 체크박스를 선택하세요.")
 
+            with section("내보내기"):
+                show_export(
+                    session_result_tables(st.session_state['results'], st.session_state['results_fingerprint']),
+                    end_date,
+                )
+
         else:
             st.info("분석을 실행해주세요.")
 
-    with tab2:
+    with tab2, section("탭2 트렌드"):
         if 'results' in st.session_state:
             results = st.session_state['results']
             result_df = st.session_state['result_df']
 
             st.subheader("📊 트렌드 분석")
 
-            st.markdown("### 1️⃣ 청팀 vs 백팀 누적수익률 비교 (가중평균 포함)")
-            team_returns = {}
-            for team in result_df['팀'].unique():
-                stocks = result_df[result_df['팀'] == team]
-                arr = [r['cumulative_returns'].dropna() for _, r in stocks.iterrows() if r['cumulative_returns'] is not None]
-                if arr:
-                    team_returns[team] = pd.concat(arr, axis=1).mean(axis=1)
-            if team_returns:
-                total = sum(len(result_df[result_df['팀'] == t]) for t in team_returns.keys())
-                weighted = {t: d * (len(result_df[result_df['팀'] == t]) / total) for t, d in team_returns.items()}
-                total_weighted = sum(weighted.values())
-
-                fig = go.Figure()
-                for t, d in team_returns.items():
-                    fig.add_trace(go.Scatter(x=d.index, y=d.values, mode='lines', name=f"{t} 평균"))
-                fig.add_trace(go.Scatter(x=total_weighted.index, y=total_weighted.values,
-                                         mode='lines', name="시장 전체 가중평균",
-                                         line=dict(width=max(int(3 * SCALE), 1), dash='dot', color='red')))
-                fig.update_layout(title="청팀 vs 백팀 누적수익률 비교 (가중평균 포함)",
-                                  height=int(500 * SCALE),
-                                  hovermode='x unified')
-                fig.add_hline(y=0, line_dash="dash", line_color="gray")
-                st.plotly_chart(fig, use_container_width=True)
-
-            team_data = {}
-            for team in result_df['팀'].unique():
-                team_stocks = result_df[result_df['팀'] == team]
-                all_changes = []
-
-                for idx, row in team_stocks.iterrows():
-                    if row['daily_changes'] is not None:
-                        all_changes.append(row['daily_changes'].dropna())
-
-                if all_changes:
-                    combined = pd.concat(all_changes, axis=1)
-                    team_avg = combined.mean(axis=1)
-                    team_data[team] = team_avg
-
-            if team_data:
-                fig_team = go.Figure()
-                for team, data in team_data.items():
-                    fig_team.add_trace(go.Scatter(
-                        x=data.index,
-                        y=data.values,
-                        mode='lines',
-                        name=team,
-                        line=dict(width=max(int(2 * SCALE), 1))
-                    ))
-
-                fig_team.update_layout(
-                    title="청팀 vs 백팀 평균 변동률 비교",
-                    xaxis_title="날짜",
-                    yaxis_title="평균 변동률 (%)",
-                    height=int(500 * SCALE),
-                    hovermode='x unified',
-                    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-                )
-                fig_team.add_hline(y=0, line_dash="dash", line_color="gray")
-                st.plotly_chart(fig_team, use_container_width=True)
-
-            st.markdown("### 2️⃣ 섹터별 평균 누적변동률 트렌드")
-
-            sector_data = {}
-            for sector in result_df['섹터'].unique():
-                sector_stocks = result_df[result_df['섹터'] == sector]
-                all_changes = []
-
-                for idx, row in sector_stocks.iterrows():
-                    if row['cumulative_returns'] is not None:
-                        all_changes.append(row['cumulative_returns'].dropna())
-
-                if all_changes:
-                    combined = pd.concat(all_changes, axis=1)
-                    sector_avg = combined.mean(axis=1)
-                    sector_data[sector] = sector_avg
-
-            if sector_data:
-                fig_sector = go.Figure()
-                for sector, data in sector_data.items():
-                    fig_sector.add_trace(go.Scatter(
-                        x=data.index,
-                        y=data.values,
-                        mode='lines',
-                        name=sector,
-                        line=dict(width=max(int(2 * SCALE), 1))
-                    ))
-
-                fig_sector.update_layout(
-                    title="섹터별 평균 누적변동률 비교",
-                    xaxis_title="날짜",
-                    yaxis_title="평균 누적변동률 (%)",
-                    height=int(1000 * SCALE),
-                    hovermode='x unified',
-                    legend=dict(orientation="v", yanchor="top", y=1, xanchor="left", x=1.02)
-                )
-                fig_sector.add_hline(y=0, line_dash="dash", line_color="gray")
-                st.plotly_chart(fig_sector, use_container_width=True)
-
-            st.markdown("### 3️⃣ 섹터별 개별 종목 누적변동률")
-
-            sectors = result_df['섹터'].unique()
+            # figure 는 (results 지문, Y축 범위) 단위로 캐시됨
+            fingerprint = st.session_state.get('results_fingerprint')
+            if fingerprint is None:
+                fingerprint = results_fingerprint(result_df)
+                st.session_state['results_fingerprint'] = fingerprint
 
-            for sector in sectors:
-                with st.expander(f"📂 {sector}"):
-                    sector_stocks = result_df[result_df['섹터'] == sector]
+            # 지수 산출 방식 (팀/섹터 지수는 결과 지문 + 산출 방식 단위로 한 번만 계산)
+            col1, col2 = st.columns(2)
+            with col1:
+                weighting = st.radio("지수 가중 방식", list(WEIGHTINGS), horizontal=True, key="index_weighting")
+            with col2:
+                rebalance = st.selectbox("리밸런싱", list(REBALANCE), key="index_rebalance")
+            with section("지수 산출"):
+                indices = get_indices(fingerprint, weighting, rebalance, results)
 
-                    n_stocks = len(sector_stocks)
-                    if n_stocks == 0:
-                        continue
+            st.markdown("### 1️⃣ 청팀 vs 백팀 누적수익률 비교 (시장 전체 지수 포함)")
+            with section("팀 차트"):
+                fig_json = build_team_return_figure(fingerprint, weighting, rebalance, indices)
+                if fig_json:
+                    show_figure(fig_json)
 
-                    cols = 5
-                    rows = (n_stocks + cols - 1) // cols
+            with section("팀 일간 차트"):
+                fig_json = build_group_line_figure(fingerprint, '팀', 'daily_changes', weighting, rebalance, indices)
+                if fig_json:
+                    show_figure(fig_json)
 
-                    # 기업명(티커) 형태로 subtitle 생성
-                    subtitles = [f"{row['기업명']}({row['티커']})" for _, row in sector_stocks.iterrows()]
+            st.markdown("### 2️⃣ 섹터별 지수 누적변동률 트렌드")
 
-                    fig = make_subplots(
-                        rows=rows,
-                        cols=cols,
-                        subplot_titles=subtitles,
-                        vertical_spacing=0.15 * SCALE,  # 행 간격 증가
-                        horizontal_spacing=0.03 * SCALE
-                    )
+            with section("섹터 차트"):
+                fig_json = build_group_line_figure(fingerprint, '섹터', 'cumulative_returns', weighting, rebalance, indices)
+                if fig_json:
+                    show_figure(fig_json)
 
-                    for idx, (_, row) in enumerate(sector_stocks.iterrows()):
-                        if row['cumulative_returns'] is not None:
-                            changes = row['cumulative_returns'].dropna()
-                            colors = ['green' if x >= 0 else 'red' for x in changes]
-
-                            row_num = (idx // cols) + 1
-                            col_num = (idx % cols) + 1
-
-                            fig.add_trace(
-                                go.Bar(
-                                    x=changes.index,
-                                    y=changes.values,
-                                    marker_color=colors,
-                                    showlegend=False,
-                                    name=row['티커'],
-                                ),
-                                row=row_num,
-                                col=col_num
-                            )
-                            fig.update_yaxes(range=[return_y_min, return_y_max], row=row_num, col=col_num)
+            st.markdown("### 3️⃣ 섹터별 개별 종목 누적변동률")
 
-                    # 전체 레이아웃 설정
-                    fig.update_layout(
-                        height=int(350 * rows * SCALE),  # 행 간격을 위해 높이 약간 증가
-                        title_text=f"{sector} 섹터 누적변동률",
-                        showlegend=False,
-                    )
+            sectors = result_df['섹터'].unique()
 
-                    # 모든 subplot의 폰트 크기 축소
-                    fig.update_xaxes(title_font=dict(size=8), tickfont=dict(size=7))
-                    fig.update_yaxes(title_font=dict(size=8), tickfont=dict(size=7))
-                    fig.update_annotations(font_size=9)  # subplot 제목 크기
+            with section("섹터별 종목 그리드"):
+                for sector in sectors:
+                    with st.expander(f"📂 {sector}"):
+                        # 펼친 섹터만 차트를 생성 (expander 내용은 접혀 있어도 실행되므로 토글로 지연)
+                        if not st.toggle("차트 보기", key=f"sector_grid_{sector}"):
+                            continue
 
-                    # 0선 추가
-                    for i in range(1, rows + 1):
-                        for j in range(1, cols + 1):
-                            fig.add_hline(
-                                y=0,
-                                line_dash="dash",
-                                line_color="gray",
-                                row=i,
-                                col=j
-                            )
+                        fig_json = build_sector_grid_figure(
+                            fingerprint, sector, return_y_min, return_y_max, result_df
+                        )
+                        if fig_json:
+                            show_figure(fig_json)
 
-                    st.plotly_chart(fig, use_container_width=True)
+            st.markdown(f"### 4️⃣ 롤링 통계 (최근 {rolling_window}일, RSI {rsi_period}일)")
+            with section("롤링 통계"):
+                latest = session_rolling_stats(results, fingerprint, rolling_window, rsi_period).latest()
+                names = result_df.drop_duplicates('티커').set_index('티커')['기업명']
+                latest.insert(0, '기업명', names.reindex(latest.index).values)
+                st.dataframe(latest.style.format(precision=2, na_rep="-"), use_container_width=True)
 
         else:
             st.info("먼저 '포트폴리오 분석' 탭에서 분석을 실행해주세요.")
 
-    with tab3:
+    with tab3, section("탭3 히트맵"):
         if 'results' in st.session_state:
             results = st.session_state['results']
             result_df = st.session_state['result_df']
@@ -1184,16 +959,16 @@ def main():
                 if filter_option == "팀별":
                     selected_teams = st.multiselect(
                         "팀 선택",
-                        options=result_df['팀'].unique(),
-                        default=result_df['팀'].unique(),
+                        options=result_df['팀'].unique().tolist(),
+                        default=result_df['팀'].unique().tolist(),
                         key="team_filter"
                     )
                     filtered_df = result_df[result_df['팀'].isin(selected_teams)]
                 elif filter_option == "섹터별":
                     selected_sectors = st.multiselect(
                         "섹터 선택",
-                        options=result_df['섹터'].unique(),
-                        default=result_df['섹터'].unique(),
+                        options=result_df['섹터'].unique().tolist(),
+                        default=result_df['섹터'].unique().tolist(),
                         key="sector_filter"
                     )
                     filtered_df = result_df[result_df['섹터'].isin(selected_sectors)]
@@ -1201,8 +976,9 @@ def main():
                     filtered_df = result_df
 
             # 데이터 수집 (선택된 히트맵 타입에 따라)
-            heatmap_data = []
+            heatmap_tickers = []
             stock_labels = []
+            stock_sectors = []
             
             if heatmap_type == "일일변동률":
                 data_column = 'daily_changes'
@@ -1214,77 +990,122 @@ def main():
                 metric_label = "누적변동률"
             
             # 원본 순서대로 데이터 수집
-            for idx, row in filtered_df.iterrows():
-                if row[data_column] is not None and not row[data_column].empty:
-                    stock_label = f"{row['기업명']}({row['티커']})"
-                    stock_labels.append(stock_label)
-                    heatmap_data.append(row[data_column].values)
+            with section("히트맵 데이터"):
+                for idx, row in filtered_df.iterrows():
+                    if row[data_column] is not None and not row[data_column].empty:
+                        stock_label = f"{row['기업명']}({row['티커']})"
+                        stock_labels.append(stock_label)
+                        heatmap_tickers.append(row['티커'])
+                        stock_sectors.append(str(row['섹터']))
             
-            if heatmap_data:
+            if heatmap_tickers:
+                # 표시 방식 (종목이 많으면 기본값은 섹터 집계, 전체 종목은 HEATMAP_MAX_ROWS 행까지)
+                col1, col2 = st.columns([2, 3])
+                with col1:
+                    heatmap_mode = st.radio(
+                        "표시 방식", HEATMAP_MODES, horizontal=True, key="heatmap_mode",
+                        index=0 if len(heatmap_tickers) <= 100 else HEATMAP_MODES.index(HEATMAP_GROUPED),
+                    )
+                with col2:
+                    top_n, expanded = HEATMAP_MAX_ROWS, ()
+                    if heatmap_mode == HEATMAP_TOP:
+                        top_n = st.slider("종목 수 (마지막 값 절댓값 기준)", 10, 200, 50, step=10, key="heatmap_top_n")
+                    elif heatmap_mode == HEATMAP_GROUPED:
+                        expanded = st.multiselect("펼칠 섹터", list(dict.fromkeys(stock_sectors)),
+                                                  key="heatmap_expand")
+                    elif len(heatmap_tickers) > HEATMAP_MAX_ROWS:
+                        heatmap_mode = HEATMAP_TOP
+                        st.caption(f"종목이 {HEATMAP_MAX_ROWS}개를 넘어 변동이 큰 {HEATMAP_MAX_ROWS}개만 표시합니다.")
+
                 # 데이터프레임으로 변환
-                # 모든 종목의 날짜를 통합
-                all_dates = filtered_df[filtered_df[data_column].notna()][data_column].iloc[0].index
-                
-                heatmap_df = pd.DataFrame(heatmap_data, index=stock_labels)
-                heatmap_df.columns = all_dates
+                # 모든 종목의 날짜를 통합 (실시간 갱신 중에는 종목마다 마지막 날짜가 다를 수 있음)
+                with section("히트맵 그리기"):
+                    # 분석 결과마다 한 번 만든 날짜 × 티커 행렬에서 선택 (필터된 종목에 값이 없는 날짜는 제외)
+                    tables = session_result_tables(results, st.session_state['results_fingerprint'])
+                    matrix = tables.frames[data_column]
+                    ticker_df = as_float(matrix[heatmap_tickers]).dropna(how='all').T
+                    ticker_df.index = stock_labels
+                    heatmap_df = heatmap_rows(ticker_df, stock_sectors, heatmap_mode, top_n, expanded)
                 
-                # y축 순서를 반대로 (위에서 아래로)
-                heatmap_df = heatmap_df.iloc[::-1]
+                    # y축 순서를 반대로 (위에서 아래로)
+                    heatmap_df = heatmap_df.iloc[::-1]
                 
-                # 히트맵 생성
-                fig_heatmap = go.Figure(data=go.Heatmap(
-                    z=heatmap_df.values,
-                    x=[d.strftime('%Y-%m-%d') for d in heatmap_df.columns],
-                    y=heatmap_df.index,
-                    colorscale=[
-                        [0, '#d32f2f'],      # 진한 빨강 (큰 음수)
-                        [0.4, '#ffcdd2'],    # 연한 빨강
-                        [0.5, '#ffffff'],    # 흰색 (0)
-                        [0.6, '#c8e6c9'],    # 연한 초록
-                        [1, '#388e3c']       # 진한 초록 (큰 양수)
-                    ],
-                    zmid=0,
-                    colorbar=dict(title="변동률 (%)"),
-                    hovertemplate='%{y}<br>날짜: %{x}<br>변동률: %{z:.2f}%<extra></extra>'
-                ))
+                    # 히트맵 생성
+                    import plotly.graph_objects as go
+
+                    fig_heatmap = go.Figure(data=go.Heatmap(
+                        z=heatmap_df.values,
+                        x=[d.strftime('%Y-%m-%d') for d in heatmap_df.columns],
+                        y=heatmap_df.index,
+                        colorscale=[
+                            [0, '#d32f2f'],      # 진한 빨강 (큰 음수)
+                            [0.4, '#ffcdd2'],    # 연한 빨강
+                            [0.5, '#ffffff'],    # 흰색 (0)
+                            [0.6, '#c8e6c9'],    # 연한 초록
+                            [1, '#388e3c']       # 진한 초록 (큰 양수)
+                        ],
+                        zmid=0,
+                        colorbar=dict(title="변동률 (%)"),
+                        hovertemplate='%{y}<br>날짜: %{x}<br>변동률: %{z:.2f}%<extra></extra>'
+                    ))
                 
-                fig_heatmap.update_layout(
-                    title=title_text,
-                    xaxis_title="날짜",
-                    yaxis_title="종목",
-                    height=max(int(400 * SCALE), len(stock_labels) * 25),
-                    xaxis=dict(
-                        tickangle=-45,
-                        tickmode='auto',
-                        nticks=20
-                    ),
-                    yaxis=dict(
-                        tickmode='linear',
-                        automargin=True
+                    fig_heatmap.update_layout(
+                        title=title_text,
+                        xaxis_title="날짜",
+                        yaxis_title="종목",
+                        height=max(int(400 * SCALE), len(heatmap_df) * 25),
+                        xaxis=dict(
+                            tickangle=-45,
+                            tickmode='auto',
+                            nticks=20
+                        ),
+                        yaxis=dict(
+                            tickmode='linear',
+                            automargin=True
+                        )
                     )
-                )
                 
-                st.plotly_chart(fig_heatmap, use_container_width=True)
+                    st.plotly_chart(fig_heatmap, use_container_width=True)
                 
                 # 통계 정보 표시
                 st.markdown("### 📊 히트맵 통계")
-                col1, col2, col3, col4 = st.columns(4)
+                with section("히트맵 통계"):
+                    col1, col2, col3, col4 = st.columns(4)
                 
-                with col1:
-                    avg_change = heatmap_df.values.flatten().mean()
-                    st.metric(f"평균 {metric_label}", f"{avg_change:.2f}%")
+                    with col1:
+                        avg_change = ticker_df.stack().mean()
+                        st.metric(f"평균 {metric_label}", f"{avg_change:.2f}%")
                 
-                with col2:
-                    max_change = heatmap_df.values.flatten().max()
-                    st.metric("최대 상승률", f"{max_change:.2f}%")
+                    with col2:
+                        max_change = ticker_df.stack().max()
+                        st.metric("최대 상승률", f"{max_change:.2f}%")
                 
-                with col3:
-                    min_change = heatmap_df.values.flatten().min()
-                    st.metric("최대 하락률", f"{min_change:.2f}%")
+                    with col3:
+                        min_change = ticker_df.stack().min()
+                        st.metric("최대 하락률", f"{min_change:.2f}%")
                 
-                with col4:
-                    volatility = heatmap_df.values.flatten().std()
-                    st.metric("변동성 (표준편차)", f"{volatility:.2f}%")
+                    with col4:
+                        volatility = ticker_df.stack().std()
+                        st.metric("변동성 (표준편차)", f"{volatility:.2f}%")
+                
+                # 상관계수 히트맵 (필터된 종목, 같은 티커는 한 번만)
+                st.markdown("### 🔗 종목 간 상관계수")
+                with section("상관계수"):
+                    _, correlation = get_risk_report(
+                        st.session_state['results_fingerprint'], start_date, end_date, results
+                    )
+                    tickers = tuple(t for t in dict.fromkeys(filtered_df['티커']) if t in correlation.index)
+                    if len(tickers) > CORRELATION_MAX_TICKERS:
+                        # 종목이 많으면 마지막 값의 변동이 큰 종목만
+                        last = matrix[list(tickers)].ffill().iloc[-1].abs()
+                        tickers = tuple(last.nlargest(CORRELATION_MAX_TICKERS).index)
+                        st.caption(f"변동이 큰 {CORRELATION_MAX_TICKERS}개 종목만 표시합니다.")
+                    if len(tickers) > 1:
+                        show_figure(build_correlation_figure(
+                            st.session_state['results_fingerprint'], tickers, correlation
+                        ))
+                    else:
+                        st.caption("상관계수를 계산할 종목이 2개 이상 필요합니다.")
                 
             else:
                 st.warning("선택된 필터에 해당하는 데이터가 없습니다.")
@@ -1292,6 +1113,47 @@ def main():
         else:
             st.info("먼저 '포트폴리오 분석' 탭에서 분석을 실행해주세요.")
 
+    # 실시간 모드: 다음 폴링까지 남은 시간 (프로파일 표시 후 대기)
+    if poller is not None:
+        return poller.seconds_until_next(len(st.session_state['results']))
+    return None
+
+
+def show_profile(profiler):
+    """이번 실행의 구간/fetcher/HTTP 소요 시간 (느린 순)과 trace 다운로드"""
+    with st.sidebar.expander(f"🧭 프로파일 ({profiler.total * 1000:.0f} ms)", expanded=True):
+        breakdown = pd.DataFrame(profiler.breakdown())
+        if breakdown.empty:
+            st.caption("기록된 구간이 없습니다.")
+        else:
+            st.dataframe(breakdown, use_container_width=True, hide_index=True)
+            st.download_button(
+                "구간별 시간 (CSV)", breakdown.to_csv(index=False).encode("utf-8-sig"),
+                file_name="profile_sections.csv", mime="text/csv", key="profile_csv"
+            )
+        trace = profiler.trace_file()
+        if trace is not None:
+            file_name, data, mime = trace
+            st.download_button(f"trace 다운로드 ({file_name})", data, file_name=file_name, mime=mime,
+                               key="profile_trace_download")
+        summary = profiler.trace_summary()
+        if summary:
+            st.code(summary)
+
+
+def run():
+    """프로파일링 모드면 main() 전체를 측정하여 결과를 표시한 뒤, 실시간 모드면 다음 폴링까지 대기"""
+    if st.session_state.get('profile_mode', PROFILE_DEFAULT):
+        trace = st.session_state.get('profile_trace', "없음")
+        profiler = Profiler(None if trace == "없음" else trace)
+        with profiler.activate():
+            refresh_in = main()
+        show_profile(profiler)
+    else:
+        refresh_in = main()
+    if refresh_in is not None:
+        live_refresh_countdown(refresh_in)
+
 
 if __name__ == "__main__":
-    main()
+    run()
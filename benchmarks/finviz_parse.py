@@ -0,0 +1,143 @@
+"""
+Finviz quote 페이지 파싱 처리량 비교
+
+예)
+    # 저장한 quote 페이지(*.html) 로 비교
+    python benchmarks/finviz_parse.py --pages saved_pages/
+    # 저장한 페이지가 없으면 비슷한 크기의 합성 페이지 사용
+    python benchmarks/finviz_parse.py --synthetic 200 --workers 4
+
+- 기존: 페이지 전체를 BeautifulSoup(html.parser) 로 파싱한 뒤 snapshot-table2 탐색
+- 백엔드별: snapshot-table2 구간만 잘라서 selectolax / lxml / bs4 로 파싱
+- 프로세스 풀: FINVIZ_PARSE_WORKERS 와 같은 방식으로 구간 파싱을 프로세스 풀에서 실행
+모든 방식의 결과가 기존 방식과 같은지도 확인
+페이지 저장 예: curl -A "Mozilla/5.0" "https://finviz.com/quote.ashx?t=AAPL" -o saved_pages/AAPL.html
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import finviz_parse  # noqa: E402
+
+LABELS = [
+    "Index", "P/E", "EPS (ttm)", "Insider Own", "Shs Outstand", "Perf Week", "Market Cap", "Forward P/E",
+    "EPS next Y", "Insider Trans", "Shs Float", "Perf Month", "Income", "PEG", "EPS next Q", "Inst Own",
+    "Short Float", "Perf Quarter", "Sales", "P/S", "EPS this Y", "Inst Trans", "Short Ratio", "Perf Half Y",
+    "Book/sh", "P/B", "ROA", "Target Price", "Perf Year", "Cash/sh", "P/C", "ROE", "52W Range", "Perf YTD",
+    "Dividend", "P/FCF", "ROI", "52W High", "Beta", "Employees", "Quick Ratio", "Gross Margin", "52W Low",
+    "ATR", "Current Ratio", "Oper. Margin", "RSI (14)", "Volatility", "Debt/Eq", "Profit Margin",
+    "Rel Volume", "Prev Close", "LT Debt/Eq", "Earnings", "Payout", "Avg Volume", "Price", "SMA20",
+    "SMA50", "SMA200", "Volume", "Change",
+]
+
+
+def synthetic_page(seed, filler_kb=400):
+    """quote 페이지와 비슷한 구조/크기의 HTML (앞뒤로 큰 마크업, style 안에도 클래스 이름 포함)"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(0, len(LABELS), 6):
+        cells = []
+        for label in LABELS[i:i + 6]:
+            value = f"{rng.uniform(-50, 500):.2f}" + rng.choice(["", "%", "B", "*"])
+            cells.append(
+                f'<td class="snapshot-td2 cursor-pointer w-[7%]" align="left">'
+                f'<div class="snapshot-td-label">{label}</div></td>'
+                f'<td class="snapshot-td2 w-[8%]" align="left"><b><span class="color-text is-positive">'
+                f'{value}</span></b></td>'
+            )
+        rows.append(f'<tr class="table-dark-row">{"".join(cells)}</tr>')
+    table = (
+        '<table width="100%" cellpadding="3" cellspacing="0" '
+        f'class="js-snapshot-table snapshot-table2 screener_snapshot-table-body">{"".join(rows)}</table>'
+    )
+    block = '<div class="content"><a href="/news?id={0}">headline {0}</a><span>text</span></div>\n'
+    filler = "".join(block.format(i) for i in range(filler_kb * 1024 // (2 * len(block))))
+    return (
+        "<html><head><style>.snapshot-table2 td { padding: 2px; }</style>"
+        f"<script>var data = {{}};</script></head><body>{filler}"
+        f'<table class="fullview-title"><tr><td>Title</td></tr></table>{table}{filler}</body></html>'
+    )
+
+
+def legacy_parse(html):
+    """기존 방식: 페이지 전체를 파싱"""
+    from bs4 import BeautifulSoup
+
+    table = BeautifulSoup(html, "html.parser").find("table", {"class": "snapshot-table2"})
+    if table is None:
+        return None
+    cells = table.find_all("td")
+    return {cells[i].get_text(strip=True): cells[i + 1].get_text(strip=True) for i in range(0, len(cells) - 1, 2)}
+
+
+def throughput(fn, pages, repeat):
+    """초당 처리 페이지 수 (가장 빠른 회차 기준)"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(pages)
+        best = min(best, time.perf_counter() - started)
+    return len(pages) / best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Finviz snapshot-table2 파싱 처리량 비교")
+    parser.add_argument("--pages", help="저장한 quote 페이지(*.html) 디렉터리")
+    parser.add_argument("--synthetic", type=int, default=50, help="저장한 페이지가 없을 때 만들 합성 페이지 수")
+    parser.add_argument("--workers", type=int, default=4, help="프로세스 풀 크기 (0 = 건너뜀)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-legacy", action="store_true", help="기존 전체 파싱 측정 생략 (느림)")
+    args = parser.parse_args(argv)
+
+    if args.pages:
+        paths = sorted(glob.glob(os.path.join(args.pages, "*.html")))
+        pages = [open(p, encoding="utf-8", errors="replace").read() for p in paths]
+        source = f"저장 페이지 {len(pages)}개 ({args.pages})"
+    else:
+        pages = [synthetic_page(i) for i in range(args.synthetic)]
+        source = f"합성 페이지 {len(pages)}개"
+    if not pages:
+        sys.exit("페이지가 없습니다")
+    print(f"{source}, 평균 {sum(map(len, pages)) / len(pages) / 1024:.0f} KB")
+
+    backends = finviz_parse.available_backends()
+    expected = [legacy_parse(p) for p in pages]
+    for backend in backends:
+        same = all(finviz_parse.parse_snapshot(p, backend) == e for p, e in zip(pages, expected))
+        print(f"  {backend:<11} 결과 일치: {'예' if same else '아니오'}")
+
+    results = {}
+    if not args.skip_legacy:
+        results["기존 (전체 bs4)"] = throughput(lambda ps: [legacy_parse(p) for p in ps], pages, args.repeat)
+    for backend in backends:
+        results[f"구간 + {backend}"] = throughput(
+            lambda ps, b=backend: [finviz_parse.parse_snapshot(p, b) for p in ps], pages, args.repeat
+        )
+
+    if args.workers > 0:
+        backend = finviz_parse.default_backend()
+        with ProcessPoolExecutor(args.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            # 작업 프로세스 시작/모듈 import 는 측정에서 제외
+            list(pool.map(finviz_parse.parse_fragment, ["<table></table>"] * args.workers))
+
+            def pooled(ps):
+                fragments = [finviz_parse.snapshot_fragment(p) for p in ps]
+                list(pool.map(finviz_parse.parse_fragment, fragments, [backend] * len(fragments), chunksize=8))
+
+            results[f"구간 + {backend} (프로세스 {args.workers}개)"] = throughput(pooled, pages, args.repeat)
+
+    baseline = next(iter(results.values()))
+    print(f"{'방식':<32}{'페이지/초':>12}{'배율':>8}")
+    for name, rate in results.items():
+        print(f"{name:<32}{rate:>12.0f}{rate / baseline:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
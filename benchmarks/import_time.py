@@ -0,0 +1,92 @@
+"""
+모듈 import 시간 벤치마크 (python -X importtime 기반)
+
+예)
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --module engine --repeat 10 --budget-ms 800
+
+각 모듈을 새 인터프리터에서 --repeat 번 import 하여 중간값을 보고하고,
+시작 시 로드되면 안 되는 무거운 의존성(HEAVY_MODULES)이 로드되었는지 확인
+--budget-ms 를 넘거나 무거운 의존성이 로드되면 종료 코드 1
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = ["app", "engine", "charts"]
+
+# 해당 코드 경로에서만 로드되어야 하는 의존성
+# (plotly.graph_objects 는 streamlit 이 먼저 import 하며, 내부 클래스는 지연 로드됨)
+HEAVY_MODULES = ["plotly.express", "plotly.subplots", "yfinance", "bs4", "lxml.html", "selectolax.lexbor", "cloudscraper"]
+
+
+def parse_importtime(stderr):
+    """-X importtime 출력 → [(모듈명, self_us, cumulative_us, depth)]"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        parts = line.split("|", 2)
+        if len(parts) != 3:
+            continue
+        self_us, cumulative_us, name = parts
+        self_us = int(self_us.replace("import time:", "").strip())
+        stripped = name.lstrip(" ")
+        depth = (len(name) - len(stripped) - 1) // 2
+        rows.append((stripped, self_us, int(cumulative_us.strip()), depth))
+    return rows
+
+
+def measure(module):
+    code = f"import sys; sys.path.insert(0, {ROOT!r}); import {module}"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=ROOT,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} 실패:\n{proc.stderr[-2000:]}")
+    return parse_importtime(proc.stderr)
+
+
+def report(module, repeat, top):
+    totals = []
+    rows = []
+    for _ in range(repeat):
+        rows = measure(module)
+        totals.append(next(cum for name, _, cum, depth in rows if name == module and depth == 0) / 1000)
+
+    loaded = {name for name, _, _, _ in rows}
+    heavy = [m for m in HEAVY_MODULES if m in loaded]
+
+    print(f"\n== import {module}: 중간값 {statistics.median(totals):.0f} ms "
+          f"(최소 {min(totals):.0f}, 최대 {max(totals):.0f}, {repeat}회)")
+    print(f"   상위 {top}개 (직접 import 한 모듈, cumulative):")
+    for name, _, cum, _ in sorted((r for r in rows if r[3] == 1), key=lambda r: -r[2])[:top]:
+        print(f"   {cum / 1000:8.1f} ms  {name}")
+    if heavy:
+        print(f"   ⚠ 시작 시 로드된 무거운 의존성: {', '.join(heavy)}")
+    return statistics.median(totals), heavy
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="모듈 import 시간 벤치마크")
+    parser.add_argument("--module", action="append", help="측정할 모듈 (여러 번 지정 가능)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=None, help="모듈별 허용 import 시간")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.module or DEFAULT_MODULES:
+        median_ms, heavy = report(module, args.repeat, args.top)
+        if heavy or (args.budget_ms is not None and median_ms > args.budget_ms):
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
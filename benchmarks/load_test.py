@@ -0,0 +1,200 @@
+"""
+동시 세션 부하 테스트: Streamlit AppTest 세션 N개 + 로컬 Yahoo/Finviz stub 서버
+
+예)
+    python benchmarks/load_test.py --sessions 8 --latency 0.02
+    python benchmarks/load_test.py --sessions 4 --tickers 500 --vary-start
+
+- Streamlit 서버와 마찬가지로 한 프로세스에서 세션마다 스레드로 실행 (st.cache_data / SWR 캐시 공유)
+- 세션 시나리오: 첫 실행 → 분석 시작 → 종목 선택(상세 차트) → 트렌드 탭 위젯 조작 → 히트맵 탭 위젯 조작
+  탭 전환은 브라우저 안에서만 일어나고 rerun 이 없으므로 탭마다 위젯을 조작해 그 탭의 rerun 비용을 측정
+- 동작별 rerun 지연 p50/p95/최대와 세션을 모두 유지한 상태의 RSS 증가량(세션당)을 출력
+- 디스크 캐시(체크포인트/HTTP/공유 캐시)는 임시 디렉터리를 사용하므로 실제 .cache 에 stub 데이터가 섞이지 않음
+"""
+import argparse
+import gc
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import stub_server  # noqa: E402
+
+APP = os.path.join(ROOT, "app.py")
+
+
+def rss_mb():
+    """현재 RSS (MB) - /proc 가 없으면 최대 RSS 로 대신함"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def synthetic_universe(n_tickers):
+    """기본 포트폴리오의 팀/자산/섹터 구성을 반복해 티커 n 개짜리 CSV 생성"""
+    import engine
+
+    base = engine.load_universe()
+    rows = ["팀,자산,섹터,기업명,티커"]
+    for i in range(n_tickers):
+        row = base.iloc[i % len(base)]
+        rows.append(f"{row['팀']},{row['자산']},{row['섹터']},Synthetic {i},T{i:04d}")
+    return "\n".join(rows)
+
+
+def share_runtime():
+    """
+    AppTest 는 run 마다 가짜 Runtime 싱글턴을 설정하고 끝나면 None 으로 되돌리므로
+    동시에 실행 중인 다른 세션이 Runtime 을 잃지 않도록 마지막으로 설정된 것을 계속 사용
+    """
+    from streamlit.runtime import Runtime
+
+    last = [None]
+
+    def instance(cls):
+        if cls._instance is not None:
+            last[0] = cls._instance
+        if last[0] is None:
+            raise RuntimeError("Runtime hasn't been created!")
+        return last[0]
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or last[0] is not None)
+
+
+def scenario(at, ticker, start):
+    """(동작 이름, 위젯 조작) - 조작 후 at.run() 한 번이 측정 단위"""
+    yield "첫 실행", lambda: None
+    yield "분석 시작", lambda: (
+        at.date_input(key="start").set_value(start),
+        next(b for b in at.sidebar.button if "분석 시작" in b.label).click(),
+    )
+    yield "종목 선택", lambda: at.session_state.__setitem__("selected_ticker", ticker)
+    yield "지수 가중 방식", lambda: at.radio(key="index_weighting").set_value("동일 가중")
+    yield "섹터 차트 펼치기", lambda: next(t for t in at.toggle if t.key.startswith("sector_grid_")).set_value(True)
+    yield "히트맵 유형", lambda: at.radio(key="heatmap_type").set_value("일일변동률")
+    yield "히트맵 필터", lambda: at.selectbox(key="heatmap_filter").set_value("팀별")
+
+
+def run_session(index, args, tickers, timings, errors, sessions):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP, default_timeout=args.timeout)
+    start = date.today() - timedelta(days=args.days + (index * 7 if args.vary_start else 0))
+    ticker = tickers[index % len(tickers)]
+    for name, action in scenario(at, ticker, start):
+        try:
+            action()
+            started = time.perf_counter()
+            at.run()
+            timings.setdefault(name, []).append(time.perf_counter() - started)
+            if at.exception:
+                errors.append(f"세션 {index} {name}: {at.exception[0].value}")
+        except Exception as e:
+            errors.append(f"세션 {index} {name}: {type(e).__name__}: {e}")
+            break
+    sessions[index] = at
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="대시보드 동시 세션 부하 테스트")
+    parser.add_argument("--sessions", type=int, default=4, help="동시 세션 수")
+    parser.add_argument("--ramp", type=float, default=0.0, help="세션 시작 간격(초)")
+    parser.add_argument("--tickers", type=int, default=0, help="합성 universe 종목 수 (0 이면 기본 포트폴리오)")
+    parser.add_argument("--days", type=int, default=90, help="분석 기간(일)")
+    parser.add_argument("--vary-start", action="store_true", help="세션마다 시작일을 1주씩 다르게 (캐시 공유 없음)")
+    parser.add_argument("--latency", type=float, default=0.02, help="stub 응답 지연(초)")
+    parser.add_argument("--page-kb", type=int, default=100, help="stub quote 페이지 크기(KB)")
+    parser.add_argument("--timeout", type=float, default=600, help="rerun 한 번의 제한 시간(초)")
+    args = parser.parse_args(argv)
+
+    server, url = stub_server.start(latency=args.latency, page_kb=args.page_kb)
+    os.environ["YAHOO_BASE_URL"] = url
+    os.environ["FINVIZ_BASE_URL"] = url
+    os.environ["DASHBOARD_CACHE_DIR"] = tempfile.mkdtemp(prefix="dashboard_load_")
+    os.environ.pop("SHARED_CACHE_DB", None)
+
+    # base URL / 캐시 위치는 import 시점에 읽으므로 환경 변수 설정 후 import
+    import engine
+
+    if args.tickers:
+        engine.PORTFOLIO_CSV = synthetic_universe(args.tickers)
+    tickers = list(engine.load_universe()['티커'])
+    print(f"stub: {url} (지연 {args.latency * 1000:.0f}ms)  종목 {len(tickers)}개  세션 {args.sessions}개"
+          f"  캐시 {os.environ['DASHBOARD_CACHE_DIR']}")
+
+    share_runtime()
+    # 세션 밖에서 쓰는 session_state 에 대한 경고는 무시
+    logging.getLogger("streamlit.runtime.scriptrunner.script_run_context").setLevel(logging.ERROR)
+
+    # 모듈 import 비용이 세션당 메모리에 섞이지 않도록 한 번 실행한 뒤 기준 RSS 측정
+    from streamlit.testing.v1 import AppTest
+
+    AppTest.from_file(APP, default_timeout=args.timeout).run()
+    gc.collect()
+    baseline = rss_mb()
+    timings, errors, sessions = {}, [], [None] * args.sessions
+    threads = []
+    wall = time.perf_counter()
+    for i in range(args.sessions):
+        thread = threading.Thread(target=run_session, args=(i, args, tickers, timings, errors, sessions))
+        thread.start()
+        threads.append(thread)
+        if args.ramp:
+            time.sleep(args.ramp)
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - wall
+    gc.collect()
+    after = rss_mb()
+
+    print(f"\n{'동작':<14}{'횟수':>6}{'p50(ms)':>10}{'p95(ms)':>10}{'최대(ms)':>10}")
+    every = []
+    for name, _ in scenario(None, None, None):
+        values = timings.get(name, [])
+        every += values
+        if values:
+            print(f"{name:<14}{len(values):>6}{percentile(values, 50) * 1000:>10.0f}"
+                  f"{percentile(values, 95) * 1000:>10.0f}{max(values) * 1000:>10.0f}")
+    if every:
+        print(f"{'전체':<14}{len(every):>6}{percentile(every, 50) * 1000:>10.0f}"
+              f"{percentile(every, 95) * 1000:>10.0f}{max(every) * 1000:>10.0f}")
+
+    kept = [at for at in sessions if at is not None and 'results' in at.session_state]
+    footprint = [
+        engine.session_footprint(at.session_state['results'], at.session_state['result_df'])['total']
+        for at in kept
+    ]
+    print(f"\n전체 시간: {wall:.1f}s  (세션당 rerun 합계 평균 {sum(every) / args.sessions:.1f}s)")
+    print(f"RSS: 시작 {baseline:.0f}MB → 종료 {after:.0f}MB"
+          f"  (세션당 +{(after - baseline) / args.sessions:.1f}MB, 세션 {len(kept)}개 유지 중)")
+    if footprint:
+        print(f"세션 분석 결과 크기: 평균 {statistics.mean(footprint) / 2 ** 20:.1f}MB")
+    print(f"stub 요청: {dict(sorted(server.RequestHandlerClass.counts.items()))}")
+    if errors:
+        print(f"\n오류 {len(errors)}건:")
+        for error in errors[:20]:
+            print(f"  {error}")
+    server.shutdown()
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+세션 메모리 사용량 비교: 기존 데이터 모델 vs compact dtype 데이터 모델
+
+예)
+    python benchmarks/memory_footprint.py --tickers 200 --days 252
+
+합성 주가로 engine.analyze_row 를 실행해 compact 결과를 만들고,
+같은 결과를 기존 모델(float64/int64 OHLCV, "-" 가 섞인 object 컬럼)로 변환하여 비교
+"""
+import argparse
+import os
+import sys
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine  # noqa: E402
+
+
+def synthetic_prices(n_days, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.02, n_days))
+    index = pd.bdate_range(end=date.today(), periods=n_days, name='Date')
+    return pd.DataFrame({
+        'Open': close.astype(engine.PRICE_DTYPE),
+        'High': (close * 1.01).astype(engine.PRICE_DTYPE),
+        'Low': (close * 0.99).astype(engine.PRICE_DTYPE),
+        'Close': close.astype(engine.PRICE_DTYPE),
+        'Volume': engine.compact_volume(rng.integers(1e5, 5e7, n_days)),
+    }, index=index)
+
+
+def compact_results(n_tickers, n_days):
+    universe = engine.load_universe()
+    universe = pd.concat([universe] * (n_tickers // len(universe) + 1), ignore_index=True).head(n_tickers)
+    universe['티커'] = [f"T{i:04d}" for i in range(n_tickers)]
+    prices = {t: synthetic_prices(n_days, i) for i, t in enumerate(universe['티커'])}
+
+    # 네트워크 없이 실행하도록 fetcher 를 합성 데이터로 교체
+    engine.get_stock_data = lambda ticker, start, end: prices[ticker]
+    engine.get_market_cap = lambda ticker: "15.5B"
+    engine.get_finviz_snapshot = lambda ticker: {"Debt/Eq": "0.5", "Current Ratio": "0.5", "ROE": "-"}
+    engine.get_finviz_data = lambda ticker, statement, item: -120.0 if item == "Free Cash Flow" else 800.0
+
+    start = date.today() - timedelta(days=n_days)
+    return [engine.analyze_row(row, start, date.today()) for _, row in universe.iterrows()]
+
+
+def to_legacy(results):
+    """compact 결과 → 기존 모델 (float64/int64 가격, "-" 센티넬, object 지표 컬럼)"""
+    legacy = []
+    for r in results:
+        r = dict(r)
+        if r['price_data'] is not None:
+            price = r['price_data'].astype({c: np.float64 for c in ['Open', 'High', 'Low', 'Close']})
+            r['price_data'] = price.astype({'Volume': np.int64})
+            r['daily_changes'] = r['daily_changes'].astype(np.float64)
+            r['cumulative_returns'] = r['cumulative_returns'].astype(np.float64)
+        for col in engine.NUMERIC_COLUMNS:
+            r[col] = "-" if pd.isna(r[col]) else r[col]
+        legacy.append(r)
+    return legacy, pd.DataFrame(legacy)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="세션 메모리 사용량 비교")
+    parser.add_argument("--tickers", type=int, default=200)
+    parser.add_argument("--days", type=int, default=252)
+    args = parser.parse_args(argv)
+
+    results = compact_results(args.tickers, args.days)
+    compact = engine.session_footprint(results, engine.result_frame(results))
+    legacy_results, legacy_df = to_legacy(results)
+    legacy = engine.session_footprint(legacy_results, legacy_df)
+
+    print(f"{args.tickers}개 종목 × {args.days}일")
+    print(f"{'항목':<12}{'기존(KB)':>12}{'compact(KB)':>14}{'감소':>8}")
+    for key in ('price_data', 'series', 'table', 'total'):
+        before, after = legacy[key] / 1024, compact[key] / 1024
+        print(f"{key:<12}{before:>12.0f}{after:>14.0f}{1 - after / before:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+롤링 통계 비교: 종목별 pandas rolling vs 행렬 O(n) 계산 vs 새 봉 1개 증분 갱신
+
+예)
+    python benchmarks/rolling_stats.py --tickers 200 --days 756 --window 20
+
+- pandas: 종목(Series)마다 rolling().mean()/std()/min()/max() 와 ewm RSI 를 새로 계산 (기존 방식)
+- 행렬: rolling.RollingStats 로 전체 종목을 한 번에 계산
+- 증분: 계산된 RollingStats 에 새 봉 1개를 추가 (update)
+세 방식의 결과가 같은지도 확인
+"""
+import argparse
+import copy
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rolling import ROLLING_FIELDS, RollingStats  # noqa: E402
+
+
+def synthetic_close(n_tickers, n_days, seed=0):
+    rng = np.random.default_rng(seed)
+    values = 100 * np.cumprod(1 + rng.normal(0, 0.02, (n_days, n_tickers)), axis=0)
+    index = pd.bdate_range(end="2025-12-31", periods=n_days, name='Date')
+    return pd.DataFrame(values, index=index, columns=[f"T{i:04d}" for i in range(n_tickers)])
+
+
+def pandas_stats(close, window, rsi_period):
+    """종목마다 pandas 로 계산 (앱이 차트를 볼 때마다 하던 방식)"""
+    stats = {name: {} for name in ROLLING_FIELDS}
+    for ticker in close.columns:
+        series = close[ticker]
+        rolling = series.rolling(window)
+        mean, std = rolling.mean(), rolling.std()
+        delta = series.diff()
+        gain = delta.clip(lower=0).ewm(alpha=1 / rsi_period, adjust=False, min_periods=rsi_period).mean()
+        loss = (-delta).clip(lower=0).ewm(alpha=1 / rsi_period, adjust=False, min_periods=rsi_period).mean()
+        stats['평균'][ticker] = mean
+        stats['표준편차'][ticker] = std
+        stats['Z-score'][ticker] = (series - mean) / std
+        stats['최소'][ticker] = rolling.min()
+        stats['최대'][ticker] = rolling.max()
+        stats['RSI'][ticker] = 100 - 100 / (1 + gain / loss)
+    return {name: pd.DataFrame(data) for name, data in stats.items()}
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="롤링 통계 계산 시간 비교")
+    parser.add_argument("--tickers", type=int, default=200)
+    parser.add_argument("--days", type=int, default=756)
+    parser.add_argument("--window", type=int, default=20)
+    parser.add_argument("--rsi", type=int, default=14)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    close = synthetic_close(args.tickers, args.days + 1)
+    history, latest = close.iloc[:-1], close
+
+    expected = pandas_stats(latest, args.window, args.rsi)
+    stats = RollingStats(history, args.window, args.rsi)
+    stats.update(latest)
+    for name in ROLLING_FIELDS:
+        diff = np.nanmax(np.abs(stats.frame(name).to_numpy() - expected[name].to_numpy()))
+        print(f"  {name:<8} 최대 오차 {diff:.2e}")
+
+    # update 는 상태를 바꾸므로 반복마다 복사본 사용 (복사 시간은 제외)
+    base = RollingStats(history, args.window, args.rsi)
+    copies = [copy.deepcopy(base) for _ in range(args.repeat)]
+
+    timings = {
+        "pandas (종목별)": best_of(lambda: pandas_stats(close, args.window, args.rsi), args.repeat),
+        "행렬 (전체)": best_of(lambda: RollingStats(close, args.window, args.rsi), args.repeat),
+        "증분 (새 봉 1개)": best_of(lambda: copies.pop().update(latest), args.repeat),
+    }
+
+    print(f"{args.tickers}개 종목 × {args.days}일, 구간 {args.window}일, RSI {args.rsi}일")
+    baseline = timings["pandas (종목별)"]
+    for name, seconds in timings.items():
+        print(f"  {name:<14}{seconds * 1000:>10.1f} ms{baseline / seconds:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Yahoo chart API / Finviz quote·statement 로컬 stub 서버 (부하 테스트용)
+
+예)
+    python benchmarks/stub_server.py --port 8765 --latency 0.05
+    YAHOO_BASE_URL=http://127.0.0.1:8765 FINVIZ_BASE_URL=http://127.0.0.1:8765 streamlit run app.py
+
+- 모든 티커에 대해 티커별로 고정된 합성 데이터를 응답 (같은 요청은 항상 같은 응답)
+- 응답마다 --latency 초 지연, gzip 요청이면 압축, ETag 가 같으면 304
+- quote 페이지는 실제 페이지와 비슷한 크기(약 --page-kb KB)로 snapshot-table2 앞뒤에 마크업을 채움
+- DEAD 로 시작하는 티커는 상장폐지 종목처럼 모든 엔드포인트가 404 (격리 동작 확인용)
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DEAD_PREFIX = "DEAD"
+
+SNAPSHOT_LABELS = ["Market Cap", "Debt/Eq", "Current Ratio", "ROE", "P/E", "Beta", "Employees", "Volume"]
+
+
+def _rng(*parts):
+    return random.Random(zlib.crc32("|".join(map(str, parts)).encode()))
+
+
+def chart_payload(ticker, query):
+    """일봉(period1~period2) 또는 당일 장중 봉(range=1d) 합성 데이터"""
+    interval = query.get("interval", ["1d"])[0]
+    if "range" in query:
+        end = int(time.time())
+        step = {"5m": 300, "15m": 900, "1h": 3600}.get(interval, 300)
+        start = end - end % 86400 + 13 * 3600 + 1800
+        timestamps = list(range(start, max(start + step, end), step))
+    else:
+        step = 86400
+        start, end = int(query["period1"][0]), int(query["period2"][0])
+        timestamps = [t for t in range(start - start % step + 14 * 3600, end, step)
+                      if datetime.fromtimestamp(t, timezone.utc).weekday() < 5]
+    # 봉 구간별로 고정된 수익률 (시작 가격은 티커별 고정)
+    price = 20 + _rng(ticker).random() * 300
+    closes = []
+    for t in timestamps:
+        price *= 1 + _rng(ticker, t // step).gauss(0, 0.02)
+        closes.append(round(price, 4))
+    quote = {
+        "open": closes, "close": closes,
+        "high": [round(c * 1.01, 4) for c in closes], "low": [round(c * 0.99, 4) for c in closes],
+        "volume": [_rng(ticker, t).randint(10 ** 5, 5 * 10 ** 7) for t in timestamps],
+    }
+    return {"chart": {"result": [{"timestamp": timestamps, "indicators": {"quote": [quote]}}], "error": None}}
+
+
+def quote_page(ticker, page_kb):
+    rng = _rng(ticker, "quote")
+    values = {
+        "Market Cap": f"{rng.uniform(0.1, 900):.2f}B", "Debt/Eq": f"{rng.uniform(0, 3):.2f}",
+        "Current Ratio": f"{rng.uniform(0.2, 8):.2f}", "ROE": f"{rng.uniform(-80, 60):.2f}%",
+        "P/E": f"{rng.uniform(5, 90):.2f}", "Beta": f"{rng.uniform(0.2, 3):.2f}",
+        "Employees": f"{rng.randint(10, 200000):,}", "Volume": f"{rng.randint(10 ** 5, 10 ** 8):,}",
+    }
+    cells = "".join(
+        f'<td class="snapshot-td2" align="left"><div class="snapshot-td-label">{label}</div></td>'
+        f'<td class="snapshot-td2" align="left"><b>{values[label]}</b></td>'
+        for label in SNAPSHOT_LABELS
+    )
+    block = '<div class="content"><a href="/news?id={0}">headline {0}</a><span>text</span></div>\n'
+    filler = "".join(block.format(i) for i in range(page_kb * 1024 // (2 * len(block))))
+    return (
+        f"<html><head><title>{ticker}</title></head><body>{filler}"
+        f'<table class="js-snapshot-table snapshot-table2"><tr>{cells}</tr></table>{filler}</body></html>'
+    )
+
+
+def statement_payload(ticker, statement):
+    rng = _rng(ticker, statement)
+    return {"data": {
+        "Cash & Short Term Investments": [f"{rng.uniform(10, 5000):.2f}"] * 8,
+        "Free Cash Flow": [f"{rng.uniform(-900, 900):.2f}"] * 8,
+    }}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    page_kb = 100
+    protocol_version = "HTTP/1.1"
+    counts = {}
+    counts_lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _count(self, name):
+        with self.counts_lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        ticker = query.get("t", [url.path.rsplit("/", 1)[-1]])[0]
+        if url.path.startswith("/v8/finance/chart/"):
+            name, body, content_type = "chart", json.dumps(chart_payload(ticker, query)), "application/json"
+        elif url.path == "/quote.ashx":
+            name, body, content_type = "quote", quote_page(ticker, self.page_kb), "text/html; charset=utf-8"
+        elif url.path == "/api/statement.ashx":
+            name, body, content_type = "statement", json.dumps(statement_payload(ticker, query["s"][0])), \
+                "application/json"
+        else:
+            self.send_error(404)
+            return
+        self._count(name)
+        if self.latency:
+            time.sleep(self.latency)
+
+        if ticker.startswith(DEAD_PREFIX):
+            body = json.dumps({"chart": {"result": None, "error": {
+                "code": "Not Found", "description": "No data found, symbol may be delisted"}}}).encode()
+            self.send_response(404)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        body = body.encode()
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            self._count("not_modified")
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("ETag", etag)
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, 1)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start(port=0, latency=0.0, page_kb=100):
+    """백그라운드 스레드에서 서버 시작 → (server, 기본 URL)"""
+    handler = type("Handler", (StubHandler,), {"latency": latency, "page_kb": page_kb, "counts": {}})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Yahoo/Finviz 로컬 stub 서버")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="응답 지연(초)")
+    parser.add_argument("--page-kb", type=int, default=100, help="quote 페이지 크기(KB)")
+    args = parser.parse_args(argv)
+    server, url = start(args.port, args.latency, args.page_kb)
+    print(f"stub 서버: {url}  (YAHOO_BASE_URL={url} FINVIZ_BASE_URL={url})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+캐시 관리 레이어
+- 모든 캐시(프로세스 전역 SWR 캐시, st.cache_data)를 이름으로 등록
+- 캐시별 항목 수/메모리 사용량 집계와 선택적 비우기
+streamlit 은 st.cache_data 용 데코레이터 안에서만 import (engine 은 streamlit 없이 동작)
+"""
+import functools
+import inspect
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def estimate_size(value):
+    """캐시 값의 대략적인 메모리 사용량 (bytes)"""
+    if value is None:
+        return 0
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (str, bytes)):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class LRUStore:
+    """
+    항목 수(max_entries)와 메모리(max_bytes) 한도가 있는 LRU 저장소
+    값과 함께 저장 시각, 크기를 보관
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._items = OrderedDict()  # key -> (value, stored_at, size)
+        self._bytes = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """(value, stored_at) 또는 None - 조회한 항목은 최근 사용으로 이동"""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            self._items.move_to_end(key)
+            return item[0], item[1]
+
+    def peek(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            return None if item is None else (item[0], item[1])
+
+    def put(self, key, value, stored_at=None, size=None):
+        size = estimate_size(value) if size is None else size
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._items[key] = (value, time.time() if stored_at is None else stored_at, size)
+            self._bytes += size
+            self._evict()
+
+    def _evict(self):
+        while self._items and (
+            (self.max_entries is not None and len(self._items) > self.max_entries)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes and len(self._items) > 1)
+        ):
+            _, (_, _, size) = self._items.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def pop(self, key):
+        with self._lock:
+            item = self._items.pop(key, None)
+            if item is not None:
+                self._bytes -= item[2]
+
+    def remove_where(self, predicate):
+        """predicate(key) 가 참인 항목 삭제, 삭제 수 반환"""
+        with self._lock:
+            keys = [k for k in self._items if predicate(k)]
+            for k in keys:
+                self._bytes -= self._items.pop(k)[2]
+            return len(keys)
+
+    def remove_older_than(self, max_age):
+        now = time.time()
+        return self.remove_where(lambda k: now - self._items[k][1] >= max_age)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+
+# -----------------------------
+# 캐시 레지스트리
+# -----------------------------
+_registry = OrderedDict()
+
+
+def register(cache):
+    """
+    cache 는 name, kind, store(LRUStore), clear(), purge_ticker(ticker) 를 제공
+    """
+    _registry[cache.name] = cache
+    return cache
+
+
+def registered():
+    return list(_registry.values())
+
+
+def memory_report():
+    """캐시별 항목 수/메모리 사용량 (DataFrame)"""
+    rows = []
+    for cache in _registry.values():
+        store = cache.store
+        rows.append({
+            "캐시": cache.name,
+            "종류": cache.kind,
+            "항목": len(store),
+            "최대 항목": store.max_entries,
+            "메모리(KB)": round(store.nbytes / 1024, 1),
+            "한도(MB)": round(store.max_bytes / 1024 / 1024, 1) if store.max_bytes else None,
+            "제거": store.evictions,
+        })
+    return pd.DataFrame(rows)
+
+
+def purge(names):
+    for name in names:
+        cache = _registry.get(name)
+        if cache is not None:
+            cache.clear()
+
+
+def purge_ticker(ticker):
+    """티커를 첫 번째 인자로 사용하는 모든 캐시 항목 삭제, 삭제 수 반환"""
+    return sum(cache.purge_ticker(ticker) for cache in _registry.values())
+
+
+def first_arg_is(ticker):
+    return lambda key: bool(key[0]) and key[0][0] == ticker
+
+
+# -----------------------------
+# st.cache_data 관리
+# -----------------------------
+class _StCache:
+    """
+    st.cache_data 함수의 메모리 집계
+    streamlit 캐시 내부는 공개 API 가 없으므로, 계산(miss) 시점의 결과 크기를
+    같은 max_entries/ttl 의 LRU 장부에 기록하여 근사
+    """
+
+    kind = "st.cache_data"
+
+    def __init__(self, name, max_entries, ttl):
+        self.name = name
+        self.ttl = ttl
+        self.store = LRUStore(max_entries=max_entries)
+        self.cached_func = None
+
+    def record(self, key, value):
+        if self.ttl is not None:
+            self.store.remove_older_than(self.ttl)
+        self.store.put(key, None, size=estimate_size(value))
+
+    def clear(self):
+        self.cached_func.clear()
+        self.store.clear()
+
+    def purge_ticker(self, ticker):
+        # st.cache_data 는 항목 단위 삭제를 지원하지 않으므로 해당 티커 항목이 있으면 전체 비우기
+        removed = self.store.remove_where(first_arg_is(ticker))
+        if removed:
+            self.clear()
+        return removed
+
+
+def governed_cache_data(max_entries, ttl=None, name=None):
+    """
+    st.cache_data(ttl, max_entries) + 메모리 집계/레지스트리 등록
+    '_' 로 시작하는 인자는 st.cache_data 와 마찬가지로 키에서 제외
+    """
+    import streamlit as st
+
+    def decorator(fn):
+        handle = _StCache(name or fn.__name__, max_entries, ttl)
+        params = list(inspect.signature(fn).parameters)
+
+        @functools.wraps(fn)
+        def accounted(*args, **kwargs):
+            value = fn(*args, **kwargs)
+            key_args = tuple(a for p, a in zip(params, args) if not p.startswith("_"))
+            key_kwargs = tuple(sorted((k, v) for k, v in kwargs.items() if not k.startswith("_")))
+            handle.record((key_args, key_kwargs), value)
+            return value
+
+        cached = st.cache_data(ttl=ttl, max_entries=max_entries)(accounted)
+        handle.cached_func = cached
+        register(handle)
+        return cached
+
+    return decorator
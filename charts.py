@@ -0,0 +1,304 @@
+import hashlib
+import json
+
+import numpy as np
+import streamlit as st
+
+from cache_registry import governed_cache_data
+
+# plotly 는 import 비용이 크므로 figure 를 실제로 만드는 함수 안에서 import
+
+# 크기 조정 상수
+SCALE = 0.75
+
+# 섹터별 subplot 그리드 열 개수
+GRID_COLS = 5
+
+# 히트맵 표시 방식 (전체 종목은 HEATMAP_MAX_ROWS 행까지)
+HEATMAP_ALL = "전체 종목"
+HEATMAP_TOP = "상위 N"
+HEATMAP_GROUPED = "섹터 집계"
+HEATMAP_MODES = [HEATMAP_ALL, HEATMAP_TOP, HEATMAP_GROUPED]
+HEATMAP_MAX_ROWS = 300
+
+# 상관계수 히트맵 최대 종목 수 (셀 수가 종목 수의 제곱)
+CORRELATION_MAX_TICKERS = 60
+
+
+# -----------------------------
+# 공통 유틸
+# -----------------------------
+def results_fingerprint(result_df):
+    """
+    분석 결과의 지문(fingerprint) 생성
+    티커 목록과 각 종목의 누적수익률 시계열이 같으면 같은 값을 반환
+    """
+    h = hashlib.md5()
+    for _, row in result_df.iterrows():
+        h.update(str(row['티커']).encode())
+        series = row['cumulative_returns']
+        if series is None:
+            h.update(b"-")
+            continue
+        h.update(np.asarray(series.index.asi8).tobytes())
+        h.update(np.nan_to_num(np.asarray(series.values, dtype=float)).tobytes())
+    return h.hexdigest()
+
+
+def sign_colors(values):
+    """양수/0은 green, 음수는 red 인 색상 배열 (marker_color 용)"""
+    return np.where(np.asarray(values) >= 0, 'green', 'red')
+
+
+def zero_line_shape(axis_index=1):
+    """
+    subplot 축 번호에 해당하는 y=0 점선 shape
+    add_hline 을 subplot 마다 호출하는 대신 layout.shapes 배열로 한 번에 설정
+    """
+    suffix = "" if axis_index == 1 else str(axis_index)
+    return dict(
+        type="line",
+        xref=f"x{suffix} domain", x0=0, x1=1,
+        yref=f"y{suffix}", y0=0, y1=0,
+        line=dict(dash="dash", color="gray"),
+    )
+
+
+# st.plotly_chart 에 figure 를 넘기면 rerun 마다 plotly Figure 를 다시 만들고 검증한 뒤 직렬화하므로
+# 캐시된 JSON 을 그대로 PlotlyChart 메시지에 담아 보냄 (st.plotly_chart(sharing="streamlit") 와 같은 메시지)
+# streamlit 내부 구현(proto 필드, _enqueue)에 의존하므로 확인한 버전에서만 사용하고 그 외에는 공개 API 사용
+# (tests/test_charts.py 가 두 경로의 메시지가 같은지 확인)
+DIRECT_PLOTLY_VERSIONS = ("1.31.",)
+_PLOTLY_CONFIG = json.dumps({"showLink": False, "linkText": False})
+
+
+def direct_plotly_supported():
+    """설치된 streamlit 에서 PlotlyChart 메시지를 직접 보낼 수 있는지"""
+    if not st.__version__.startswith(DIRECT_PLOTLY_VERSIONS):
+        return False
+    try:
+        from streamlit.proto.PlotlyChart_pb2 import PlotlyChart
+    except ImportError:
+        return False
+    fields = set(PlotlyChart.DESCRIPTOR.fields_by_name)
+    return {"use_container_width", "figure", "theme"} <= fields and hasattr(st._main, "_enqueue")
+
+
+DIRECT_PLOTLY = direct_plotly_supported()
+
+
+def show_figure(fig_json):
+    """캐시된 직렬화 figure 표시 (확인한 streamlit 버전에서는 Figure 재생성/검증 없이 JSON 그대로 전송)"""
+    if not DIRECT_PLOTLY:
+        st.plotly_chart(json.loads(fig_json), use_container_width=True)
+        return
+    from streamlit.proto.PlotlyChart_pb2 import PlotlyChart
+
+    proto = PlotlyChart()
+    proto.use_container_width = True
+    proto.figure.spec = fig_json
+    proto.figure.config = _PLOTLY_CONFIG
+    proto.theme = "streamlit"
+    st._main._enqueue("plotly_chart", proto)
+
+
+# -----------------------------
+# 트렌드 탭 figure (results 지문 + 지수 산출 방식 단위 캐시)
+# -----------------------------
+@governed_cache_data(max_entries=20)
+def build_team_return_figure(fingerprint, weighting, rebalance, _indices):
+    """청팀 vs 백팀 지수 누적수익률 비교 (시장 전체 지수 포함)"""
+    import plotly.graph_objects as go
+
+    if not _indices:
+        return None
+    teams = _indices['팀'] - 100
+    total = _indices['전체'] - 100
+
+    fig = go.Figure()
+    for team in teams.columns:
+        fig.add_trace(go.Scatter(x=teams.index, y=teams[team].values, mode='lines', name=f"{team} 지수"))
+    fig.add_trace(go.Scatter(x=total.index, y=total.values,
+                             mode='lines', name="시장 전체 지수",
+                             line=dict(width=max(int(3 * SCALE), 1), dash='dot', color='red')))
+    fig.update_layout(title=f"청팀 vs 백팀 누적수익률 비교 ({weighting}, 리밸런싱 {rebalance})",
+                      height=int(500 * SCALE),
+                      hovermode='x unified',
+                      shapes=[zero_line_shape()])
+    return fig.to_json()
+
+
+@governed_cache_data(max_entries=40)
+def build_group_line_figure(fingerprint, group_column, value_column, weighting, rebalance, _indices):
+    """
+    그룹(팀/섹터)별 지수 라인 차트
+    value_column: 'daily_changes' (지수 일간 변동률) / 'cumulative_returns' (지수 누적변동률)
+    """
+    import plotly.graph_objects as go
+
+    if not _indices:
+        return None
+    nav = _indices[group_column]
+    if value_column == 'daily_changes':
+        group_data = (nav.pct_change() * 100).iloc[1:]
+    else:
+        group_data = nav - 100
+
+    fig = go.Figure()
+    for group in group_data.columns:
+        fig.add_trace(go.Scatter(
+            x=group_data.index,
+            y=group_data[group].values,
+            mode='lines',
+            name=group,
+            line=dict(width=max(int(2 * SCALE), 1))
+        ))
+
+    if group_column == '팀':
+        fig.update_layout(
+            title=f"청팀 vs 백팀 지수 변동률 비교 ({weighting})",
+            xaxis_title="날짜",
+            yaxis_title="지수 변동률 (%)",
+            height=int(500 * SCALE),
+            hovermode='x unified',
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+        )
+    else:
+        fig.update_layout(
+            title=f"섹터별 지수 누적변동률 비교 ({weighting}, 리밸런싱 {rebalance})",
+            xaxis_title="날짜",
+            yaxis_title="지수 누적변동률 (%)",
+            height=int(1000 * SCALE),
+            hovermode='x unified',
+            legend=dict(orientation="v", yanchor="top", y=1, xanchor="left", x=1.02)
+        )
+    fig.update_layout(shapes=[zero_line_shape()])
+    return fig.to_json()
+
+
+@governed_cache_data(max_entries=300)
+def build_sector_grid_figure(fingerprint, sector, y_min, y_max, _result_df):
+    """섹터별 개별 종목 누적변동률 subplot 그리드"""
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    sector_stocks = _result_df[_result_df['섹터'] == sector]
+    n_stocks = len(sector_stocks)
+    if n_stocks == 0:
+        return None
+
+    cols = GRID_COLS
+    rows = (n_stocks + cols - 1) // cols
+
+    # 기업명(티커) 형태로 subtitle 생성
+    subtitles = [f"{row['기업명']}({row['티커']})" for _, row in sector_stocks.iterrows()]
+
+    fig = make_subplots(
+        rows=rows,
+        cols=cols,
+        subplot_titles=subtitles,
+        vertical_spacing=0.15 * SCALE,  # 행 간격 증가
+        horizontal_spacing=0.03 * SCALE
+    )
+
+    shapes = []
+    for idx, (_, row) in enumerate(sector_stocks.iterrows()):
+        if row['cumulative_returns'] is None:
+            continue
+        changes = row['cumulative_returns'].dropna()
+
+        row_num = (idx // cols) + 1
+        col_num = (idx % cols) + 1
+
+        fig.add_trace(
+            go.Bar(
+                x=changes.index,
+                y=changes.values,
+                marker_color=sign_colors(changes.values),
+                showlegend=False,
+                name=row['티커'],
+            ),
+            row=row_num,
+            col=col_num
+        )
+        # 0선은 subplot 마다 add_hline 하지 않고 shape 배열로 모아서 설정
+        shapes.append(zero_line_shape(idx + 1))
+
+    # 전체 레이아웃 설정 (Y축 범위는 모든 subplot 에 한 번에 적용)
+    fig.update_layout(
+        height=int(350 * rows * SCALE),  # 행 간격을 위해 높이 약간 증가
+        title_text=f"{sector} 섹터 누적변동률",
+        showlegend=False,
+        shapes=shapes,
+    )
+
+    # 모든 subplot의 폰트 크기 축소
+    fig.update_xaxes(title_font=dict(size=8), tickfont=dict(size=7))
+    fig.update_yaxes(range=[y_min, y_max], title_font=dict(size=8), tickfont=dict(size=7))
+    fig.update_annotations(font_size=9)  # subplot 제목 크기
+    return fig.to_json()
+
+
+# -----------------------------
+# 히트맵 탭 figure
+# -----------------------------
+@governed_cache_data(max_entries=20)
+def build_correlation_figure(fingerprint, tickers, _correlation):
+    """종목 간 일간 수익률 상관계수 히트맵 (tickers 순서)"""
+    import plotly.graph_objects as go
+
+    corr = _correlation.loc[list(tickers), list(tickers)]
+    fig = go.Figure(data=go.Heatmap(
+        z=corr.values,
+        x=corr.columns,
+        y=corr.index,
+        zmin=-1, zmax=1, zmid=0,
+        colorscale='RdBu_r',
+        colorbar=dict(title="상관계수"),
+        hovertemplate='%{y} / %{x}<br>상관계수: %{z:.2f}<extra></extra>'
+    ))
+    size = max(int(400 * SCALE), len(tickers) * 12)
+    fig.update_layout(
+        title="종목 간 일간 수익률 상관계수",
+        height=size,
+        xaxis=dict(tickangle=-45, tickfont=dict(size=8)),
+        yaxis=dict(autorange='reversed', tickfont=dict(size=8)),
+    )
+    return fig.to_json()
+
+
+# -----------------------------
+# 히트맵 탭
+# -----------------------------
+def heatmap_rows(frame, groups, mode, top_n=50, expanded=()):
+    """
+    히트맵에 표시할 행 (종목 수가 많아도 행 수를 제한)
+    frame: 종목 × 날짜, groups: frame 행과 같은 순서의 섹터
+    - HEATMAP_TOP: 마지막 값의 절댓값이 큰 top_n 종목 (값이 큰 순)
+    - HEATMAP_GROUPED: 섹터 평균 행, expanded 에 있는 섹터는 아래에 종목 행을 펼침
+    - 그 외: 그대로
+    """
+    if mode == HEATMAP_TOP:
+        # 값이 없는 종목은 가장 뒤로
+        last = frame.ffill(axis=1).iloc[:, -1].to_numpy(dtype=np.float64)
+        keep = np.argsort(-np.nan_to_num(np.abs(last), nan=-1.0), kind="stable")[:top_n]
+        keep = keep[np.argsort(-np.nan_to_num(last[keep], nan=-np.inf), kind="stable")]
+        return frame.iloc[keep]
+    if mode != HEATMAP_GROUPED:
+        return frame
+
+    import pandas as pd
+
+    groups = pd.Series(list(groups), index=frame.index)
+    rows, labels = [], []
+    for group in dict.fromkeys(groups):
+        members = frame[(groups == group).to_numpy()]
+        marker = "▼" if group in expanded else "▶"
+        rows.append(members.mean())
+        labels.append(f"{marker} {group} ({len(members)})")
+        if group in expanded:
+            rows.extend(row for _, row in members.iterrows())
+            labels.extend(f"   {label}" for label in members.index)
+    result = pd.DataFrame(rows)
+    result.index = labels
+    return result
@@ -0,0 +1,118 @@
+import hashlib
+import os
+import pickle
+import shutil
+import threading
+import time
+
+# 디스크 캐시 위치 (기본: 앱 파일 기준 .cache, 부하 테스트 등에서는 DASHBOARD_CACHE_DIR 로 분리)
+CACHE_DIR = os.environ.get(
+    "DASHBOARD_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+)
+
+# 체크포인트 저장 위치
+CHECKPOINT_DIR = os.path.join(CACHE_DIR, "checkpoints")
+
+# 이 시간보다 오래된(중단 후 방치된) 체크포인트는 삭제
+CHECKPOINT_MAX_AGE = 86400
+
+# 마지막 완료 실행 저장 위치 (종료일만 늘어난 다음 실행에서 이어 붙이기용)
+LAST_RUN_DIR = os.path.join(CACHE_DIR, "runs")
+
+
+def run_key(start_date, end_date, tickers):
+    """날짜 범위와 종목 구성(universe)으로 실행 키 생성"""
+    h = hashlib.md5()
+    h.update(f"{start_date}|{end_date}|".encode())
+    h.update("|".join(tickers).encode())
+    return h.hexdigest()
+
+
+class RunCheckpoint:
+    """
+    분석 실행 중 종목별 결과를 완료되는 즉시 디스크에 저장
+    위젯 변경 등으로 스크립트가 중단되어도 같은 키로 다시 실행하면 남은 종목만 조회
+    """
+
+    def __init__(self, start_date, end_date, tickers, root=CHECKPOINT_DIR):
+        self.key = run_key(start_date, end_date, tickers)
+        self.path = os.path.join(root, self.key)
+        purge_expired(root)
+        os.makedirs(self.path, exist_ok=True)
+
+    def _file(self, position, ticker):
+        # 같은 티커가 여러 팀/섹터에 있을 수 있으므로 행 위치로 구분
+        # 티커에 파일명으로 쓸 수 없는 문자가 있을 수 있으므로 해시 사용
+        return os.path.join(self.path, f"{position}_{hashlib.md5(ticker.encode()).hexdigest()}.pkl")
+
+    def load(self):
+        """{행 위치: 결과 dict} - 읽을 수 없는 파일은 무시"""
+        done = {}
+        for name in os.listdir(self.path):
+            if not name.endswith(".pkl"):
+                continue
+            try:
+                with open(os.path.join(self.path, name), "rb") as f:
+                    position, row = pickle.load(f)
+                done[position] = row
+            except Exception as e:
+                print(f"[CHECKPOINT] {name} 읽기 실패: {e}")
+        return done
+
+    def save(self, position, row):
+        """원자적 쓰기 (tmp 파일에 쓴 뒤 교체)"""
+        target = self._file(position, row['티커'])
+        tmp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                pickle.dump((position, row), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, target)
+        except Exception as e:
+            print(f"[CHECKPOINT] {row['티커']} 저장 실패: {e}")
+
+    def clear(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def purge_expired(root=CHECKPOINT_DIR, max_age=CHECKPOINT_MAX_AGE):
+    if not os.path.isdir(root):
+        return
+    now = time.time()
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        try:
+            if now - os.path.getmtime(path) > max_age:
+                shutil.rmtree(path, ignore_errors=True)
+        except OSError:
+            pass
+
+
+class LastRun:
+    """
+    시작일 + 종목 구성(universe) 별 마지막 완료 실행 결과 (종료일, results)
+    종료일이 늘어난 다음 실행은 이 결과에 새 봉만 이어 붙임
+    """
+
+    def __init__(self, start_date, tickers, root=LAST_RUN_DIR):
+        self.path = os.path.join(root, f"{run_key(start_date, '', tickers)}.pkl")
+        os.makedirs(root, exist_ok=True)
+
+    def load(self):
+        """(종료일, results) 또는 None"""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                return pickle.load(f)
+        except Exception as e:
+            print(f"[LAST RUN] 읽기 실패: {e}")
+            return None
+
+    def save(self, end_date, results):
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                pickle.dump((end_date, results), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print(f"[LAST RUN] 저장 실패: {e}")
@@ -0,0 +1,77 @@
+"""
+Streamlit 없이 포트폴리오 분석을 실행하는 배치/CLI 진입점
+
+예)
+    python cli.py --start 2025-10-09 --end 2025-12-31 --out output/
+    python cli.py --universe my_portfolio.csv --start 2025-01-02 --out output/my_portfolio
+    python cli.py --start 2025-10-09 --out output/ --format arrow
+"""
+import argparse
+import sys
+import time
+from datetime import datetime
+
+from engine import load_universe, run_analysis
+from export import FORMATS, write_tables
+from httpcache import http_stats
+
+
+def parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="투자 포트폴리오 분석 (배치 실행)")
+    parser.add_argument("--universe", help="종목 구성 CSV (팀,자산,섹터,기업명,티커). 없으면 기본 포트폴리오")
+    parser.add_argument("--start", type=parse_date, required=True, help="시작일 (YYYY-MM-DD)")
+    parser.add_argument("--end", type=parse_date, default=datetime.now().date(), help="종료일 (YYYY-MM-DD, 기본: 오늘)")
+    parser.add_argument("--out", required=True, help="출력 디렉터리")
+    parser.add_argument("--format", choices=list(FORMATS), default="parquet",
+                        help="출력 형식 (arrow: memory-map 으로 읽을 수 있는 Arrow IPC)")
+    parser.add_argument("--timeout", type=float, default=None, help="전체 제한 시간(초)")
+    parser.add_argument("--no-checkpoint", action="store_true", help="체크포인트/이전 실행 이어받기 사용 안 함")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    portfolio_df = load_universe(args.universe)
+    print(f"{len(portfolio_df)}개 종목 분석: {args.start} ~ {args.end}")
+
+    started = time.monotonic()
+    last_report = [0.0]
+
+    def progress(done, total):
+        now = time.monotonic()
+        if done == total or now - last_report[0] >= 5:
+            last_report[0] = now
+            print(f"  {done}/{total}")
+
+    results, run_info = run_analysis(
+        portfolio_df, args.start, args.end,
+        timeout=args.timeout,
+        use_checkpoint=not args.no_checkpoint,
+        progress=progress,
+    )
+    if run_info['resumed']:
+        print(f"체크포인트에서 {run_info['resumed']}개 종목 이어받음")
+    if run_info['extended']:
+        print(f"이전 실행에 새 거래일만 이어 붙임: {run_info['extended']}개 종목")
+    if run_info['quarantined']:
+        print(f"격리 중이라 조회를 건너뛴 종목 {len(run_info['quarantined'])}개: {', '.join(run_info['quarantined'])}")
+
+    for path in write_tables(results, args.out, args.format):
+        print(f"저장: {path}")
+
+    for endpoint, stats in http_stats().items():
+        print(f"  {endpoint}: 요청 {stats['requests']}회 (304 {stats['not_modified']}회), "
+              f"전송 {stats['wire_bytes'] / 1024:.0f} KB, 절약 {stats['saved_bytes'] / 1024:.0f} KB")
+
+    missing = sum(1 for r in results if r['missing_fields'])
+    print(f"완료 ({time.monotonic() - started:.1f}초, 누락 필드가 있는 종목 {missing}개)")
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1087 @@
+"""
+Streamlit 없이 사용할 수 있는 분석 엔진
+데이터 수집(Yahoo/Finviz)과 종목별 지표 계산, 결과 테이블/수익률 행렬 생성 (파일 저장은 export.py)
+app.py (대시보드) 와 cli.py (배치 실행) 가 공통으로 사용
+"""
+import os
+import time
+from datetime import datetime, timedelta
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+import requests
+
+from cache_registry import LRUStore, register
+from checkpoint import LastRun, RunCheckpoint
+from finviz_parse import extract_snapshot
+from httpcache import http_get
+from profiling import FETCH, timed
+from jobqueue import shared_cache
+from resilience import (
+    CircuitOpenError,
+    DeadlineExceeded,
+    NOT_FOUND_STATUS,
+    coalesce,
+    guard_request,
+    quarantine,
+    record_status,
+    run_deadline,
+    swr_cache,
+)
+from rolling import rolling_mean
+from trading_calendar import NYSE, calendar_for
+
+FINVIZ_HOST = "finviz.com"
+YAHOO_HOST = "query1.finance.yahoo.com"
+
+# 요청 기본 URL (부하 테스트 등에서 로컬 stub 서버를 쓰도록 환경 변수로 변경 가능)
+FINVIZ_URL = os.environ.get("FINVIZ_BASE_URL", f"https://{FINVIZ_HOST}")
+YAHOO_URL = os.environ.get("YAHOO_BASE_URL", f"https://{YAHOO_HOST}")
+
+# 기본 포트폴리오 (팀,자산,섹터,기업명,티커)
+PORTFOLIO_CSV = """팀,자산,섹터,기업명,티커
+청팀,기회자산,우주경제,Rocket Lab,RKLB
+청팀,기회자산,우주경제,Lockheed Martin,LMT
+청팀,기회자산,우주경제,Raytheon Technologies Corporation,RTX
+청팀,기회자산,우주경제,Boeing,BA
+청팀,기회자산,우주경제,Northrop Grumman,NOC
+청팀,기회자산,우주경제,AST SpaceMobile,ASTS
+청팀,기회자산,우주경제,Virgin Galactic,SPCE
+청팀,기회자산,우주경제,JOBY Aviation,JOBY
+청팀,기회자산,우주경제,Archer Aviation,ACHR
+청팀,기회자산,장수과학,Intellia Therapeutics,NTLA
+청팀,기회자산,장수과학,CRISPR Therapeutics,CRSP
+청팀,기회자산,장수과학,Recursion Pharmaceuticals,RXRX
+청팀,기회자산,장수과학,Beam Therapeutics,BEAM
+청팀,기회자산,장수과학,UniQure,QURE
+청팀,기회자산,장수과학,Tempus AI,TEM
+청팀,기회자산,장수과학,HIMS&HERS,HIMS
+청팀,기회자산,양자컴퓨터,IonQ,IONQ
+청팀,기회자산,양자컴퓨터,D-Wave Quantum,QBTS
+청팀,기회자산,양자컴퓨터,Rigetti Computing,RGTI
+청팀,기회자산,양자컴퓨터,IBM,IBM
+청팀,기회자산,양자컴퓨터,Quantum Computing,QUBT
+청팀,성장자산,미래에너지(SMR),NuScale Power,SMR
+청팀,성장자산,미래에너지(SMR),Oklo,OKLO
+청팀,성장자산,미래에너지(SMR),Nano Nuclear Energy,NNE
+청팀,성장자산,미래에너지(SMR),BWX Technologies,BWXT
+청팀,성장자산,미래에너지(SMR),Centrus Energy Corp.,LEU
+청팀,성장자산,미래에너지(SMR),Uranium Energy,UEC
+청팀,성장자산,미래에너지(SMR),Cameco (US-listed),CCJ
+청팀,기회자산,합성생물학,Ginkgo Bioworks,DNA
+청팀,기회자산,합성생물학,Twist Bioscience,TWST
+청팀,기회자산,합성생물학,10x Genomics,TXG
+청팀,기회자산,합성생물학,Appsella Biologics,ABCL
+청팀,기회자산,양자 암호,Arqit,ARQQ
+청팀,기회자산,양자 암호,SEALSQ,LAES
+청팀,기회자산,양자 암호,BTQ,BTQ
+청팀,기회자산,BCI,ClearPoint Neuro,CLPT
+청팀,기회자산,BCI,NeuroPace,NPCE
+청팀,기회자산,무선 전력 전송 플랫폼,Energous Corporation,WATT
+청팀,기회자산,대기 물 수,AirJoule Technologies Corporation,AIRJ
+청팀,성장자산,스테이블코인/핀테크,Coinbase,COIN
+청팀,성장자산,스테이블코인/핀테크,Robinhood,HOOD
+청팀,성장자산,스테이블코인/핀테크,Circle,CRCL
+청팀,성장자산,스테이블코인/핀테크,Block,XYZ
+청팀,성장자산,스테이블코인/핀테크,MicroStrategy,MSTR
+청팀,성장자산,스테이블코인/핀테크,Bitmine Immersion Technologies,BMNR
+백팀,성장자산,AI,Palantir,PLTR
+백팀,성장자산,AI,Salesforce,CRM
+백팀,성장자산,AI,Super Micro Computer,SMCI
+백팀,성장자산,AI,AppLovin,APP
+백팀,성장자산,AI,Datadog,DDOG
+백팀,성장자산,AI,Figma Inc.,FIG
+백팀,성장자산,AI,UiPath Inc.,PATH
+백팀,성장자산,AI,Symbotic Inc.,SYM
+백팀,성장자산,클라우드,Nebius Group,NBIS
+백팀,성장자산,클라우드,IREN Limited,IREN
+백팀,성장자산,클라우드,CoreWeave,CRWV
+백팀,성장자산,미래에너지(수소/암모니아),Bloom Energy,BE
+백팀,성장자산,미래에너지(수소/암모니아),Plug Power,PLUG
+백팀,성장자산,미래에너지(수소/암모니아),Air Products,APD
+백팀,성장자산,미래에너지(수소/암모니아),Linde,LIN
+백팀,성장자산,미래에너지(수소/암모니아),CF Industries,CF
+백팀,성장자산,미래에너지(수소/암모니아),Ballard Power Systems,BLDP
+백팀,성장자산,미래에너지(수소/암모니아),FuelCell Energy,FCEL
+백팀,성장자산,미래에너지(전고체배터리),QuantumScape,QS
+백팀,성장자산,미래에너지(전고체배터리),Solid Power,SLDP
+백팀,성장자산,미래에너지(ESS),Fluence Energy,FLNC
+백팀,성장자산,미래에너지(ESS),EnerSys,ENS
+백팀,성장자산,미래에너지(ESS),Eos Energy Enterprises,EOSE
+백팀,성장자산,미래에너지(ESS),Tesla (Energy),TSLA
+백팀,성장자산,미래에너지(ESS),Enphase Energy,ENPH
+백팀,성장자산,미래에너지(ESS),Eaton,ETN
+백팀,성장자산,미래에너지(재생에너지),Duke Energy,DUK
+백팀,성장자산,미래에너지(재생에너지),GE Vernova,GEV
+백팀,성장자산,미래에너지(재생에너지),NextEra Energy,NEE
+백팀,성장자산,미래에너지(재생에너지),AES Corporation,AES
+백팀,성장자산,미래에너지(재생에너지),Constellation Energy,CEG
+백팀,성장자산,미래에너지(재생에너지),Talen Energy Corporation,TLN
+백팀,성장자산,미래에너지(재생에너지),American Electric Power Company,AEP
+백팀,성장자산,미래에너지(재생에너지),Vistra Energy,VST
+백팀,성장자산,미래에너지(재생에너지),First Solar,FSLR
+백팀,성장자산,전통에너지,Exxon Mobil,XOM
+백팀,성장자산,전통에너지,Chevron,CVX
+백팀,성장자산,전통에너지,Marathon Petroleum,MPC
+백팀,성장자산,전통에너지,Shell plc,SHEL
+백팀,성장자산,전통에너지,ConocoPhillips,COP
+백팀,성장자산,전통에너지,Occidental Petroleum,OXY
+백팀,성장자산,전통에너지,Devon Energy,DVN
+백팀,성장자산,전통에너지,Valero Energy,VLO
+백팀,성장자산,전통에너지,Southern Company,SO
+백팀,성장자산,데이터 인프라(냉각),Vertiv,VRT
+백팀,성장자산,데이터 인프라(냉각),Carrier Global,CARR
+백팀,성장자산,데이터 인프라(냉각),Honeywell International,HON
+백팀,성장자산,데이터 인프라(냉각),Johnson Controls,JCI
+백팀,성장자산,데이터 인프라(네트워크),Arista Networks,ANET
+백팀,성장자산,데이터 인프라(네트워크),Credo,CRDO
+백팀,성장자산,데이터 인프라(네트워크),Astera Labs,ALAB
+백팀,성장자산,데이터 인프라(네트워크),Marvell Technology,MRVL
+백팀,성장자산,데이터 인프라(네트워크),Hewlett Packard Enterprise,HPE
+백팀,성장자산,데이터 인프라(네트워크),Cisco,CSCO
+백팀,성장자산,데이터 인프라(네트워크),Ciena,CIEN
+백팀,성장자산,데이터 인프라(로직반도체),NVIDIA,NVDA
+백팀,성장자산,데이터 인프라(로직반도체),Micron Technology,MU
+백팀,성장자산,데이터 인프라(로직반도체),AMD,AMD
+백팀,성장자산,데이터 인프라(로직반도체),Intel,INTC
+백팀,성장자산,데이터 인프라(로직반도체),Broadcom,AVGO
+백팀,성장자산,데이터 인프라(로직반도체),TSMC,TSM
+백팀,성장자산,데이터 인프라(로직반도체),Analog Devices,ADI
+백팀,성장자산,데이터 인프라(로직반도체),Wolfspeed,WOLF
+백팀,성장자산,데이터 인프라(로직반도체),Lam Research,LRCX
+백팀,성장자산,데이터 인프라(로직반도체),On Semiconductor,ON
+백팀,성장자산,데이터 인프라(로직반도체),Synopsys,SNPS
+백팀,성장자산,데이터 인프라(하이퍼스케일),Amazon (AWS),AMZN
+백팀,성장자산,데이터 인프라(하이퍼스케일),Microsoft (Azure),MSFT
+백팀,성장자산,데이터 인프라(하이퍼스케일),Alphabet (GCP),GOOGL
+백팀,성장자산,데이터 인프라(하이퍼스케일),Meta Platforms,META
+백팀,성장자산,데이터 인프라(하이퍼스케일),Apple,AAPL
+백팀,성장자산,데이터 인프라(하이퍼스케일),Oracle Cloud,ORCL
+백팀,성장자산,데이터 인프라(하이퍼스케일),Pure Storage,PSTG
+백팀,성장자산,데이터 인프라(리츠),Equinix,EQIX
+백팀,성장자산,데이터 인프라(리츠),Digital Realty,DLR
+백팀,성장자산,데이터 인프라(리츠),CyrusOne,CONE
+백팀,성장자산,데이터 인프라(리츠),Continental Building Co.,CONL
+백팀,성장자산,사이버보안,Palo Alto Networks,PANW
+백팀,성장자산,사이버보안,CrowdStrike,CRWD
+백팀,성장자산,사이버보안,Zscaler,ZS
+백팀,성장자산,필수소비재,Kenvue Inc.,KVUE
+백팀,성장자산,필수소비재,Procter & Gamble,PG
+백팀,성장자산,필수소비재,Coca-Cola,KO
+백팀,성장자산,필수소비재,PepsiCo,PEP
+백팀,성장자산,필수소비재,Walmart,WMT
+백팀,성장자산,필수소비재,Costco,COST
+백팀,성장자산,필수소비재,Colgate-Palmolive,CL
+백팀,성장자산,필수소비재,Kimberly-Clark,KMB
+백팀,성장자산,필수소비재,Target Corporation,TGT
+백팀,성장자산,필수소비재,Kraft Heinz Co,KHC
+백팀,성장자산,필수소비재,Philip Morris Intl,PM
+백팀,성장자산,필수소비재,Unilever PLC,UL
+백팀,성장자산,필수소비재,Altria Group Inc,MO
+백팀,성장자산,필수소비재,3M Company,MMM
+백팀,성장자산,결재시스템,Visa,V
+백팀,성장자산,결재시스템,Mastercard,MA
+백팀,성장자산,결재시스템,American Express,AXP
+백팀,성장자산,결재시스템,PayPal,PYPL
+백팀,성장자산,결재시스템,Block,XYZ
+백팀,성장자산,결재시스템,SoFi Technologies,SOFI
+백팀,성장자산,결재시스템,Toast Inc.,TOST
+백팀,성장자산,결재시스템,Affirm Holdings Inc.,AFRM
+백팀,성장자산,결재시스템,Global Payments Inc.,GPN
+백팀,성장자산,결재시스템,Zillow Group Inc.,Z
+백팀,성장자산,금융/자산운용,BlackRock,BLK
+백팀,성장자산,금융/자산운용,JPMorgan Chase,JPM
+백팀,성장자산,금융/자산운용,Morgan Stanley,MS
+백팀,성장자산,금융/자산운용,Goldman Sachs,GS
+백팀,성장자산,금융/자산운용,Bank of America,BAC
+백팀,성장자산,금융/자산운용,Citi Group,C
+백팀,성장자산,금융/자산운용,HSBC Holdings,HSBC
+백팀,성장자산,금융/자산운용,Blackstone Inc.,BX
+백팀,성장자산,금융/자산운용,CME Group Inc.,CME
+백팀,성장자산,금융/자산운용,Bank of New York Mellon,BK
+백팀,성장자산,금융/자산운용,Chubb Limited,CB
+백팀,성장자산,명품소비재,Ferrari N.V.,RACE
+백팀,성장자산,명품소비재,Williams-Sonoma Inc.,WSM
+백팀,성장자산,명품소비재,Tapestry,TPR
+백팀,성장자산,명품소비재,Estée Lauder,EL
+백팀,성장자산,명품소비재,Lululemon Athletica,LULU
+백팀,성장자산,명품소비재,Cullen/Frost Bankers,CFR
+백팀,성장자산,명품소비재,Old Republic Intl,OR
+백팀,성장자산,명품소비재,LVMH Moët Hennessy Louis Vuitton,MC
+백팀,성장자산,명품소비재,Brunswick Corporation,BC
+백팀,성장자산,명품소비재,LVMH Moët Hennessy Louis Vuitton,LVMUY
+백팀,성장자산,명품소비재,Ralph Lauren,RL
+백팀,성장자산,명품소비재,Capri Holdings*,CPRI
+백팀,성장자산,명품소비재,Canada Goose,GOOS
+백팀,성장자산,헬스케어,UnitedHealth,UNH
+백팀,성장자산,헬스케어,Natera,NTRA
+백팀,성장자산,헬스케어,Johnson & Johnson,JNJ
+백팀,성장자산,헬스케어,Thermo Fisher,TMO
+백팀,성장자산,헬스케어,Abbott Labs,ABT
+백팀,성장자산,헬스케어,Intuitive Surgical,ISRG
+백팀,성장자산,헬스케어,Pfizer,PFE
+백팀,성장자산,헬스케어,Merck & Co.,MRK
+백팀,성장자산,헬스케어,Moderna,MRNA
+백팀,성장자산,헬스케어,Eli Lilly,LLY
+백팀,성장자산,물&식량,Xylem,XYL
+백팀,성장자산,물&식량,Ecolab,ECL
+백팀,성장자산,물&식량,American Water Works,AWK
+백팀,성장자산,물&식량,DuPont,DD
+백팀,성장자산,물&식량,Nestlé,NSRGY"""
+
+
+def load_universe(path=None):
+    """
+    종목 구성(universe) 로드
+    path 가 없으면 기본 포트폴리오, 있으면 같은 컬럼(팀,자산,섹터,기업명,티커)의 CSV 파일
+    """
+    source = path if path else StringIO(PORTFOLIO_CSV)
+    df = pd.read_csv(
+        source,
+        on_bad_lines='skip',  # Skip problematic rows
+        engine='python'       # Use Python engine (more forgiving)
+    )
+    return df
+
+
+# Finviz quote 페이지의 snapshot-table2 전체 ({label: value})
+# 지표마다 페이지를 다시 받지 않도록 종목당 한 번만 조회하여 캐시
+@swr_cache(ttl=86400, max_stale=30 * 86400, max_entries=4000)
+@shared_cache(ttl=86400)
+@coalesce
+def get_finviz_snapshot(ticker: str):
+    if quarantine.blocked("finviz_quote", ticker):
+        return None
+    breaker, timeout = guard_request(FINVIZ_HOST, 20)
+    try:
+        url = f"{FINVIZ_URL}/quote.ashx?t={ticker}"
+        headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+        }
+        try:
+            res = http_get("finviz_quote", url, headers=headers, timeout=timeout)
+        except requests.exceptions.RequestException:
+            breaker.record_failure()
+            raise
+        record_status(breaker, res.status_code)
+        if res.status_code != 200:
+            print(f"[{ticker}] HTTP {res.status_code}")
+            if res.status_code in NOT_FOUND_STATUS:
+                quarantine.record_failure("finviz_quote", ticker, f"HTTP {res.status_code}")
+            return None
+
+        snapshot = extract_snapshot(res.text)
+        if snapshot is None:
+            print(f"[{ticker}] snapshot-table2 not found")
+            quarantine.record_failure("finviz_quote", ticker, "snapshot 없음")
+        else:
+            quarantine.record_success("finviz_quote", ticker)
+        return snapshot
+    except Exception as e:
+        print(f"[{ticker}] snapshot error: {e}")
+        return None
+
+
+def snapshot_metric(snapshot, metric_name):
+    """snapshot 에서 label 기반으로 재무지표 추출 (숫자면 float, 없으면 "-")"""
+    if not snapshot:
+        return "-"
+    for label, value in snapshot.items():
+        if label.lower() == metric_name.lower():
+            clean = value.split("*")[0].replace("%", "").replace(",", "")
+            try:
+                return float(clean)
+            except ValueError:
+                return clean
+    return "-"
+
+
+def get_finviz_metric(ticker: str, metric_name: str):
+    """
+    Finviz 'snapshot-table2'에서 label 기반으로 재무지표 추출
+    예: metric_name = "Debt/Eq", "Current Ratio", "ROE", "Market Cap"
+    """
+    return snapshot_metric(get_finviz_snapshot(ticker), metric_name)
+
+def get_market_cap(ticker: str):
+    """
+    Finviz에서 시가총액 가져오기
+    반환값: 문자열 (예: "150.5B", "1.2T") 또는 "-"
+    """
+    market_cap = get_finviz_metric(ticker, "Market Cap")
+    return market_cap if market_cap != "-" else "-"
+
+# Finviz API에서 재무제표 데이터 가져오기
+# 조회 실패 시 마지막 정상 값을 사용하도록 stale-while-revalidate 캐시 적용
+@swr_cache(ttl=86400, max_stale=30 * 86400, max_entries=4000)
+@shared_cache(ttl=86400)
+@coalesce
+def get_finviz_data(ticker, statement, item):
+    if quarantine.blocked("finviz_statement", ticker):
+        return None
+    breaker, timeout = guard_request(FINVIZ_HOST, 15)
+    try:
+        statement_map = {"IS": "IQ", "BS": "BQ", "CF": "CQ"}
+        statement_map = {
+                      "ISQ": "IQ",  # Income Statement Quarterly
+                      "BSQ": "BQ",  # Balance Sheet Quarterly
+                      "CFQ": "CQ",  # Cash Flow Quarterly
+                      "ISA": "IA",  # Income Statement Annual
+                      "BSA": "BA",  # Balance Sheet Annual
+                      "CFA": "CA"   # Cash Flow Annual
+                    }
+        url = f"{FINVIZ_URL}/api/statement.ashx?t={ticker}&so=F&s={statement_map[statement]}"
+        
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            'Accept': 'application/json, text/javascript, */*; q=0.01',
+            'Accept-Language': 'en-US,en;q=0.9',
+            'Referer': f'{FINVIZ_URL}/quote.ashx?t={ticker}',
+            'X-Requested-With': 'XMLHttpRequest'
+        }
+        
+        try:
+            response = http_get("finviz_statement", url, headers=headers, timeout=timeout)
+        except requests.exceptions.RequestException:
+            breaker.record_failure()
+            raise
+        record_status(breaker, response.status_code)
+        
+        if response.status_code != 200:
+            print(f"[WARNING] {ticker} API HTTP {response.status_code}")
+            if response.status_code in NOT_FOUND_STATUS:
+                quarantine.record_failure("finviz_statement", ticker, f"HTTP {response.status_code}")
+            return None
+        
+        time.sleep(0.01)  # Rate limiting
+        
+        data = response.json()
+
+        # 재무제표가 전혀 없는 종목(ETF, 미지원 종목)은 격리 - 항목 하나가 없는 것은 종목 문제가 아님
+        if not data or not data.get('data'):
+            quarantine.record_failure("finviz_statement", ticker, "재무제표 없음")
+            return None
+        quarantine.record_success("finviz_statement", ticker)
+
+        if data and 'data' in data and item in data['data']:
+            values = data['data'][item]
+            if values and len(values) > 0:
+                value = values[0]
+                if value == '-' or value is None:
+                    return None
+                try:
+                    return float(value)
+                except:
+                    return None
+        
+        return None
+        
+    except requests.exceptions.Timeout:
+        print(f"[WARNING] {ticker} API Timeout")
+        return None
+    except Exception as e:
+        print(f"[WARNING] {ticker} API 조회 실패: {e}")
+        return None
+
+# -----------------------------
+# 가격 데이터 모델 (compact dtype)
+# -----------------------------
+PRICE_DTYPE = np.float32
+INT32_MAX = np.iinfo(np.int32).max
+
+
+def compact_volume(volume):
+    """거래량: int32 범위 안이면 int32, 아니면 int64"""
+    volume = np.asarray(volume, dtype=np.int64)
+    if len(volume) and volume.max() > INT32_MAX:
+        return volume
+    return volume.astype(np.int32)
+
+
+def chart_to_frame(timestamps, indicators):
+    """
+    Yahoo chart API 의 timestamp/quote 배열 → OHLCV DataFrame
+    OHLC 는 float32, Volume 은 int32/int64, 시/고/저/종가 중 하나라도 없는 봉은 제외
+    """
+    ts = np.asarray(timestamps, dtype=np.int64)
+    # None 은 float 변환 시 NaN 이 됨
+    ohlc = {
+        name: np.asarray(indicators.get(key, []), dtype=np.float64)
+        for name, key in (('Open', 'open'), ('High', 'high'), ('Low', 'low'), ('Close', 'close'))
+    }
+    volume = np.asarray(indicators.get('volume', []), dtype=np.float64)
+
+    valid = np.ones(len(ts), dtype=bool)
+    for values in ohlc.values():
+        valid &= ~np.isnan(values)
+    if not valid.any():
+        return None
+
+    index = pd.DatetimeIndex([datetime.fromtimestamp(t) for t in ts[valid]], name='Date')
+    df = pd.DataFrame({name: values[valid].astype(PRICE_DTYPE) for name, values in ohlc.items()}, index=index)
+    df['Volume'] = compact_volume(np.nan_to_num(volume[valid]))
+    return df.sort_index()
+
+
+# 주가 데이터 가져오기 (Yahoo Finance Chart API - Google Apps Script 방식)
+@swr_cache(ttl=3600, max_stale=7 * 86400, max_entries=2000, max_bytes=256 * 1024 * 1024)
+@shared_cache(ttl=3600)
+@coalesce
+def get_stock_data(ticker, start_date, end_date):
+    if isinstance(start_date, str):
+        start_date = datetime.strptime(start_date, '%Y-%m-%d')
+    else:
+        start_date = datetime.combine(start_date, datetime.min.time())
+
+    if isinstance(end_date, str):
+        end_date = datetime.strptime(end_date, '%Y-%m-%d')
+    else:
+        end_date = datetime.combine(end_date, datetime.min.time())
+
+    # 거래일이 없는 구간(주말/휴장일만, 미래)은 요청하지 않음
+    calendar = calendar_for(ticker)
+    if not calendar.needs_fetch(start_date, end_date):
+        return None
+
+    start_timestamp = int(start_date.replace(hour=0, minute=0, second=0, microsecond=0).timestamp())
+    end_timestamp = int(end_date.replace(hour=23, minute=59, second=59, microsecond=999000).timestamp())
+    # 구간의 첫 거래일 장이 끝났으면 봉이 있어야 하므로 빈 응답은 종목 문제로 기록
+    return fetch_chart(ticker, {'period1': start_timestamp, 'period2': end_timestamp, 'interval': '1d'},
+                       record_missing=calendar.session_closed(calendar.next_session(start_date)))
+
+
+# 장중(intraday) 봉 간격 → 새 봉이 생기는 주기(초)
+INTRADAY_INTERVALS = {'5m': 300, '15m': 900, '1h': 3600}
+
+
+# 당일 장중 봉 (실시간 모드 폴링용)
+# 여러 세션이 같은 종목을 폴링해도 60초에 한 번만 요청 (max_stale=ttl 이므로 오래된 값은 반환하지 않음)
+@swr_cache(ttl=60, max_stale=60, max_entries=2000)
+@coalesce
+def get_intraday_bars(ticker, interval):
+    # 장 시작 전에는 당일 봉이 없으므로 빈 응답을 격리 사유로 기록하지 않음
+    return fetch_chart(ticker, {'range': '1d', 'interval': interval}, record_missing=False)
+
+
+def fetch_chart(ticker, params, record_missing=True):
+    """
+    Yahoo chart API 호출 → OHLCV DataFrame (실패 시 None)
+    격리 중인 종목은 요청하지 않고, 404/빈 결과는 record_missing 이면 격리 기록에 추가
+    """
+    if quarantine.blocked("yahoo_chart", ticker):
+        return None
+
+    def missing(kind):
+        print(f"{kind} for {ticker}")
+        if record_missing:
+            quarantine.record_failure("yahoo_chart", ticker, kind)
+        return None
+
+    breaker, timeout = guard_request(YAHOO_HOST, 20)
+    try:
+        url = f"{YAHOO_URL}/v8/finance/chart/{ticker}"
+        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+        try:
+            response = http_get("yahoo_chart", url, params=params, headers=headers, timeout=timeout)
+        except requests.exceptions.RequestException:
+            breaker.record_failure()
+            raise
+        record_status(breaker, response.status_code)
+        if response.status_code in NOT_FOUND_STATUS:
+            return missing(f"HTTP {response.status_code}")
+        if response.status_code != 200:
+            print(f"HTTP {response.status_code} for {ticker}")
+            return None
+
+        data = response.json()
+        if not data.get('chart') or not data['chart'].get('result') or len(data['chart']['result']) == 0:
+            return missing("Invalid API response")
+
+        result = data['chart']['result'][0]
+        timestamps = result.get('timestamp', [])
+        if not timestamps:
+            return missing("No timestamps")
+
+        indicators_list = result.get('indicators', {}).get('quote', [])
+        if not indicators_list or len(indicators_list) == 0:
+            return missing("No indicators")
+
+        df = chart_to_frame(timestamps, indicators_list[0])
+        if df is None:
+            return missing("No valid data")
+        quarantine.record_success("yahoo_chart", ticker)
+        return df
+
+    except Exception as e:
+        print(f"Error fetching data for {ticker}: {e}")
+        return None
+
+# -----------------------------
+# 종목별 분석
+# -----------------------------
+PRICE_FIELDS = ['기준가', '최고가', '현재가', '누적수익률(기준가)', '누적수익률(최고가)', '일일수익', '일일수익률']
+FINVIZ_FIELDS = ['부채비율', '유동비율', 'ROE', 'Runway(년)', 'Total Cash(M$)', 'FCF(M$)']
+
+
+def fetch_or_stale(stale_fields, fields, fn, *args, default="-", staleness_of=None):
+    """
+    stale_fields: {필드명: 경과 시간(초) 또는 None}
+    - 회로 차단/제한 시간 초과로 호출하지 못하면 default 를 반환하고 필드를 stale(None) 로 표시
+    - stale-while-revalidate 캐시가 오래된 값을 반환했으면 경과 시간과 함께 stale 로 표시
+    - staleness_of: fn 이 캐시된 fetcher 를 감싼 일반 함수일 때 실제 캐시의 staleness (없으면 fn.staleness)
+    """
+    try:
+        with timed(FETCH, fn.__name__):
+            value = fn(*args)
+    except (CircuitOpenError, DeadlineExceeded):
+        for field in fields:
+            stale_fields.setdefault(field, None)
+        return default
+    staleness = staleness_of or getattr(fn, "staleness", None)
+    age = staleness(*args) if staleness is not None else None
+    if age is not None:
+        for field in fields:
+            stale_fields[field] = max(age, stale_fields.get(field) or 0)
+    return value
+
+
+def format_age(seconds):
+    """경과 시간(초)을 '3분', '2.5시간', '1.2일' 형식으로 표시"""
+    if seconds is None:
+        return "-"
+    if seconds < 3600:
+        return f"{int(seconds // 60)}분"
+    if seconds < 86400:
+        return f"{seconds / 3600:.1f}시간"
+    return f"{seconds / 86400:.1f}일"
+
+
+def stale_summary(stale):
+    ages = [age for age in stale.values() if age is not None]
+    return format_age(max(ages)) if ages else ("누락" if stale else "")
+
+
+def as_number(value, scale=1):
+    """숫자면 value * scale 을 소수점 2자리로, 아니면("-", None, 문자열) NaN"""
+    if isinstance(value, (int, float, np.number)) and not isinstance(value, bool):
+        return round(float(value) * scale, 2)
+    return np.nan
+
+
+def fetch_fundamentals(ticker, stale):
+    """Finviz 재무 지표 (부채비율/유동비율/ROE/Runway/Total Cash/FCF)"""
+    snapshot = fetch_or_stale(stale, ['부채비율', '유동비율', 'ROE'], get_finviz_snapshot, ticker, default=None)
+    debt_ratio = snapshot_metric(snapshot, "Debt/Eq")
+    current_ratio = snapshot_metric(snapshot, "Current Ratio")
+    roe = snapshot_metric(snapshot, "ROE")
+    total_cash = fetch_or_stale(stale, ['Total Cash(M$)', 'Runway(년)'], get_finviz_data,
+                                ticker, "BSQ", "Cash & Short Term Investments", default=None)
+    free_cash_flow = fetch_or_stale(stale, ['FCF(M$)', 'Runway(년)'], get_finviz_data,
+                                    ticker, "CFA", "Free Cash Flow", default=None)
+
+    runway = np.nan
+    if total_cash and free_cash_flow and free_cash_flow < 0:
+        runway = round(total_cash / abs(free_cash_flow), 1)
+
+    return {
+        '부채비율': as_number(debt_ratio, scale=100),
+        '유동비율': as_number(current_ratio, scale=100),
+        'ROE': as_number(roe),
+        'Runway(년)': runway,
+        'Total Cash(M$)': as_number(total_cash) if total_cash else np.nan,
+        'FCF(M$)': as_number(free_cash_flow) if free_cash_flow else np.nan,
+    }
+
+
+def price_fields(stock_data, base_price, highest_price, daily_changes, cumulative_returns):
+    """가격 시계열로부터 가격 지표 필드 계산"""
+    closes = stock_data['Close']
+    current_price = closes.iloc[-1]
+
+    return_from_base = ((current_price - base_price) / base_price) * 100
+    return_from_high = ((current_price - highest_price) / highest_price) * 100
+
+    if len(stock_data) > 1:
+        daily_return = current_price - closes.iloc[-2]
+        daily_return_pct = ((current_price - closes.iloc[-2]) / closes.iloc[-2]) * 100
+    else:
+        daily_return = 0
+        daily_return_pct = 0
+
+    return {
+        '기준가': as_number(base_price),
+        '최고가': as_number(highest_price),
+        '현재가': as_number(current_price),
+        '누적수익률(기준가)': as_number(return_from_base),
+        '누적수익률(최고가)': as_number(return_from_high),
+        '일일수익': as_number(daily_return),
+        '일일수익률': as_number(daily_return_pct),
+        'price_data': stock_data,
+        'daily_changes': daily_changes,
+        'cumulative_returns': cumulative_returns,
+        'running_max': float(highest_price),
+    }
+
+
+def make_row(row, market_cap, stale, stock_data=None, base_price=None, highest_price=None,
+             daily_changes=None, cumulative_returns=None, fundamentals=None):
+    """결과 dict 생성 (stock_data 가 없으면 지표는 모두 NaN)"""
+    result = {
+        '팀': row['팀'],
+        '자산': row['자산'],
+        '섹터': row['섹터'],
+        '기업명': row['기업명'],
+        '티커': row['티커'],
+        '시가총액': market_cap,
+        **{field: np.nan for field in PRICE_FIELDS + FINVIZ_FIELDS},
+        'price_data': None,
+        'daily_changes': None,
+        'cumulative_returns': None,
+        'running_max': None,
+    }
+
+    if stock_data is not None:
+        result.update(price_fields(stock_data, base_price, highest_price, daily_changes, cumulative_returns))
+        result.update(fundamentals)
+
+    result.update({
+        'stale_fields': sorted(stale),
+        'missing_fields': sorted(f for f, age in stale.items() if age is None),
+        '갱신 지연': stale_summary(stale),
+    })
+    return result
+
+
+def analyze_row(row, start_date, end_date):
+    """포트폴리오 한 행(종목)의 주가/재무 데이터를 가져와 결과 dict 생성"""
+    ticker = row['티커']
+    stale = {}
+
+    stock_data = fetch_or_stale(stale, PRICE_FIELDS, get_stock_data,
+                                ticker, start_date, end_date, default=None)
+
+    # 시가총액 가져오기
+    market_cap = fetch_or_stale(stale, ['시가총액'], get_market_cap, ticker,
+                                staleness_of=get_finviz_snapshot.staleness)
+
+    if stock_data is not None and len(stock_data) > 0:
+        base_price = stock_data['Close'].iloc[0]
+        highest_price = stock_data['Close'].max()
+
+        daily_changes = stock_data['Close'].pct_change() * 100
+        cumulative_returns = ((stock_data['Close'] / base_price) - 1) * 100
+
+        # Finviz에서 재무 데이터 가져오기
+        fundamentals = fetch_fundamentals(ticker, stale)
+
+        return make_row(row, market_cap, stale, stock_data, base_price, highest_price,
+                        daily_changes[1:], cumulative_returns, fundamentals)
+
+    # 주가 조회가 차단되어 재무 데이터도 조회하지 못함
+    if '기준가' in stale:
+        for field in FINVIZ_FIELDS:
+            stale.setdefault(field, None)
+
+    return make_row(row, market_cap, stale)
+
+
+def extend_row(prev, row, end_date):
+    """
+    종료일만 늘어난 경우: 이전 결과(prev)에 새 봉만 붙여 지표 갱신
+    기준가/이전 수익률은 그대로 두고 최고가는 running max, 누적수익률/변동률은 새 봉만 계산
+    마지막 봉(장중 미완성일 수 있음)부터 다시 조회하여 교체
+    이어 붙일 수 없으면 None (호출 측에서 전체 계산)
+    """
+    old = prev['price_data']
+    if old is None or len(old) < 2 or prev['missing_fields'] or prev['running_max'] is None:
+        return None
+
+    ticker = row['티커']
+    stale = {}
+    last_bar = old.index[-1].date()
+    if not calendar_for(ticker).needs_fetch(last_bar, end_date, last_bar=last_bar):
+        # 마지막 봉 이후 거래일이 없고 그 봉의 장도 끝났으면 가격은 그대로 사용 (재무 지표만 갱신)
+        appended = (old, old['Close'].iloc[0], prev['running_max'], prev['daily_changes'], prev['cumulative_returns'])
+    else:
+        new = fetch_or_stale(stale, PRICE_FIELDS, get_stock_data, ticker, last_bar, end_date, default=None)
+        if new is None or new.empty:
+            return None
+        appended = append_bars(prev, new)
+        if appended is None:
+            return None
+
+    market_cap = fetch_or_stale(stale, ['시가총액'], get_market_cap, ticker,
+                                staleness_of=get_finviz_snapshot.staleness)
+    fundamentals = fetch_fundamentals(ticker, stale)
+    return make_row(row, market_cap, stale, *appended, fundamentals)
+
+
+def append_bars(prev, new):
+    """
+    prev 결과의 가격 시계열에 new 봉을 이어 붙임 (new 첫 봉과 같은 날짜 이후의 기존 봉은 교체)
+    새 봉 수에 비례하는 계산만 수행, 기존 결과의 Series/DataFrame 은 수정하지 않음
+    반환값: (stock_data, base_price, highest_price, daily_changes, cumulative_returns) 또는 None
+    """
+    old = prev['price_data']
+    # 같은 날의 봉이라도 장중/마감 timestamp 가 다를 수 있으므로 날짜 단위로 비교
+    cut = new.index[0].normalize()
+    kept = old[old.index < cut]
+    if kept.empty:
+        return None
+    stock_data = pd.concat([kept, new])
+
+    base_price = kept['Close'].iloc[0]
+    highest_price = prev['running_max']
+    if old['Close'][old.index >= cut].max() >= highest_price:
+        # 교체되는 봉이 최고가였던 드문 경우에만 전체 재계산
+        highest_price = kept['Close'].max()
+    highest_price = max(highest_price, new['Close'].max())
+
+    prev_close = new['Close'].shift(1)
+    prev_close.iloc[0] = kept['Close'].iloc[-1]
+    new_changes = (new['Close'] / prev_close - 1) * 100
+    new_cumulative = ((new['Close'] / base_price) - 1) * 100
+
+    daily_changes = pd.concat([prev['daily_changes'][prev['daily_changes'].index < cut], new_changes])
+    cumulative_returns = pd.concat([prev['cumulative_returns'][prev['cumulative_returns'].index < cut], new_cumulative])
+    return stock_data, base_price, highest_price, daily_changes, cumulative_returns
+
+
+# -----------------------------
+# 장중 실시간 갱신 (분석 결과에 당일 봉만 반영)
+# -----------------------------
+# 한 번의 폴링에서 조회하는 최대 종목 수와 폴링 사이 최소 간격(초)
+# 폴링은 Yahoo 만 요청하며 분당 최대 LIVE_BATCH_SIZE * 60 / LIVE_MIN_TICK 회
+# (분석 1회는 종목마다 Yahoo 1회 + Finviz 여러 회를 연속으로 요청)
+LIVE_BATCH_SIZE = 20
+LIVE_MIN_TICK = 15
+
+
+def daily_bar(bars):
+    """장중 봉 → 마지막 거래일의 일봉 1개"""
+    today = bars[bars.index >= bars.index[-1].normalize()]
+    return pd.DataFrame({
+        'Open': np.array([today['Open'].iloc[0]], dtype=PRICE_DTYPE),
+        'High': np.array([today['High'].max()], dtype=PRICE_DTYPE),
+        'Low': np.array([today['Low'].min()], dtype=PRICE_DTYPE),
+        'Close': np.array([today['Close'].iloc[-1]], dtype=PRICE_DTYPE),
+        'Volume': compact_volume(np.array([today['Volume'].sum()])),
+    }, index=pd.DatetimeIndex([today.index[0]], name='Date'))
+
+
+def patch_live_row(prev, bars):
+    """장중 봉으로 가격 지표만 갱신한 새 결과 dict (재무 지표는 그대로), 갱신할 수 없으면 None"""
+    if prev['price_data'] is None or prev['running_max'] is None or bars is None or bars.empty:
+        return None
+    appended = append_bars(prev, daily_bar(bars))
+    if appended is None:
+        return None
+    return {**prev, **price_fields(*appended)}
+
+
+class LivePoller:
+    """
+    실시간 모드 폴링 상태 (세션별)
+    종목을 batch_size 개씩 차례로(round-robin) 조회하여 폴링 1회의 요청 수를 제한하고,
+    모든 종목을 봉 간격 안에 한 바퀴 돌도록 폴링 간격을 정함
+    """
+
+    def __init__(self, interval, batch_size=LIVE_BATCH_SIZE):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.cursor = 0
+        self.last_poll = None
+        self._seen = {}  # 행 위치 -> 마지막으로 반영한 (봉 시각, 종가)
+
+    def tick_seconds(self, n_rows):
+        batches = max(1, -(-n_rows // self.batch_size))
+        return max(LIVE_MIN_TICK, INTRADAY_INTERVALS[self.interval] / batches)
+
+    def seconds_until_next(self, n_rows):
+        if self.last_poll is None:
+            return 0
+        return max(0, self.last_poll + self.tick_seconds(n_rows) - time.monotonic())
+
+    def poll(self, results):
+        """
+        다음 batch 의 장중 봉을 조회하여 바뀐 행만 results 에서 교체
+        반환값: 갱신된 행 위치 목록
+        """
+        self.last_poll = time.monotonic()
+        # 휴장일에는 새 장중 봉이 없으므로 요청하지 않음
+        if not NYSE.is_session(NYSE.today()):
+            return []
+        positions = [i for i, r in enumerate(results) if r['price_data'] is not None]
+        if not positions:
+            return []
+        size = min(self.batch_size, len(positions))
+        batch = [positions[(self.cursor + k) % len(positions)] for k in range(size)]
+        self.cursor = (self.cursor + size) % len(positions)
+
+        updated = []
+        for position in batch:
+            prev = results[position]
+            try:
+                bars = get_intraday_bars(prev['티커'], self.interval)
+            except (CircuitOpenError, DeadlineExceeded):
+                # 회로가 열리면 이번 폴링은 중단 (다음 폴링에서 다시 시도)
+                break
+            if bars is None or bars.empty:
+                continue
+            last = (bars.index[-1], bars['Close'].iloc[-1])
+            if self._seen.get(position) == last:
+                continue
+            patched = patch_live_row(prev, bars)
+            if patched is not None:
+                results[position] = patched
+                self._seen[position] = last
+                updated.append(position)
+        return updated
+
+
+def patch_result_frame(result_df, results, positions):
+    """result_frame 결과에서 positions 행만 results 값으로 교체 (dtype 유지)"""
+    if not positions:
+        return
+    rows = result_df.index[positions]
+    values = pd.DataFrame([results[p] for p in positions], index=rows)
+    for col in PRICE_FIELDS + ['running_max']:
+        result_df.loc[rows, col] = values[col].astype(result_df[col].dtype)
+    for col in ('price_data', 'daily_changes', 'cumulative_returns'):
+        for label, value in zip(rows, values[col]):
+            result_df.at[label, col] = value
+
+
+# -----------------------------
+# 상세 차트용 이동평균 데이터
+# -----------------------------
+MA_PERIODS = [200, 240, 365]
+CHART_DISPLAY_DAYS = 547  # 1년 6개월
+
+
+def lookback_start(display_start, bars, interval="1d"):
+    """display_start 이전에 bars 개 봉을 확보하기 위한 조회 시작일 (휴장일 여유 포함)"""
+    days_per_bar = 7 if interval == "1wk" else 7 / 5
+    return display_start - timedelta(days=int(bars * days_per_bar * 1.1) + 7)
+
+
+class _ExtendedHistory:
+    """
+    (티커, 마지막 날짜) 별로 앞쪽으로 확장한 일봉 시계열 보관
+    일봉 → 주봉 전환처럼 더 긴 구간이 필요해지면 이미 가진 구간 앞쪽만 추가 조회
+    """
+
+    kind = "process"
+
+    def __init__(self):
+        self.name = "extended_history"
+        self.store = LRUStore(max_entries=200, max_bytes=64 * 1024 * 1024)
+
+    def clear(self):
+        self.store.clear()
+
+    def purge_ticker(self, ticker):
+        return self.store.remove_where(lambda key: key[0] == ticker)
+
+
+extended_history = register(_ExtendedHistory())
+
+
+def extend_history(ticker, price_data, start):
+    """
+    price_data 앞쪽으로 start 까지 부족한 구간만 조회하여 합침
+    조회에 실패하거나 차단되면 가지고 있는 데이터만 반환
+    """
+    key = (ticker, price_data.index[-1].date())
+    cached = extended_history.store.get(key)
+    if cached is not None and cached[0][1] <= price_data.index[0].date():
+        # (확장된 시계열, 조회를 마친 시작일) - 첫 봉이 아닌 조회 시작일로 비교해야 휴장일 구간을 다시 조회하지 않음
+        base, covered_from = cached[0]
+    else:
+        base, covered_from = price_data, price_data.index[0].date()
+
+    if start >= covered_from:
+        return base
+    if not calendar_for(ticker).has_sessions(start, covered_from - timedelta(days=1)):
+        # 앞쪽 구간이 휴장일뿐이면 조회하지 않고 조회를 마친 것으로 기록
+        extended_history.store.put(key, (base, start))
+        return base
+    try:
+        prefix = get_stock_data(ticker, start, covered_from - timedelta(days=1))
+    except (CircuitOpenError, DeadlineExceeded):
+        prefix = None
+    if prefix is None or prefix.empty:
+        return base
+    merged = pd.concat([prefix, base])
+    merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+    extended_history.store.put(key, (merged, start))
+    return merged
+
+
+def resample_weekly(daily):
+    """일봉 → 주봉 (금요일 기준)"""
+    weekly = daily.astype({'Volume': np.int64}).resample('W-FRI').agg(
+        {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+    )
+    return weekly.dropna(subset=['Close'])
+
+
+def chart_history(ticker, price_data, interval="1d", display_days=CHART_DISPLAY_DAYS):
+    """
+    분석 기간의 주가(price_data)를 재사용하여 상세 차트 데이터 생성
+    이동평균(MA200/240/365) 계산에 필요한 앞쪽 구간만 추가로 조회
+    표시 구간: 분석 시작일과 (마지막 날짜 - display_days) 중 이른 날짜부터
+    """
+    end = price_data.index[-1]
+    display_start = min(price_data.index[0], end - pd.Timedelta(days=display_days))
+    need_from = lookback_start(display_start.date(), max(MA_PERIODS), interval)
+
+    daily = extend_history(ticker, price_data, need_from)
+    df = resample_weekly(daily) if interval == "1wk" else daily[["Open", "High", "Low", "Close", "Volume"]].copy()
+
+    # 이동평균선 계산 (앞쪽 데이터가 부족한 구간은 NaN 으로 남김)
+    for ma_period in MA_PERIODS:
+        df[f"MA{ma_period}"] = rolling_mean(df["Close"].to_numpy(), ma_period)[:, 0]
+    df = df[df.index >= display_start]
+    return df if not df.empty else None
+
+
+def as_date(value):
+    """str(YYYY-MM-DD) / datetime / date 를 date 로"""
+    if isinstance(value, str):
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def run_analysis(portfolio_df, start_date, end_date, timeout=None, use_checkpoint=True, progress=None):
+    """
+    포트폴리오 전체 분석
+    - timeout: 전체 제한 시간(초), 없으면 무제한
+    - use_checkpoint: 종목별 결과를 체크포인트에 저장하고 중단된 실행을 이어받음
+      시작일/종목 구성이 같고 종료일만 늘어난 경우 마지막 완료 실행에 새 봉만 이어 붙임
+    - progress: progress(완료 수, 전체 수) 콜백
+    반환값: (results, {'resumed': 체크포인트에서 이어받은 수, 'extended': 새 봉만 이어 붙인 수,
+                       'quarantined': 격리 중인 티커 목록})
+    """
+    tickers = portfolio_df['티커'].tolist()
+    checkpoint = RunCheckpoint(start_date, end_date, tickers) if use_checkpoint else None
+    done = checkpoint.load() if checkpoint else {}
+
+    # 이전 완료 실행 (같은 시작일/종목 구성, 더 이른 종료일)
+    last_run = LastRun(start_date, tickers) if use_checkpoint else None
+    previous = {}
+    if last_run:
+        saved = last_run.load()
+        if saved is not None and as_date(saved[0]) < as_date(end_date) and len(saved[1]) == len(portfolio_df):
+            previous = dict(enumerate(saved[1]))
+
+    results = []
+    extended = 0
+    total = len(portfolio_df)
+    with run_deadline(timeout):
+        for position, (idx, row) in enumerate(portfolio_df.iterrows()):
+            result = done.get(idx)
+            if result is None:
+                result = extend_row(previous[position], row, end_date) if position in previous else None
+                if result is not None:
+                    extended += 1
+                else:
+                    result = analyze_row(row, start_date, end_date)
+                # 누락 필드가 있는 종목은 다음 실행에서 다시 조회
+                if checkpoint and not result['missing_fields']:
+                    checkpoint.save(idx, result)
+            results.append(result)
+            if progress:
+                progress(len(results), total)
+
+    # 모든 종목이 완료되면 체크포인트 삭제 (다음 분석은 새로 시작)하고 다음 증분 실행의 기준으로 저장
+    if checkpoint and not any(r['missing_fields'] for r in results):
+        checkpoint.clear()
+        last_run.save(end_date, results)
+
+    # 재무 지표 이력에 변경분만 추가 (history 는 indices → engine 을 import 하므로 여기서 import)
+    from history import record_fundamentals
+
+    record_fundamentals(results)
+
+    # 격리 중이라 조회를 건너뛴 (endpoint 가 하나라도 있는) 종목
+    skipped = sorted(quarantine.quarantined(tickers))
+    return results, {'resumed': len(done), 'extended': extended, 'quarantined': skipped}
+
+
+# -----------------------------
+# 결과 테이블 / 수익률 행렬
+# -----------------------------
+SUMMARY_COLUMNS = ['팀', '자산', '섹터', '기업명', '티커', '시가총액'] + PRICE_FIELDS + FINVIZ_FIELDS + ['갱신 지연']
+LABEL_COLUMNS = ['팀', '자산', '섹터']
+NUMERIC_COLUMNS = PRICE_FIELDS + FINVIZ_FIELDS
+
+
+def result_frame(results):
+    """
+    분석 결과 DataFrame (compact dtype)
+    팀/자산/섹터는 category, 지표 컬럼은 float32 (값이 없으면 NaN)
+    기업명/티커는 종목마다 달라 category 로 얻는 이득이 없으므로 그대로 둠
+    """
+    df = pd.DataFrame(results)
+    for col in LABEL_COLUMNS:
+        df[col] = df[col].astype('category')
+    for col in NUMERIC_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors='coerce').astype(PRICE_DTYPE)
+    return df
+
+
+def summary_frame(results):
+    """중첩 Series 를 제외한 결과 테이블"""
+    df = result_frame(results)[SUMMARY_COLUMNS].copy()
+    df['시가총액'] = df['시가총액'].astype(str)
+    df['stale_fields'] = [",".join(r['stale_fields']) for r in results]
+    return df
+
+
+def session_footprint(results, result_df=None):
+    """
+    세션 하나가 보관하는 분석 결과의 메모리 사용량 (bytes)
+    results 와 result_df 는 같은 Series/DataFrame 객체를 공유하므로 한 번만 집계
+    """
+    price = sum(int(r['price_data'].memory_usage(deep=True).sum()) for r in results if r['price_data'] is not None)
+    series = sum(
+        int(r[col].memory_usage(deep=True))
+        for r in results for col in ('daily_changes', 'cumulative_returns') if r[col] is not None
+    )
+    table = 0
+    if result_df is not None:
+        flat = result_df.drop(columns=['price_data', 'daily_changes', 'cumulative_returns'], errors='ignore')
+        table = int(flat.memory_usage(index=True, deep=True).sum())
+    return {'price_data': price, 'series': series, 'table': table, 'total': price + series + table}
+
+
+def return_matrices(results):
+    """
+    날짜 × 티커 행렬 {'close', 'daily_changes', 'cumulative_returns'}
+    같은 티커가 여러 섹터에 있으면 한 번만 포함
+    인덱스는 거래일 달력 (종목마다 다른 봉 timestamp 는 날짜로 합치고 빠진 봉은 NaN)
+    """
+    series = {'close': {}, 'daily_changes': {}, 'cumulative_returns': {}}
+    for r in results:
+        ticker = r['티커']
+        if r['price_data'] is None or ticker in series['close']:
+            continue
+        series['close'][ticker] = r['price_data']['Close']
+        series['daily_changes'][ticker] = r['daily_changes']
+        series['cumulative_returns'][ticker] = r['cumulative_returns']
+    return {
+        name: NYSE.align(pd.concat(data, axis=1)) if data else pd.DataFrame()
+        for name, data in series.items()
+    }
+
+
+def daily_close_matrix(close):
+    """
+    종가 행렬을 거래일 달력으로 정렬 (float64)
+    거래소마다 일봉 timestamp(시각)가 달라 같은 날이 여러 행으로 나뉠 수 있으므로 날짜로 묶음
+    """
+    return NYSE.align(close.astype(np.float64))
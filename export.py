@@ -0,0 +1,100 @@
+"""
+분석 결과 내보내기 (Arrow IPC / Parquet)
+- 결과 테이블(summary)과 날짜 × 티커 행렬(close/daily_changes/cumulative_returns)을 분석 결과마다 한 번만 Arrow 로 만들어 공유
+  (히트맵 등 차트는 같은 Arrow 버퍼 위의 pandas 행렬을, 다운로드 버튼은 Arrow 테이블을 사용)
+- Arrow IPC(.arrow) 는 압축하지 않으므로 read_table 로 memory-map 하여 다른 프로세스/도구에서 복사 없이 읽을 수 있음
+- Parquet 은 zstd 압축 (보관/전달용)
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from engine import return_matrices, summary_frame
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+MIME = {"parquet": "application/vnd.apache.parquet", "arrow": "application/vnd.apache.arrow.file"}
+ARTIFACTS = ["summary", "close", "daily_changes", "cumulative_returns"]
+
+
+def to_arrow(frame, name):
+    """행렬은 날짜 인덱스를 컬럼으로 포함, 결과 테이블은 인덱스 제외"""
+    return pa.Table.from_pandas(frame, preserve_index=name != "summary")
+
+
+def as_float(frame):
+    """ArrowDtype 행렬 → float64 numpy 기반 DataFrame (결측은 NaN, 차트에 넘길 선택 부분에만 사용)"""
+    return pd.DataFrame(frame.to_numpy(dtype=np.float64, na_value=np.nan), index=frame.index, columns=frame.columns)
+
+
+def table_bytes(table, fmt):
+    """Arrow IPC 파일 또는 Parquet 파일 내용 (bytes)"""
+    sink = pa.BufferOutputStream()
+    if fmt == "arrow":
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        pq.write_table(table, sink, compression="zstd")
+    return sink.getvalue().to_pybytes()
+
+
+def arrow_types(arrow_type):
+    """숫자 컬럼은 Arrow 버퍼를 그대로 쓰는 ArrowDtype 으로 (날짜 인덱스/문자열은 기본 변환)"""
+    if pa.types.is_floating(arrow_type) or pa.types.is_integer(arrow_type):
+        return pd.ArrowDtype(arrow_type)
+    return None
+
+
+class ResultTables:
+    """
+    분석 결과 하나의 결과 테이블/행렬
+    table(name): pyarrow.Table, frames: 같은 Arrow 버퍼 위의 pandas DataFrame (차트 입력), payload(name, fmt): 파일 내용
+    Arrow 변환은 분석 결과마다 한 번, 직렬화는 처음 요청할 때 한 번만 수행
+    frames 의 값은 ArrowDtype (결측은 NaN 이 아닌 <NA>) 이므로 numpy 가 필요한 곳에서는 as_float 로 변환
+    """
+
+    def __init__(self, results):
+        built = {"summary": summary_frame(results), **return_matrices(results)}
+        self._tables = {name: to_arrow(frame, name) for name, frame in built.items()}
+        del built
+        self.frames = {name: table.to_pandas(types_mapper=arrow_types) for name, table in self._tables.items()}
+        self._payloads = {}
+
+    def table(self, name):
+        return self._tables[name]
+
+    def payload(self, name, fmt):
+        key = (name, fmt)
+        if key not in self._payloads:
+            self._payloads[key] = table_bytes(self.table(name), fmt)
+        return self._payloads[key]
+
+    def nbytes(self):
+        return sum(table.nbytes for table in self._tables.values()) + sum(map(len, self._payloads.values()))
+
+
+def write_tables(results, out_dir, fmt="parquet"):
+    """결과 테이블과 수익률 행렬을 out_dir 에 저장하고 저장된 경로 목록 반환"""
+    os.makedirs(out_dir, exist_ok=True)
+    tables = ResultTables(results)
+    paths = []
+    for name in ARTIFACTS:
+        path = os.path.join(out_dir, name + FORMATS[fmt])
+        table = tables.table(name)
+        if fmt == "arrow":
+            with pa.OSFile(path, "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        else:
+            pq.write_table(table, path, compression="zstd")
+        paths.append(path)
+    return paths
+
+
+def read_table(path):
+    """저장한 파일을 pyarrow.Table 로 읽기 (.arrow 는 memory-map 이라 파일 크기만큼 메모리를 쓰지 않음)"""
+    if path.endswith(FORMATS["arrow"]):
+        return ipc.open_file(pa.memory_map(path)).read_all()
+    return pq.read_table(path, memory_map=True)
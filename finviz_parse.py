@@ -0,0 +1,138 @@
+"""
+Finviz quote 페이지의 snapshot-table2 추출
+- 페이지 전체(수백 KB)를 파싱하지 않고 문자열 검색으로 snapshot-table2 구간만 잘라서 파싱
+- 파서 백엔드: selectolax → lxml → bs4(html.parser) 중 설치된 것을 순서대로 사용
+  FINVIZ_PARSER 환경 변수(selectolax / lxml / bs4)로 지정 가능
+- FINVIZ_PARSE_WORKERS 가 1 이상이면 잘라낸 구간의 파싱을 프로세스 풀에서 실행 (요청 스레드와 GIL 경합 방지)
+파서 모듈은 import 비용이 있으므로 처음 파싱할 때 import
+"""
+import os
+import threading
+
+SNAPSHOT_CLASS = "snapshot-table2"
+
+BACKENDS = ["selectolax", "lxml", "bs4"]
+
+
+def snapshot_fragment(html):
+    """snapshot-table2 <table> ... </table> 구간 (없으면 None)"""
+    # 클래스 이름은 <style>/<script> 에도 나올 수 있으므로 <table ...> 태그 안에 있는 것만 사용
+    marker = html.find(SNAPSHOT_CLASS)
+    while marker >= 0:
+        start = html.rfind("<table", 0, marker)
+        if start >= 0 and html.find(">", start, marker) < 0:
+            break
+        marker = html.find(SNAPSHOT_CLASS, marker + 1)
+    else:
+        return None
+    # 표 안에 표가 있을 수 있으므로 <table> / </table> 짝을 맞춰 끝 위치를 찾음
+    depth, pos = 0, start
+    while True:
+        open_at = html.find("<table", pos + 1)
+        close_at = html.find("</table>", pos + 1)
+        if close_at < 0:
+            return None
+        if 0 <= open_at < close_at:
+            depth, pos = depth + 1, open_at
+            continue
+        if depth == 0:
+            return html[start:close_at + len("</table>")]
+        depth, pos = depth - 1, close_at
+
+
+def _cells_selectolax(fragment):
+    from selectolax.lexbor import LexborHTMLParser
+
+    return [node.text(strip=True) for node in LexborHTMLParser(fragment).css("td")]
+
+
+def _cells_lxml(fragment):
+    import lxml.html
+
+    table = lxml.html.fragment_fromstring(fragment)
+    return ["".join(s.strip() for s in td.itertext()) for td in table.iter("td")]
+
+
+def _cells_bs4(fragment):
+    from bs4 import BeautifulSoup
+
+    return [td.get_text(strip=True) for td in BeautifulSoup(fragment, "html.parser").find_all("td")]
+
+
+_CELL_PARSERS = {"selectolax": _cells_selectolax, "lxml": _cells_lxml, "bs4": _cells_bs4}
+_MODULES = {"selectolax": "selectolax.lexbor", "lxml": "lxml.html", "bs4": "bs4"}
+_backend = None
+
+
+def _installed(name):
+    try:
+        __import__(_MODULES[name])
+        return True
+    except ImportError:
+        return False
+
+
+def available_backends():
+    """설치된 백엔드 (우선순위 순)"""
+    return [name for name in BACKENDS if _installed(name)]
+
+
+def default_backend():
+    global _backend
+    if _backend is None:
+        requested = os.environ.get("FINVIZ_PARSER")
+        if requested and requested in _MODULES and _installed(requested):
+            _backend = requested
+        else:
+            if requested:
+                print(f"[FINVIZ] parser '{requested}' 를 사용할 수 없어 기본 순서로 선택")
+            _backend = next(name for name in BACKENDS if _installed(name))
+    return _backend
+
+
+def parse_fragment(fragment, backend=None):
+    """snapshot-table2 구간 → {label: value} (label/value 셀이 번갈아 나옴)"""
+    cells = _CELL_PARSERS[backend or default_backend()](fragment)
+    return {cells[i]: cells[i + 1] for i in range(0, len(cells) - 1, 2)}
+
+
+def parse_snapshot(html, backend=None):
+    """quote 페이지 HTML → {label: value}, snapshot-table2 가 없으면 None"""
+    fragment = snapshot_fragment(html)
+    if fragment is None:
+        return None
+    return parse_fragment(fragment, backend)
+
+
+# -----------------------------
+# 프로세스 풀 파싱
+# -----------------------------
+PARSE_WORKERS = int(os.environ.get("FINVIZ_PARSE_WORKERS", "0"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            import multiprocessing
+
+            # 요청 스레드가 도는 프로세스를 fork 하지 않도록 spawn 사용
+            _pool = ProcessPoolExecutor(PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def extract_snapshot(html):
+    """
+    parse_snapshot 과 같지만 PARSE_WORKERS 가 설정되어 있으면 프로세스 풀에서 파싱
+    구간 자르기는 호출한 스레드에서 하여 풀에는 수 KB 만 전달
+    """
+    fragment = snapshot_fragment(html)
+    if fragment is None:
+        return None
+    if PARSE_WORKERS <= 0:
+        return parse_fragment(fragment)
+    return _get_pool().submit(parse_fragment, fragment, default_backend()).result()
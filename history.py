@@ -0,0 +1,201 @@
+"""
+Finviz 재무 지표 이력 (append-only, Parquet)
+- 분석이 끝날 때마다 종목별 지표(시가총액/부채비율/유동비율/ROE/Runway/Total Cash/FCF)를 기록
+- 마지막으로 기록한 값과 달라진 (티커, 지표) 만 새 part 파일로 추가하므로 매일 갱신해도 변경분만 저장
+- 행: ticker, field, date, value (ticker/field 는 dictionary 인코딩) - 값이 바뀐 날만 있으므로 조회 시 다음 변경일까지 유지되는 계단형
+- part 파일이 많아지면 하나로 합침 (기록된 값은 지우지 않음)
+FUNDAMENTALS_HISTORY=0 이면 기록하지 않음
+
+예)
+    python history.py AAPL MSFT --field ROE
+    python history.py --compact
+"""
+import argparse
+import glob
+import os
+import threading
+import time
+from datetime import date
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from checkpoint import CACHE_DIR
+from indices import parse_market_cap
+
+HISTORY_DIR = os.path.join(CACHE_DIR, "fundamentals")
+
+# 기록하는 지표 (시가총액은 $B 로 변환)
+HISTORY_FIELDS = ['시가총액($B)', '부채비율', '유동비율', 'ROE', 'Runway(년)', 'Total Cash(M$)', 'FCF(M$)']
+
+SCHEMA = pa.schema([
+    ("ticker", pa.dictionary(pa.int32(), pa.string())),
+    ("field", pa.dictionary(pa.int8(), pa.string())),
+    ("date", pa.date32()),
+    ("value", pa.float64()),
+])
+
+_lock = threading.Lock()
+
+
+def observations(result):
+    """분석 결과 한 종목의 {지표: 값} (값이 없거나 오래된 캐시 값(stale)인 지표는 제외)"""
+    values = {'시가총액($B)': parse_market_cap(result.get('시가총액')) / 1e9}
+    for field in HISTORY_FIELDS[1:]:
+        values[field] = pd.to_numeric(result.get(field), errors='coerce')
+    stale = set(result.get('stale_fields') or ())
+    if '시가총액' in stale:
+        stale.add('시가총액($B)')
+    return {field: float(value) for field, value in values.items() if field not in stale and pd.notna(value)}
+
+
+class FundamentalsHistory:
+    """part-*.parquet 파일 모음 (파일 이름 순 = 기록 순)"""
+
+    def __init__(self, path=HISTORY_DIR, compact_after=30):
+        self.path = path
+        self.compact_after = compact_after
+
+    def _parts(self):
+        return sorted(glob.glob(os.path.join(self.path, "part-*.parquet")))
+
+    def version(self):
+        """(part 수, 디렉터리 수정 시각) - part 가 추가/합쳐질 때만 바뀜 (조회 결과 캐시 키)"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return 0, None
+        return len(self._parts()), mtime
+
+    def load(self, tickers=None):
+        """전체 이력 DataFrame (ticker, field, date, value) - 같은 날 여러 번 기록했으면 마지막 값"""
+        parts = self._parts()
+        if not parts:
+            return pd.DataFrame({name: pd.Series(dtype=dtype) for name, dtype in
+                                 [("ticker", object), ("field", object), ("date", "datetime64[ns]"),
+                                  ("value", float)]})
+        filters = [("ticker", "in", list(tickers))] if tickers is not None else None
+        frames = []
+        for part in parts:
+            table = pq.read_table(part, filters=filters)
+            frames.append(table.to_pandas())
+        df = pd.concat(frames, ignore_index=True)
+        df['ticker'] = df['ticker'].astype(str)
+        df['field'] = df['field'].astype(str)
+        df['date'] = pd.to_datetime(df['date'])
+        return df.drop_duplicates(['ticker', 'field', 'date'], keep='last').reset_index(drop=True)
+
+    def latest(self, tickers=None):
+        """{(ticker, field): 마지막으로 기록한 값}"""
+        df = self.load(tickers).sort_values('date', kind='stable')
+        last = df.drop_duplicates(['ticker', 'field'], keep='last')
+        return dict(zip(zip(last['ticker'], last['field']), last['value']))
+
+    def record(self, results, as_of=None):
+        """
+        결과의 지표 중 마지막 기록과 다른 값만 추가
+        반환값: 추가한 행 수
+        """
+        as_of = as_of or date.today()
+        current = {}
+        for result in results:
+            for field, value in observations(result).items():
+                current[(result['티커'], field)] = value
+        if not current:
+            return 0
+
+        with _lock:
+            latest = self.latest({ticker for ticker, _ in current})
+            changed = [(ticker, field, value) for (ticker, field), value in current.items()
+                       if latest.get((ticker, field)) != value]
+            if not changed:
+                return 0
+            tickers, fields, values = zip(*changed)
+            table = pa.table({
+                "ticker": pa.array(tickers).dictionary_encode(),
+                "field": pa.array(fields).dictionary_encode().cast(SCHEMA.field("field").type),
+                "date": pa.array([as_of] * len(changed), pa.date32()),
+                "value": pa.array(values, pa.float64()),
+            }).cast(SCHEMA)
+            os.makedirs(self.path, exist_ok=True)
+            name = f"part-{time.strftime('%Y%m%d%H%M%S')}-{time.time_ns() % 10 ** 9:09d}-{os.getpid()}.parquet"
+            tmp = os.path.join(self.path, f".{name}.tmp")
+            pq.write_table(table, tmp, compression="zstd")
+            os.replace(tmp, os.path.join(self.path, name))
+
+            if len(self._parts()) > self.compact_after:
+                self.compact()
+        return len(changed)
+
+    def compact(self):
+        """part 파일을 하나로 합침 (같은 날 중복 기록만 정리, 값 변경 이력은 그대로 유지)"""
+        parts = self._parts()
+        if len(parts) < 2:
+            return
+        df = self.load()
+        table = pa.Table.from_pandas(
+            df.sort_values(['ticker', 'field', 'date']).assign(date=df['date'].dt.date), preserve_index=False
+        ).cast(SCHEMA)
+        # 합친 파일은 마지막 part 의 이름을 이어받으므로 이후에 추가되는 part 보다 먼저 읽힘
+        name = os.path.basename(parts[-1]).replace(".parquet", "-compact.parquet")
+        tmp = os.path.join(self.path, f".{name}.tmp")
+        pq.write_table(table, tmp, compression="zstd")
+        os.replace(tmp, os.path.join(self.path, name))
+        for part in parts:
+            os.remove(part)
+
+    def series(self, ticker, field=None):
+        """
+        한 종목의 지표 변화 (날짜 × 지표, 값이 바뀐 날만)
+        field 를 지정하면 해당 지표의 Series
+        """
+        df = self.load([ticker])
+        wide = df.pivot_table(index='date', columns='field', values='value', aggfunc='last').sort_index()
+        wide = wide.reindex(columns=[f for f in HISTORY_FIELDS if f in wide.columns]).ffill()
+        wide.columns.name = None
+        if field is None:
+            return wide
+        return wide[field] if field in wide.columns else pd.Series(dtype=float, name=field)
+
+    def stats(self):
+        parts = self._parts()
+        return {
+            'parts': len(parts),
+            'bytes': sum(os.path.getsize(part) for part in parts),
+            'rows': sum(pq.ParquetFile(part).metadata.num_rows for part in parts),
+        }
+
+
+def record_fundamentals(results):
+    """분석 결과의 지표 변경분을 기본 이력 저장소에 추가 (실패해도 분석에는 영향 없음)"""
+    if os.environ.get("FUNDAMENTALS_HISTORY") == "0":
+        return 0
+    try:
+        return FundamentalsHistory().record(results)
+    except Exception as e:
+        print(f"[HISTORY] 재무 지표 이력 저장 실패: {e}")
+        return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="재무 지표 이력 조회")
+    parser.add_argument("tickers", nargs="*", help="조회할 티커")
+    parser.add_argument("--field", choices=HISTORY_FIELDS, help="지표 (없으면 전체)")
+    parser.add_argument("--compact", action="store_true", help="part 파일 합치기")
+    args = parser.parse_args(argv)
+
+    history = FundamentalsHistory()
+    if args.compact:
+        history.compact()
+    stats = history.stats()
+    print(f"이력: {stats['rows']}행, part {stats['parts']}개, {stats['bytes'] / 1024:.0f} KB ({history.path})")
+    with pd.option_context("display.width", 200, "display.max_rows", 500):
+        for ticker in args.tickers:
+            series = history.series(ticker, args.field)
+            print(f"\n[{ticker}]")
+            print(series.to_string() if len(series) else "기록 없음")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+HTTP 응답 디스크 캐시 (fetch 계층)
+- 압축 응답 요청: gzip/deflate, brotli 모듈이 설치되어 있으면 br 도 (urllib3 가 지원하는 인코딩)
+- 200 응답의 본문과 ETag / Last-Modified 를 SQLite(.cache/http.sqlite)에 저장
+- 함수 캐시(SWR)가 만료되어 다시 요청할 때 If-None-Match / If-Modified-Since 를 보내고,
+  304 면 저장된 본문으로 응답 (본문을 다시 받지 않음)
+- Cache-Control max-age 이내면 요청하지 않고 저장된 본문 사용, no-store 응답은 저장하지 않음
+- 엔드포인트별 요청 수/304/전송 바이트/절약 바이트 집계 (프로세스 단위)
+HTTP_CACHE=0 이면 디스크 캐시를 사용하지 않음 (압축 요청과 집계는 유지)
+"""
+import os
+import re
+import threading
+import time
+import zlib
+from collections import defaultdict
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from urllib3.util import make_headers
+
+from checkpoint import CACHE_DIR
+from jobqueue import connect
+from profiling import HTTP, timed
+
+HTTP_CACHE_DB = os.path.join(CACHE_DIR, "http.sqlite")
+
+# 이 시간보다 오래 갱신되지 않은 응답은 삭제
+HTTP_CACHE_MAX_AGE = 7 * 86400
+
+ACCEPT_ENCODING = make_headers(accept_encoding=True)["accept-encoding"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    content_type TEXT,
+    max_age REAL,
+    body BLOB NOT NULL,
+    wire_bytes INTEGER NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class ResponseStore:
+    """요청 URL(쿼리 포함) → 저장된 응답 (본문은 zlib 압축), 스레드마다 연결을 따로 사용"""
+
+    def __init__(self, path=HTTP_CACHE_DB, max_age=HTTP_CACHE_MAX_AGE):
+        self.path = path
+        self._local = threading.local()
+        self.purge(max_age)
+
+    @property
+    def conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path, SCHEMA)
+        return conn
+
+    def get(self, key):
+        row = self.conn.execute("SELECT * FROM responses WHERE key = ?", (key,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def put(self, key, endpoint, response, body, wire_bytes, max_age):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses"
+            " (key, endpoint, etag, last_modified, content_type, max_age, body, wire_bytes, fetched_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, endpoint, response.headers.get("ETag"), response.headers.get("Last-Modified"),
+             response.headers.get("Content-Type"), max_age, zlib.compress(body, 1), wire_bytes, time.time()),
+        )
+
+    def touch(self, key, max_age):
+        """304: 본문은 그대로 두고 갱신 시각/max-age 만 변경"""
+        self.conn.execute(
+            "UPDATE responses SET fetched_at = ?, max_age = ? WHERE key = ?", (time.time(), max_age, key)
+        )
+
+    def purge(self, max_age):
+        cur = self.conn.execute("DELETE FROM responses WHERE fetched_at < ?", (time.time() - max_age,))
+        return cur.rowcount
+
+    def size(self):
+        """(항목 수, 저장된 본문 바이트)"""
+        row = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM responses").fetchone()
+        return row[0], row[1]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def response_store():
+    """디스크 캐시 (HTTP_CACHE=0 이면 None)"""
+    global _store
+    if os.environ.get("HTTP_CACHE", "1") == "0":
+        return None
+    with _store_lock:
+        if _store is None:
+            try:
+                _store = ResponseStore(os.environ.get("HTTP_CACHE_DB", HTTP_CACHE_DB))
+            except Exception as e:
+                # 디스크에 쓸 수 없는 환경: 캐시 없이 요청만 함
+                print(f"[HTTP CACHE] 사용할 수 없음: {e}")
+                _store = False
+        return _store or None
+
+
+# -----------------------------
+# 엔드포인트별 집계
+# -----------------------------
+_stats_lock = threading.Lock()
+_stats = defaultdict(lambda: {"requests": 0, "not_modified": 0, "fresh": 0,
+                              "wire_bytes": 0, "body_bytes": 0, "saved_bytes": 0})
+
+
+def _count(endpoint, **values):
+    with _stats_lock:
+        stats = _stats[endpoint]
+        for name, value in values.items():
+            stats[name] += value
+
+
+def http_stats():
+    """
+    {엔드포인트: {requests, not_modified, fresh, wire_bytes, body_bytes, saved_bytes}}
+    saved_bytes = 압축으로 줄어든 바이트 + 304/max-age 로 다시 받지 않은 바이트
+    """
+    with _stats_lock:
+        return {endpoint: dict(s) for endpoint, s in _stats.items()}
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+# -----------------------------
+# 요청
+# -----------------------------
+def _wire_bytes(response, body):
+    """실제로 전송된(압축된) 본문 크기"""
+    raw = getattr(response, "raw", None)
+    try:
+        sent = raw.tell()
+        if sent:
+            return sent
+    except Exception:
+        pass
+    length = response.headers.get("Content-Length")
+    return int(length) if length and length.isdigit() else len(body)
+
+
+def _max_age(headers):
+    """Cache-Control → (저장 가능 여부, max-age 초 또는 None)"""
+    cache_control = headers.get("Cache-Control", "").lower()
+    if "no-store" in cache_control:
+        return False, None
+    if "no-cache" in cache_control:
+        return True, None
+    match = _MAX_AGE.search(cache_control)
+    return True, float(match.group(1)) if match else None
+
+
+def _cached_response(url, entry):
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = zlib.decompress(entry["body"])
+    response.headers = CaseInsensitiveDict({"Content-Type": entry["content_type"] or ""})
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+
+def http_get(endpoint, url, params=None, headers=None, timeout=None):
+    """
+    requests.get 대신 사용 (반환값도 Response)
+    endpoint: 집계 이름 (예: 'yahoo_chart', 'finviz_quote')
+    디스크 캐시를 읽거나 쓰지 못해도 요청은 그대로 진행
+    """
+    headers = dict(headers or {})
+    headers.setdefault("Accept-Encoding", ACCEPT_ENCODING)
+    store = response_store()
+    key = requests.Request("GET", url, params=params).prepare().url
+
+    entry = None
+    if store is not None:
+        try:
+            entry = store.get(key)
+        except Exception as e:
+            print(f"[HTTP CACHE] 읽기 실패: {e}")
+    if entry is not None:
+        if entry["max_age"] is not None and time.time() - entry["fetched_at"] < entry["max_age"]:
+            response = _cached_response(key, entry)
+            _count(endpoint, fresh=1, body_bytes=len(response.content), saved_bytes=entry["wire_bytes"])
+            return response
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    with timed(HTTP, endpoint):
+        response = requests.get(url, params=params, headers=headers, timeout=timeout)
+
+    if response.status_code == 304 and entry is not None:
+        _, max_age = _max_age(response.headers)
+        try:
+            store.touch(key, max_age)
+        except Exception as e:
+            print(f"[HTTP CACHE] 갱신 실패: {e}")
+        cached = _cached_response(key, entry)
+        _count(endpoint, requests=1, not_modified=1, body_bytes=len(cached.content),
+               saved_bytes=entry["wire_bytes"])
+        return cached
+
+    body = response.content
+    wire = _wire_bytes(response, body)
+    _count(endpoint, requests=1, wire_bytes=wire, body_bytes=len(body), saved_bytes=max(len(body) - wire, 0))
+
+    if response.status_code == 200 and store is not None:
+        cacheable, max_age = _max_age(response.headers)
+        has_validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+        if cacheable and (has_validator or max_age):
+            try:
+                store.put(key, endpoint, response, body, wire, max_age)
+            except Exception as e:
+                print(f"[HTTP CACHE] 저장 실패: {e}")
+    return response
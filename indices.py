@@ -0,0 +1,126 @@
+"""
+팀/자산/섹터 지수(NAV) 산출
+종가 행렬(날짜 × 티커)과 시가총액으로 그룹별 시가총액 가중/동일 가중 NAV(시작 = 100) 계산
+그룹 구분마다 (보유 가치 × 수익률 | 보유 가치) 행렬과 소속 행렬의 행렬곱 한 번으로 모든 그룹을 계산
+"""
+import numpy as np
+import pandas as pd
+
+from engine import daily_close_matrix, return_matrices
+
+INDEX_GROUPS = ['팀', '자산', '섹터']
+
+# 가중 방식 (표시 이름 → 내부 값)
+WEIGHTINGS = {'시가총액 가중': 'cap', '동일 가중': 'equal'}
+
+# 리밸런싱 주기 (표시 이름 → pandas 기간 코드, None = 시작일 비중 유지)
+REBALANCE = {'없음': None, '월간': 'M', '분기': 'Q', '매일': 'D'}
+
+_CAP_UNITS = {'T': 1e12, 'B': 1e9, 'M': 1e6, 'K': 1e3}
+
+
+def parse_market_cap(value):
+    """'150.5B', '1.2T', '850M' 형식의 시가총액 → 달러 (읽을 수 없으면 NaN)"""
+    if not isinstance(value, str):
+        return np.nan
+    value = value.strip()
+    try:
+        if value[-1:] in _CAP_UNITS:
+            return float(value[:-1]) * _CAP_UNITS[value[-1]]
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+def membership(results, tickers, column):
+    """티커 × 그룹 소속 행렬 (같은 티커가 여러 그룹에 있을 수 있음)"""
+    groups = list(dict.fromkeys(str(r[column]) for r in results))
+    position = {t: i for i, t in enumerate(tickers)}
+    matrix = np.zeros((len(tickers), len(groups)))
+    for r in results:
+        if r['티커'] in position:
+            matrix[position[r['티커']], groups.index(str(r[column]))] = 1.0
+    return matrix, groups
+
+
+def rebalance_rows(index, rebalance):
+    """각 날짜에 적용되는 비중을 정한 날짜(리밸런싱일)의 행 위치"""
+    n = len(index)
+    if rebalance is None:
+        return np.zeros(n, dtype=np.int64)
+    if rebalance == 'D':
+        return np.arange(n)
+    periods = index.to_period(rebalance).asi8
+    starts = np.r_[True, periods[1:] != periods[:-1]]
+    return np.maximum.accumulate(np.where(starts, np.arange(n), 0))
+
+
+def holdings(close, rows, scale):
+    """
+    전일 보유 가치 행렬 (t-1 일 가격 × 종목별 배율)
+    rows: rebalance_rows 결과
+    scale: 종목별 배율 (시가총액 가중 = 주식 수, 동일 가중 = None → 리밸런싱일 가격의 역수)
+    리밸런싱일에 가격이 없던(상장 전) 종목은 다음 리밸런싱까지 제외
+    """
+    base = close[rows]
+    if scale is None:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scale = 1.0 / base
+    value = close * scale
+    value[np.isnan(base)] = np.nan
+    return value[:-1]
+
+
+def group_returns(held, returns, member):
+    """
+    그룹별 일간 수익률 (날짜-1 × 그룹)
+    [보유 가치 × 수익률 ; 보유 가치] 를 세로로 쌓아 소속 행렬과 한 번에 곱한 뒤 나눔
+    """
+    n = len(held)
+    stacked = np.vstack([held * returns, held]) @ member
+    weighted, total = stacked[:n], stacked[n:]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(total > 0, weighted / total, 0.0)
+
+
+def build_indices(results, weighting='cap', rebalance=None):
+    """
+    그룹별 NAV (시작 = 100)
+    반환값: {'전체': Series, '팀' / '자산' / '섹터': 날짜 × 그룹 DataFrame}
+    시가총액 가중: 현재 시가총액 / 현재가 를 주식 수로 보고 보유 (시가총액을 알 수 없는 종목은 제외)
+    동일 가중: 리밸런싱일마다 같은 금액으로 다시 나눔
+    """
+    close_df = return_matrices(results)['close']
+    if close_df.empty:
+        return {}
+    close_df = daily_close_matrix(close_df).ffill()
+    tickers = list(close_df.columns)
+    close = close_df.to_numpy()
+
+    scale = None
+    if weighting == 'cap':
+        caps = {r['티커']: parse_market_cap(r['시가총액']) for r in results}
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scale = np.array([caps.get(t, np.nan) for t in tickers]) / close[-1]
+        scale = np.nan_to_num(scale)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns = close[1:] / close[:-1] - 1
+    held = holdings(close, rebalance_rows(close_df.index, rebalance), scale)
+    # 수익률이 없는 날(상장 전)은 보유 가치도 0 으로 두어 그룹 비중에서 제외
+    missing = np.isnan(held) | np.isnan(returns)
+    held[missing] = 0.0
+    returns = np.where(missing, 0.0, returns)
+
+    def nav(group_daily):
+        return 100 * np.cumprod(np.vstack([np.ones((1, group_daily.shape[1])), 1 + group_daily]), axis=0)
+
+    indices = {}
+    everything = np.ones((len(tickers), 1))
+    indices['전체'] = pd.Series(nav(group_returns(held, returns, everything))[:, 0],
+                              index=close_df.index, name='전체')
+    for column in INDEX_GROUPS:
+        member, groups = membership(results, tickers, column)
+        indices[column] = pd.DataFrame(nav(group_returns(held, returns, member)),
+                                       index=close_df.index, columns=groups)
+    return indices
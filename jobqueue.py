@@ -0,0 +1,343 @@
+"""
+워커용 작업 큐와 공유 결과 캐시 (SQLite)
+- JobQueue: 종목별 조회 작업(가격/quote snapshot/재무제표)을 디스크에 저장하고
+  여러 워커 프로세스가 lease 를 잡아 처리 (lease 가 끝나도록 완료하지 못한 작업은 다른 워커가 다시 가져감)
+  실패하면 지수 백오프로 재시도하고 max_attempts 회를 넘으면 failed 로 남김
+- SharedCache: 워커가 조회한 결과를 저장하고 대시보드/CLI 가 네트워크 대신 읽는 캐시
+  SHARED_CACHE_DB 환경 변수에 파일 경로를 지정하면 engine 의 fetcher 가 사용 (없으면 사용 안 함)
+여러 노드에서 같은 파일을 쓰려면 파일 잠금이 올바르게 동작하는 공유 디스크가 필요 (NFS 는 권장하지 않음)
+"""
+import contextlib
+import functools
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from checkpoint import CACHE_DIR
+from resilience import is_good, report_fetched_at
+
+QUEUE_DB = os.path.join(CACHE_DIR, "jobs.sqlite")
+SHARED_CACHE_DB = os.path.join(CACHE_DIR, "shared.sqlite")
+
+QUEUE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    args TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    not_before REAL NOT NULL DEFAULT 0,
+    lease_until REAL,
+    worker TEXT,
+    error TEXT,
+    enqueued_at REAL NOT NULL,
+    finished_at REAL,
+    UNIQUE (kind, ticker, args)
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, not_before);
+CREATE TABLE IF NOT EXISTS host_rate (
+    host TEXT PRIMARY KEY,
+    next_at REAL NOT NULL
+);
+"""
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    name TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (name, key)
+);
+"""
+
+
+def connect(path, schema):
+    """WAL 모드 연결 (읽기는 쓰기와 동시에 가능, 쓰기는 잠금을 기다림)"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(schema)
+    return conn
+
+
+@contextlib.contextmanager
+def transaction(conn):
+    """BEGIN IMMEDIATE: 시작할 때 쓰기 잠금을 잡아 다른 프로세스와 같은 작업을 가져가지 않게 함"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+# -----------------------------
+# 작업 큐
+# -----------------------------
+class JobQueue:
+    """
+    작업 = (kind, ticker, args) - 같은 작업은 한 번만 저장 (여러 universe 에 같은 종목이 있어도 한 번만 조회)
+    status: queued → leased → done / failed / skipped (격리 중인 종목, 재시도하지 않음)
+    작업(dict): id, kind, ticker, args, attempts
+    """
+
+    def __init__(self, path=QUEUE_DB):
+        self.path = path
+        self.conn = connect(path, QUEUE_SCHEMA)
+
+    def enqueue(self, jobs, max_attempts=5, refresh_after=3600):
+        """
+        jobs: [(kind, ticker, args)]
+        이미 있는 작업은 failed 이거나 완료 후 refresh_after 초가 지난 경우에만 다시 대기열에 넣음
+        반환값: 새로 넣거나 다시 넣은 작업 수
+        """
+        now = time.time()
+        before = self.conn.total_changes
+        with transaction(self.conn):
+            self.conn.executemany(
+                """
+                INSERT INTO jobs (kind, ticker, args, max_attempts, enqueued_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (kind, ticker, args) DO UPDATE SET
+                    status = 'queued', attempts = 0, not_before = 0, lease_until = NULL, worker = NULL,
+                    error = NULL, max_attempts = excluded.max_attempts, enqueued_at = excluded.enqueued_at
+                WHERE status = 'failed' OR (status IN ('done', 'skipped') AND finished_at < ?)
+                """,
+                [(kind, ticker, json.dumps(args), max_attempts, now, now - refresh_after)
+                 for kind, ticker, args in jobs],
+            )
+        return self.conn.total_changes - before
+
+    def claim(self, worker, limit=1, lease=120):
+        """대기 중인 작업을 최대 limit 개 가져와 lease 초 동안 점유 (lease 가 끝난 작업도 다시 가져감)"""
+        now = time.time()
+        with transaction(self.conn):
+            self.conn.execute(
+                "UPDATE jobs SET status = 'queued', worker = NULL, lease_until = NULL"
+                " WHERE status = 'leased' AND lease_until < ? AND attempts < max_attempts",
+                (now,),
+            )
+            self.conn.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, error = COALESCE(error, 'lease expired')"
+                " WHERE status = 'leased' AND lease_until < ?",
+                (now, now),
+            )
+            rows = self.conn.execute(
+                "SELECT id, kind, ticker, args, attempts FROM jobs"
+                " WHERE status = 'queued' AND not_before <= ? ORDER BY id LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            self.conn.executemany(
+                "UPDATE jobs SET status = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1"
+                " WHERE id = ?",
+                [(worker, now + lease, row['id']) for row in rows],
+            )
+        return [{'id': row['id'], 'kind': row['kind'], 'ticker': row['ticker'],
+                 'args': json.loads(row['args']), 'attempts': row['attempts'] + 1} for row in rows]
+
+    def complete(self, job, worker):
+        """완료 처리 (lease 를 잃어 다른 워커가 가져간 작업이면 False)"""
+        cur = self.conn.execute(
+            "UPDATE jobs SET status = 'done', finished_at = ?, lease_until = NULL, error = NULL"
+            " WHERE id = ? AND worker = ? AND status = 'leased'",
+            (time.time(), job['id'], worker),
+        )
+        return cur.rowcount > 0
+
+    def fail(self, job, worker, error, backoff=30, max_backoff=900):
+        """실패 처리: max_attempts 미만이면 backoff * 2^(시도-1) 초 뒤 재시도, 아니면 failed"""
+        now = time.time()
+        delay = min(backoff * 2 ** (job['attempts'] - 1), max_backoff)
+        cur = self.conn.execute(
+            """
+            UPDATE jobs SET
+                status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+                finished_at = CASE WHEN attempts >= max_attempts THEN ? END,
+                not_before = ?, lease_until = NULL, error = ?
+            WHERE id = ? AND worker = ? AND status = 'leased'
+            """,
+            (now, now + delay, str(error), job['id'], worker),
+        )
+        return cur.rowcount > 0
+
+    def skip(self, job, worker, reason):
+        """재시도해도 결과가 없는 작업 (격리 중인 종목) - failed 와 달리 재시도/backoff 없이 종료"""
+        cur = self.conn.execute(
+            "UPDATE jobs SET status = 'skipped', finished_at = ?, lease_until = NULL, error = ?"
+            " WHERE id = ? AND worker = ? AND status = 'leased'",
+            (time.time(), str(reason), job['id'], worker),
+        )
+        return cur.rowcount > 0
+
+    def release(self, job, worker, delay, reason):
+        """시도 횟수를 늘리지 않고 delay 초 뒤로 미룸 (회로 차단 등 작업과 무관한 사유)"""
+        cur = self.conn.execute(
+            "UPDATE jobs SET status = 'queued', attempts = attempts - 1, not_before = ?,"
+            " lease_until = NULL, error = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+            (time.time() + delay, str(reason), job['id'], worker),
+        )
+        return cur.rowcount > 0
+
+    def throttle(self, host, rate, requests=1):
+        """
+        호스트별 요청 속도 제한 (rate: 초당 요청 수, 0 이하면 제한 없음)
+        같은 DB 를 쓰는 모든 워커가 다음 요청 가능 시각을 공유하므로 워커 수와 관계없이 합계 기준
+        반환값: 기다린 시간(초)
+        """
+        if rate <= 0:
+            return 0.0
+        with transaction(self.conn):
+            row = self.conn.execute("SELECT next_at FROM host_rate WHERE host = ?", (host,)).fetchone()
+            now = time.time()
+            slot = max(now, row['next_at'] if row else 0.0)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO host_rate (host, next_at) VALUES (?, ?)",
+                (host, slot + requests / rate),
+            )
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+        return max(wait, 0.0)
+
+    def pending(self):
+        """대기 중 + 처리 중인 작업 수"""
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'leased')"
+        ).fetchone()[0]
+
+    def stats(self):
+        """{kind: {status: 개수}}"""
+        counts = {}
+        for row in self.conn.execute("SELECT kind, status, COUNT(*) AS n FROM jobs GROUP BY kind, status"):
+            counts.setdefault(row['kind'], {})[row['status']] = row['n']
+        return counts
+
+    def failures(self, limit=20):
+        return [dict(row) for row in self.conn.execute(
+            "SELECT kind, ticker, attempts, error FROM jobs WHERE status = 'failed'"
+            " ORDER BY finished_at DESC LIMIT ?", (limit,))]
+
+    def purge(self, max_age):
+        """완료/실패/건너뜀 후 max_age 초가 지난 작업 삭제"""
+        cur = self.conn.execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed', 'skipped') AND finished_at < ?",
+            (time.time() - max_age,),
+        )
+        return cur.rowcount
+
+
+# -----------------------------
+# 공유 결과 캐시
+# -----------------------------
+class SharedCache:
+    """
+    (함수 이름, 인자) → (값, 조회 시각) 을 SQLite 에 pickle 로 저장
+    Streamlit 세션 스레드마다 연결을 따로 사용 (sqlite3 연결은 스레드 간 공유 불가)
+    """
+
+    def __init__(self, path=SHARED_CACHE_DB):
+        self.path = path
+        self._local = threading.local()
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "errors": 0}
+
+    @property
+    def conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path, CACHE_SCHEMA)
+        return conn
+
+    def get(self, name, key):
+        """(값, 조회 시각) 또는 None"""
+        row = self.conn.execute(
+            "SELECT value, fetched_at FROM results WHERE name = ? AND key = ?", (name, key)
+        ).fetchone()
+        if row is None:
+            return None
+        return pickle.loads(row['value']), row['fetched_at']
+
+    def put(self, name, key, value):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO results (name, key, value, fetched_at) VALUES (?, ?, ?, ?)",
+            (name, key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), time.time()),
+        )
+
+    def purge(self, max_age):
+        cur = self.conn.execute("DELETE FROM results WHERE fetched_at < ?", (time.time() - max_age,))
+        return cur.rowcount
+
+    def count(self):
+        """{함수 이름: 항목 수}"""
+        return {row['name']: row['n'] for row in self.conn.execute(
+            "SELECT name, COUNT(*) AS n FROM results GROUP BY name")}
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_store():
+    """SHARED_CACHE_DB 환경 변수로 지정한 공유 캐시 (지정하지 않았으면 None)"""
+    global _shared
+    path = os.environ.get("SHARED_CACHE_DB")
+    if not path:
+        return None
+    with _shared_lock:
+        if _shared is None or _shared.path != path:
+            _shared = SharedCache(path)
+        return _shared
+
+
+def cache_key(args):
+    # 날짜는 date / 'YYYY-MM-DD' 문자열 어느 쪽으로 호출해도 같은 키
+    return json.dumps([str(a) for a in args])
+
+
+def shared_cache(ttl):
+    """
+    fetcher 데코레이터: 공유 캐시에 ttl 이내 결과가 있으면 네트워크 호출 없이 반환,
+    없으면 호출하고 정상 결과를 기록 (swr_cache 아래, coalesce 위에 사용)
+    공유 캐시를 읽거나 쓰지 못해도 호출은 그대로 진행
+    """
+    def decorator(fn):
+        name = fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args):
+            store = shared_store()
+            if store is None:
+                return fn(*args)
+            key = cache_key(args)
+            try:
+                entry = store.get(name, key)
+            except Exception as e:
+                store.stats["errors"] += 1
+                print(f"[SHARED CACHE] {name} 읽기 실패: {e}")
+                entry = None
+            if entry is not None and time.time() - entry[1] < ttl:
+                store.stats["hits"] += 1
+                # 위의 swr_cache 가 지금이 아닌 실제 조회 시각으로 ttl/staleness 를 계산하도록 전달
+                report_fetched_at(entry[1])
+                return entry[0]
+
+            store.stats["misses"] += 1
+            value = fn(*args)
+            if is_good(value):
+                try:
+                    store.put(name, key, value)
+                    store.stats["writes"] += 1
+                except Exception as e:
+                    store.stats["errors"] += 1
+                    print(f"[SHARED CACHE] {name} 저장 실패: {e}")
+            return value
+
+        return wrapper
+    return decorator
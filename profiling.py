@@ -0,0 +1,142 @@
+"""
+rerun / 파이프라인 구간 프로파일러 (opt-in)
+- section(name): 이름 붙인 구간의 소요 시간 (중첩 가능, '상위 / 하위' 경로로 집계)
+- timed(FETCH / HTTP, name): fetcher 호출(캐시 적중 포함)과 실제 HTTP 요청 시간
+- 선택 시 실행 전체의 cProfile 또는 pyinstrument(설치된 경우) trace 수집
+현재 실행의 Profiler 는 contextvar 로 전달하므로 프로파일링을 켜지 않았을 때의 비용은 contextvar 조회 한 번
+"""
+import contextlib
+import contextvars
+import importlib.util
+import io
+import time
+
+SECTION = "구간"
+FETCH = "fetcher"
+HTTP = "HTTP"
+
+_current = contextvars.ContextVar("profiler", default=None)
+
+
+def available_tracers():
+    """사용할 수 있는 trace 수집기 (pyinstrument 는 설치된 경우만)"""
+    return ["cProfile"] + (["pyinstrument"] if importlib.util.find_spec("pyinstrument") else [])
+
+
+class Profiler:
+    """
+    한 번의 실행(Streamlit rerun)을 측정
+    trace: None / 'cProfile' / 'pyinstrument'
+    """
+
+    def __init__(self, trace=None):
+        self.trace = trace
+        self.timings = {}  # (구분, 이름) → [호출 수, 초]
+        self.total = None
+        self._path = []
+        self._tracer = None
+
+    @contextlib.contextmanager
+    def activate(self):
+        token = _current.set(self)
+        self._start_trace()
+        started = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.total = time.perf_counter() - started
+            self._stop_trace()
+            _current.reset(token)
+
+    def _start_trace(self):
+        try:
+            if self.trace == "cProfile":
+                import cProfile
+
+                self._tracer = cProfile.Profile()
+                self._tracer.enable()
+            elif self.trace == "pyinstrument":
+                import pyinstrument
+
+                self._tracer = pyinstrument.Profiler()
+                self._tracer.start()
+        except Exception as e:
+            # 다른 프로파일러가 이미 실행 중인 경우 등
+            print(f"[PROFILE] {self.trace} 시작 실패: {e}")
+            self._tracer = None
+
+    def _stop_trace(self):
+        if self._tracer is None:
+            return
+        if self.trace == "cProfile":
+            self._tracer.disable()
+        else:
+            self._tracer.stop()
+
+    def record(self, kind, name, seconds):
+        entry = self.timings.setdefault((kind, name), [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    def breakdown(self):
+        """소요 시간 순 [{구분, 이름, 호출, 시간(ms), 비율(%)}] (비율은 전체 실행 시간 대비)"""
+        total = self.total or sum(seconds for _, seconds in self.timings.values()) or 1.0
+        rows = [
+            {"구분": kind, "이름": name, "호출": calls,
+             "시간(ms)": round(seconds * 1000, 1), "비율(%)": round(seconds / total * 100, 1)}
+            for (kind, name), (calls, seconds) in self.timings.items()
+        ]
+        return sorted(rows, key=lambda row: row["시간(ms)"], reverse=True)
+
+    def trace_file(self):
+        """(파일 이름, 내용 bytes, MIME) 또는 None - cProfile 은 pstats/snakeviz 로 열 수 있는 .prof"""
+        if self._tracer is None:
+            return None
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        if self.trace == "cProfile":
+            import marshal
+
+            self._tracer.create_stats()
+            return f"profile_{stamp}.prof", marshal.dumps(self._tracer.stats), "application/octet-stream"
+        return f"profile_{stamp}.html", self._tracer.output_html().encode(), "text/html"
+
+    def trace_summary(self, limit=30):
+        """cProfile 누적 시간 상위 함수 (텍스트)"""
+        if self._tracer is None or self.trace != "cProfile":
+            return None
+        import pstats
+
+        out = io.StringIO()
+        pstats.Stats(self._tracer, stream=out).sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
+
+
+@contextlib.contextmanager
+def timed(kind, name):
+    """프로파일링 중이면 블록 소요 시간을 (kind, name) 으로 기록"""
+    profiler = _current.get()
+    if profiler is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.record(kind, name, time.perf_counter() - started)
+
+
+@contextlib.contextmanager
+def section(name):
+    """이름 붙인 구간 (중첩된 구간은 '상위 / 하위' 로 기록)"""
+    profiler = _current.get()
+    if profiler is None:
+        yield
+        return
+    profiler._path.append(name)
+    path = " / ".join(profiler._path)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.record(SECTION, path, time.perf_counter() - started)
+        profiler._path.pop()
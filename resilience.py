@@ -0,0 +1,537 @@
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+from cache_registry import LRUStore, first_arg_is, register
+from checkpoint import CACHE_DIR
+
+
+# -----------------------------
+# Single-flight (동시 요청 병합)
+# -----------------------------
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    같은 키로 동시에 들어온 호출을 하나의 실제 호출로 병합
+    먼저 들어온 호출(leader)만 함수를 실행하고, 나머지는 결과를 기다렸다가 공유
+    st.cache_data 는 진행 중인 계산을 공유하지 않으므로 그 아래에서 사용
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = defaultdict(lambda: {"calls": 0, "executed": 0, "coalesced": 0})
+
+    def do(self, name, key, fn, *args, **kwargs):
+        with self._lock:
+            stats = self._stats[name]
+            stats["calls"] += 1
+            call = self._calls.get((name, key))
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[(name, key)] = call
+                stats["executed"] += 1
+            else:
+                stats["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[(name, key)]
+            call.done.set()
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        """함수별 {calls, executed, coalesced} 카운터"""
+        with self._lock:
+            return {name: dict(s) for name, s in self._stats.items()}
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+
+
+# 프로세스 전역 인스턴스 (모든 Streamlit 세션이 공유)
+flight = SingleFlight()
+
+
+def coalesce(fn):
+    """함수 인자를 키로 하여 동시 호출을 병합하는 데코레이터"""
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        return flight.do(name, key, fn, *args, **kwargs)
+
+    return wrapper
+
+
+# -----------------------------
+# 호스트별 회로 차단기 (circuit breaker)
+# -----------------------------
+class CircuitOpenError(Exception):
+    """회로가 열려 있어 호출을 건너뜀"""
+
+
+class DeadlineExceeded(Exception):
+    """분석 제한 시간 초과"""
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 failure_threshold 회 이상이면 회로를 열고(open) reset_timeout 동안 호출을 차단
+    reset_timeout 이 지나면 한 번의 시험 호출(half-open)을 허용하고, 성공하면 다시 닫음
+    """
+
+    def __init__(self, host, failure_threshold=5, reset_timeout=300):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self.short_circuited = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self):
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            self.short_circuited += 1
+        raise CircuitOpenError(f"{self.host} circuit open")
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def reset(self):
+        self.record_success()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "state": self._state(),
+                "failures": self._failures,
+                "short_circuited": self.short_circuited,
+            }
+
+
+class BreakerRegistry:
+    def __init__(self, failure_threshold=5, reset_timeout=300):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._breakers = {}
+
+    def get(self, host):
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(host, self.failure_threshold, self.reset_timeout)
+                self._breakers[host] = breaker
+            return breaker
+
+    def snapshot(self):
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {b.host: b.snapshot() for b in breakers}
+
+
+breakers = BreakerRegistry()
+
+# 회로 차단기가 실패로 간주하는 HTTP 상태 코드 (차단/과부하/서버 오류)
+FAILURE_STATUS = {403, 408, 429, 500, 502, 503, 504}
+
+
+def record_status(breaker, status_code):
+    if status_code in FAILURE_STATUS:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+
+
+# -----------------------------
+# 음성 캐시: 상장폐지/미지원 종목 격리 (quarantine)
+# -----------------------------
+# 종목이 없다는 뜻의 HTTP 상태 코드 (호스트 문제인 FAILURE_STATUS 와 구분)
+NOT_FOUND_STATUS = {404, 410}
+
+
+class Quarantine:
+    """
+    (endpoint, 티커) 별로 '데이터가 없는 종목' 응답(404, 빈 결과)을 기억하여 요청을 건너뜀
+    - 실패할 때마다 격리 기간을 base_ttl 부터 두 배씩 늘림 (max_ttl 까지), 기간이 끝나면 한 번 다시 조회
+    - 다시 조회해서 성공하면 기록 삭제
+    타임아웃/429/5xx/회로 차단처럼 호스트 쪽 실패는 기록하지 않음 (회로 차단기가 담당)
+    path 의 JSON 파일에 저장하므로 다음 실행과 다른 프로세스도 같은 기록을 사용
+    """
+
+    def __init__(self, path=None, base_ttl=6 * 3600, max_ttl=7 * 86400, enabled=True):
+        self.path = path
+        self.enabled = enabled
+        self.base_ttl = base_ttl
+        self.max_ttl = max_ttl
+        self._lock = threading.Lock()
+        self._entries = {}  # (endpoint, ticker) -> {kind, failures, first_failed, last_failed, until}
+        self._mtime = None
+        self.stats = {"skipped": 0, "recorded": 0, "released": 0}
+
+    def _sync(self):
+        """다른 프로세스가 파일을 바꿨으면 다시 읽음 (lock 안에서 호출)"""
+        if not self.path:
+            return
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                rows = json.load(f)
+            self._entries = {(row["endpoint"], row["ticker"]): row["entry"] for row in rows}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"[QUARANTINE] 기록 읽기 실패: {e}")
+        self._mtime = mtime
+
+    def _save(self):
+        if not self.path:
+            return
+        rows = [{"endpoint": endpoint, "ticker": ticker, "entry": entry}
+                for (endpoint, ticker), entry in self._entries.items()]
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(rows, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+            self._mtime = os.path.getmtime(self.path)
+        except OSError as e:
+            print(f"[QUARANTINE] 기록 저장 실패: {e}")
+
+    def blocked(self, endpoint, ticker):
+        """격리 기간 중이면 True (요청하지 않고 바로 실패 처리)"""
+        if not self.enabled:
+            return False
+        with self._lock:
+            self._sync()
+            entry = self._entries.get((endpoint, ticker))
+            if entry is None or time.time() >= entry["until"]:
+                return False
+            self.stats["skipped"] += 1
+            return True
+
+    def record_failure(self, endpoint, ticker, kind):
+        """데이터가 없는 응답을 기록하고 격리 기간 갱신"""
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            self._sync()
+            entry = self._entries.get((endpoint, ticker)) or {"failures": 0, "first_failed": now}
+            entry["failures"] += 1
+            entry["kind"] = kind
+            entry["last_failed"] = now
+            entry["until"] = now + min(self.base_ttl * 2 ** (entry["failures"] - 1), self.max_ttl)
+            self._entries[(endpoint, ticker)] = entry
+            self.stats["recorded"] += 1
+            self._save()
+
+    def record_success(self, endpoint, ticker):
+        with self._lock:
+            # 다른 프로세스가 추가한 기록을 덮어쓰지 않도록 다시 읽은 뒤 삭제 (변경이 없으면 stat 한 번)
+            self._sync()
+            if (endpoint, ticker) not in self._entries:
+                return
+            del self._entries[(endpoint, ticker)]
+            self.stats["released"] += 1
+            self._save()
+
+    def release(self, ticker=None):
+        """ticker 의 기록 삭제 (없으면 전체), 반환값: 삭제한 항목 수"""
+        with self._lock:
+            self._sync()
+            keys = [key for key in self._entries if ticker is None or key[1] == ticker]
+            for key in keys:
+                del self._entries[key]
+            if keys:
+                self.stats["released"] += len(keys)
+                self._save()
+            return len(keys)
+
+    def quarantined(self, tickers=None):
+        """현재 격리 중인 티커 집합 (tickers 가 있으면 그 안에서만)"""
+        now = time.time()
+        with self._lock:
+            self._sync()
+            found = {ticker for (_, ticker), entry in self._entries.items() if now < entry["until"]}
+        return found if tickers is None else found & set(tickers)
+
+    def snapshot(self):
+        """기록 목록 (티커/endpoint 순) - 격리 기간이 끝난 항목은 remaining 0 으로 다음 조회를 기다림"""
+        now = time.time()
+        with self._lock:
+            self._sync()
+            items = sorted(self._entries.items(), key=lambda item: (item[0][1], item[0][0]))
+        return [
+            {
+                "ticker": ticker,
+                "endpoint": endpoint,
+                "kind": entry["kind"],
+                "failures": entry["failures"],
+                "first_failed": entry["first_failed"],
+                "until": entry["until"],
+                "remaining": max(0.0, entry["until"] - now),
+            }
+            for (endpoint, ticker), entry in items
+        ]
+
+
+# 프로세스 전역 인스턴스 (TICKER_QUARANTINE=0 이면 기록/격리하지 않음)
+quarantine = Quarantine(
+    os.path.join(CACHE_DIR, "quarantine.json"), enabled=os.environ.get("TICKER_QUARANTINE") != "0"
+)
+
+
+# -----------------------------
+# 분석 실행 제한 시간 (deadline)
+# -----------------------------
+class Deadline:
+    def __init__(self, seconds):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return self.expires_at - time.monotonic()
+
+
+_current_deadline = contextvars.ContextVar("analysis_deadline", default=None)
+
+# 남은 시간이 이보다 적으면 요청을 보내지 않음
+MIN_REQUEST_TIME = 1.0
+
+
+@contextlib.contextmanager
+def run_deadline(seconds):
+    """with 블록 안의 모든 요청에 전체 제한 시간 적용 (seconds 가 없으면 무제한)"""
+    token = _current_deadline.set(Deadline(seconds) if seconds else None)
+    try:
+        yield
+    finally:
+        _current_deadline.reset(token)
+
+
+def guard_request(host, timeout):
+    """
+    요청 직전 호출: 제한 시간과 회로 상태를 확인하고 사용할 timeout 과 차단기를 반환
+    차단되면 CircuitOpenError / DeadlineExceeded 를 발생 (st.cache_data 에 캐시되지 않음)
+    """
+    deadline = _current_deadline.get()
+    if deadline is not None:
+        remaining = deadline.remaining()
+        if remaining < MIN_REQUEST_TIME:
+            raise DeadlineExceeded(host)
+        timeout = min(timeout, remaining)
+    breaker = breakers.get(host)
+    breaker.before_call()
+    return breaker, timeout
+
+
+# -----------------------------
+# Stale-while-revalidate 캐시
+# -----------------------------
+def is_good(value):
+    """정상 결과인지 (None/"-"/빈 DataFrame 은 실패)"""
+    if value is None:
+        return False
+    if isinstance(value, str) and value == "-":
+        return False
+    if getattr(value, "empty", False):
+        return False
+    return True
+
+
+# 하위 캐시(공유 캐시)가 반환한 값의 실제 조회 시각
+# SWR 캐시가 조회한 시각 대신 이 값으로 ttl/staleness 를 계산 (오래된 값이 새 ttl 을 받지 않도록)
+_fetched_at = contextvars.ContextVar("fetched_at", default=None)
+
+
+def report_fetched_at(timestamp):
+    """캐시된 값을 반환하는 fetcher 데코레이터가 호출: 반환값의 실제 조회 시각"""
+    _fetched_at.set(timestamp)
+
+
+# 정상 값이 없을 때 실패 결과(None/"-")를 캐시하는 시간(초)
+FAILURE_TTL = 300
+
+
+class StaleWhileRevalidate:
+    """
+    마지막으로 성공한 값을 보관하는 프로세스 전역 캐시
+    - ttl 이내: 캐시 값 반환
+    - ttl 초과 ~ max_stale 이내: 캐시 값을 즉시 반환하고 백그라운드에서 갱신
+    - 호출 실패(None/"-"/차단) 시: 남아 있는 마지막 정상 값을 반환
+      정상 값이 없으면 실패 결과를 failure_ttl 동안만 캐시 (일시적 장애가 ttl 내내 남지 않도록)
+    항목 수(max_entries)/메모리(max_bytes) 한도를 넘으면 가장 오래 사용하지 않은 항목부터 제거
+    반환값은 여러 세션이 공유하므로 수정하지 말 것
+    """
+
+    kind = "process (SWR)"
+
+    def __init__(self, fn, ttl, max_stale, max_entries=None, max_bytes=None, failure_ttl=FAILURE_TTL):
+        functools.update_wrapper(self, fn)
+        self.fn = fn
+        self.name = fn.__name__
+        self.ttl = ttl
+        self.failure_ttl = min(failure_ttl, ttl)
+        self.max_stale = max_stale
+        self.store = LRUStore(max_entries=max_entries, max_bytes=max_bytes)
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self.stats = {"hits": 0, "misses": 0, "stale_served": 0, "refreshes": 0, "refresh_failures": 0}
+
+    def _lookup(self, key):
+        entry = self.store.get(key)
+        if entry is not None and time.time() - entry[1] >= self.max_stale:
+            self.store.pop(key)
+            entry = None
+        return entry
+
+    def _fetch(self, args, kwargs):
+        """(값, 조회 시각) - 하위 캐시가 값을 반환했으면 그 값을 실제로 조회한 시각"""
+        token = _fetched_at.set(None)
+        try:
+            value = self.fn(*args, **kwargs)
+            return value, _fetched_at.get() or time.time()
+        finally:
+            _fetched_at.reset(token)
+
+    def _store(self, key, value, fetched_at=None):
+        self.store.put(key, value, stored_at=fetched_at)
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _refresh(self, key, args, kwargs):
+        try:
+            value, fetched_at = self._fetch(args, kwargs)
+            if is_good(value):
+                self._store(key, value, fetched_at)
+                self._count("refreshes")
+            else:
+                self._count("refresh_failures")
+        except Exception:
+            self._count("refresh_failures")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _refresh_async(self, key, args, kwargs):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        # 호출한 쪽의 contextvars(프로파일러)를 사용하되 분석 제한 시간은 제외
+        # (실행이 끝난 뒤에도 도는 갱신이 DeadlineExceeded 로 실패하면 마지막 정상 값이 갱신되지 않음)
+        context = contextvars.copy_context()
+        context.run(_current_deadline.set, None)
+        threading.Thread(target=context.run, args=(self._refresh, key, args, kwargs), daemon=True).start()
+
+    def __call__(self, *args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        entry = self._lookup(key)
+        if entry is not None:
+            value, fetched_at = entry
+            if time.time() - fetched_at < (self.ttl if is_good(value) else self.failure_ttl):
+                self._count("hits")
+                return value
+            if is_good(value):
+                self._count("stale_served")
+                self._refresh_async(key, args, kwargs)
+                return value
+
+        # 없거나 지난 결과가 실패였던 경우: 동기 호출
+        # 실패 결과는 failure_ttl 동안 캐시 (정상 값은 이 경로에 오지 않으므로 덮어쓰지 않음)
+        self._count("misses")
+        value, fetched_at = self._fetch(args, kwargs)
+        self._store(key, value, fetched_at)
+        return value
+
+    def staleness(self, *args, **kwargs):
+        """캐시 값이 ttl 을 넘었으면 경과 시간(초), 신선하거나 없으면 None"""
+        entry = self.store.peek((args, tuple(sorted(kwargs.items()))))
+        if entry is None or not is_good(entry[0]):
+            return None
+        age = time.time() - entry[1]
+        return age if age >= self.ttl else None
+
+    def clear(self):
+        self.store.clear()
+
+    def purge_ticker(self, ticker):
+        return self.store.remove_where(first_arg_is(ticker))
+
+
+swr_caches = []
+
+
+def swr_cache(ttl, max_stale=7 * 86400, max_entries=None, max_bytes=None, failure_ttl=FAILURE_TTL):
+    """st.cache_data 대신 사용하는 stale-while-revalidate 데코레이터"""
+    def decorator(fn):
+        cache = StaleWhileRevalidate(fn, ttl, max_stale, max_entries, max_bytes, failure_ttl)
+        swr_caches.append(cache)
+        register(cache)
+        return cache
+    return decorator
@@ -0,0 +1,124 @@
+"""
+리스크 지표 (가격 경로 통계)
+정렬된 종가 행렬(날짜 × 티커)에서 모든 종목을 한 번에 NumPy 로 계산
+- 최대 낙폭(MDD), 연율화 변동성, 벤치마크 대비 베타, 종목 간 상관계수 행렬
+"""
+import numpy as np
+import pandas as pd
+
+from engine import daily_close_matrix, get_stock_data
+from resilience import CircuitOpenError, DeadlineExceeded
+
+RISK_FIELDS = ['MDD(%)', '변동성(%)', '베타']
+
+# 베타 계산 기준 지수
+BENCHMARK = 'SPY'
+
+# 연율화에 사용하는 연간 거래일 수
+TRADING_DAYS = 252
+
+
+def simple_returns(close):
+    """일간 수익률 행렬 (전일 또는 당일 종가가 없으면 NaN)"""
+    values = close.to_numpy(dtype=np.float64)
+    return values[1:] / values[:-1] - 1
+
+
+def max_drawdown(close):
+    """종목별 최대 낙폭 (%) - 누적 최고가(running max) 대비 최저 비율"""
+    values = close.to_numpy(dtype=np.float64)
+    # fmax 는 NaN 을 무시하므로 상장 전/결측 구간이 있어도 누적 최고가가 유지됨
+    running_max = np.fmax.accumulate(values, axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        drawdown = values / running_max - 1
+    return _nan_reduce(np.nanmin, drawdown) * 100
+
+
+def annualized_volatility(returns):
+    """종목별 연율화 변동성 (%)"""
+    counts = np.sum(~np.isnan(returns), axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        std = _nan_reduce(lambda a, axis: np.nanstd(a, axis=axis, ddof=1), returns)
+    std[counts < 2] = np.nan
+    return std * np.sqrt(TRADING_DAYS) * 100
+
+
+def beta(returns, benchmark_returns):
+    """종목별 베타 = cov(종목, 벤치마크) / var(벤치마크), 두 수익률이 모두 있는 날만 사용"""
+    mask = ~np.isnan(returns) & ~np.isnan(benchmark_returns)[:, None]
+    n = mask.sum(axis=0)
+    x = np.where(mask, returns, 0.0)
+    y = np.where(mask, benchmark_returns[:, None], 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_x = x.sum(axis=0) / n
+        mean_y = y.sum(axis=0) / n
+        cov = ((x - mean_x) * (y - mean_y) * mask).sum(axis=0)
+        var = (((y - mean_y) * mask) ** 2).sum(axis=0)
+        result = cov / var
+    result[n < 2] = np.nan
+    return result
+
+
+def correlation_matrix(returns):
+    """
+    종목 간 상관계수 행렬 (pairwise complete: 두 종목 모두 수익률이 있는 날만 사용)
+    결측 마스크를 포함한 행렬곱 몇 번으로 모든 쌍을 한 번에 계산
+    """
+    mask = (~np.isnan(returns)).astype(np.float64)
+    x = np.nan_to_num(returns)
+    n = mask.T @ mask
+    sum_x = x.T @ mask          # [i, j]: j 도 값이 있는 날의 i 합계
+    sum_xx = (x * x).T @ mask
+    sum_xy = x.T @ x
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = sum_xy - sum_x * sum_x.T / n
+        var_x = sum_xx - sum_x ** 2 / n
+        corr = cov / np.sqrt(var_x * var_x.T)
+    corr[n < 2] = np.nan
+    np.fill_diagonal(corr, np.where(np.diag(n) >= 2, 1.0, np.nan))
+    return np.clip(corr, -1, 1)
+
+
+def _nan_reduce(fn, values):
+    """모든 값이 NaN 인 열은 경고 없이 NaN"""
+    result = np.full(values.shape[1], np.nan)
+    valid = ~np.all(np.isnan(values), axis=0)
+    if valid.any():
+        result[valid] = fn(values[:, valid], axis=0)
+    return result
+
+
+def benchmark_close(start_date, end_date):
+    """벤치마크 종가 (조회할 수 없으면 None)"""
+    try:
+        data = get_stock_data(BENCHMARK, start_date, end_date)
+    except (CircuitOpenError, DeadlineExceeded):
+        return None
+    return None if data is None else data['Close']
+
+
+def risk_report(close, benchmark=None):
+    """
+    close: 종가 행렬 (날짜 × 티커, engine.return_matrices 의 'close')
+    benchmark: 벤치마크 종가 Series (없으면 베타는 NaN)
+    반환값: (티커별 RISK_FIELDS DataFrame, 상관계수 DataFrame)
+    """
+    if close.empty:
+        return pd.DataFrame(columns=RISK_FIELDS), pd.DataFrame()
+
+    close = daily_close_matrix(close)
+    returns = simple_returns(close)
+
+    if benchmark is not None:
+        benchmark = daily_close_matrix(benchmark.to_frame()).reindex(close.index)
+        betas = beta(returns, simple_returns(benchmark).ravel())
+    else:
+        betas = np.full(close.shape[1], np.nan)
+
+    metrics = pd.DataFrame({
+        'MDD(%)': max_drawdown(close),
+        '변동성(%)': annualized_volatility(returns),
+        '베타': betas,
+    }, index=close.columns).astype(np.float32)
+    correlation = pd.DataFrame(correlation_matrix(returns), index=close.columns, columns=close.columns)
+    return metrics, correlation.astype(np.float32)
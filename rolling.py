@@ -0,0 +1,204 @@
+"""
+롤링(이동 구간) 통계
+종가 행렬(날짜 × 티커) 전체를 한 번에 계산, 각 통계는 날짜 수에 대해 O(n)
+- 평균/표준편차/z-score: 누적합의 차이
+- 최소/최대: van Herk/Gil-Werman 블록 prefix/suffix 누적 (구간 길이와 무관)
+- RSI: Wilder 평활 (시간 방향 1회 순회, 종목 방향은 벡터 연산)
+새 봉이 추가되면 RollingStats.update 가 마지막 구간(window) 만 다시 계산
+pandas rolling 과 같이 구간 안의 값이 모두 있어야 값을 계산 (min_periods = window)
+"""
+import numpy as np
+import pandas as pd
+
+ROLLING_FIELDS = ['평균', '표준편차', 'Z-score', '최소', '최대', 'RSI']
+
+
+def _as_matrix(values):
+    values = np.asarray(values, dtype=np.float64)
+    return values[:, None] if values.ndim == 1 else values
+
+
+def _window_counts(valid, window):
+    """각 위치에서 끝나는 구간 안의 유효값 수"""
+    counts = np.cumsum(valid, axis=0)
+    counts[window:] = counts[window:] - counts[:-window]
+    return counts
+
+
+def _window_sums(values, window):
+    sums = np.cumsum(values, axis=0)
+    sums[window:] = sums[window:] - sums[:-window]
+    return sums
+
+
+def rolling_mean_std(values, window, shift=None):
+    """
+    구간 평균과 표본 표준편차 (ddof=1)
+    shift(종목별 기준값)를 빼고 누적하여 큰 가격에서도 자릿수 손실을 줄임
+    """
+    x = _as_matrix(values)
+    valid = ~np.isnan(x)
+    if shift is None:
+        shift = first_valid(x)
+    centered = np.where(valid, x - shift, 0.0)
+    full = _window_counts(valid, window) == window
+
+    s1 = _window_sums(centered, window)
+    s2 = _window_sums(centered * centered, window)
+    mean = np.where(full, s1 / window + shift, np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        var = (s2 - s1 * s1 / window) / (window - 1)
+    std = np.where(full, np.sqrt(np.maximum(var, 0.0)), np.nan)
+    return mean, std
+
+
+def rolling_mean(values, window):
+    return rolling_mean_std(values, window)[0]
+
+
+def rolling_extreme(values, window, accumulate=np.fmax):
+    """
+    구간 최대(np.fmax) / 최소(np.fmin) - van Herk/Gil-Werman
+    window 크기 블록마다 앞→뒤(prefix), 뒤→앞(suffix) 누적을 구하면
+    [i-window+1, i] 구간 값은 suffix[i-window+1] 과 prefix[i] 두 값의 비교로 결정
+    """
+    x = _as_matrix(values)
+    n, cols = x.shape
+    result = np.full((n, cols), np.nan)
+    if n < window:
+        return result
+
+    blocks = -(-n // window)
+    padded = np.full((blocks * window, cols), np.nan)
+    padded[:n] = x
+    shaped = padded.reshape(blocks, window, cols)
+    prefix = accumulate.accumulate(shaped, axis=1).reshape(-1, cols)[:n]
+    suffix = accumulate.accumulate(shaped[:, ::-1], axis=1)[:, ::-1].reshape(-1, cols)[:n]
+
+    result[window - 1:] = accumulate(suffix[:n - window + 1], prefix[window - 1:])
+    full = _window_counts(~np.isnan(x), window) == window
+    result[~full] = np.nan
+    return result
+
+
+def first_valid(x):
+    """종목별 첫 유효값 (없으면 0)"""
+    valid = ~np.isnan(x)
+    first = np.argmax(valid, axis=0)
+    values = x[first, np.arange(x.shape[1])]
+    return np.where(valid.any(axis=0), values, 0.0)
+
+
+def wilder_rsi(values, period, state=None):
+    """
+    RSI (Wilder 평활: alpha = 1/period, 첫 유효 변동값에서 시작)
+    state: 이전 계산의 (직전 종가, 평균 상승, 평균 하락, 유효 변동 수) - 이어서 계산할 때 사용
+    반환값: (rsi 행렬, 마지막 state)
+    종가가 없는 날은 NaN 이며 평활 상태는 그대로 유지
+    """
+    x = _as_matrix(values)
+    n, cols = x.shape
+    if state is None:
+        prev = np.full(cols, np.nan)
+        avg_gain = np.zeros(cols)
+        avg_loss = np.zeros(cols)
+        count = np.zeros(cols, dtype=np.int64)
+    else:
+        prev, avg_gain, avg_loss, count = (a.copy() for a in state)
+
+    alpha = 1.0 / period
+    rsi = np.full((n, cols), np.nan)
+    for t in range(n):
+        delta = x[t] - prev
+        ok = ~np.isnan(delta)
+        gain = np.where(ok, np.maximum(delta, 0.0), 0.0)
+        loss = np.where(ok, np.maximum(-delta, 0.0), 0.0)
+        started = count > 0
+        avg_gain = np.where(ok, np.where(started, avg_gain + alpha * (gain - avg_gain), gain), avg_gain)
+        avg_loss = np.where(ok, np.where(started, avg_loss + alpha * (loss - avg_loss), loss), avg_loss)
+        count = count + ok
+        with np.errstate(invalid='ignore', divide='ignore'):
+            value = 100 - 100 / (1 + avg_gain / avg_loss)
+        value = np.where(avg_loss == 0, np.where(avg_gain == 0, np.nan, 100.0), value)
+        rsi[t] = np.where(ok & (count >= period), value, np.nan)
+        prev = np.where(np.isnan(x[t]), prev, x[t])
+    return rsi, (prev, avg_gain, avg_loss, count)
+
+
+class RollingStats:
+    """
+    종가 행렬의 롤링 통계 (ROLLING_FIELDS 별 날짜 × 티커)
+    update() 로 새 봉 추가/마지막 봉 교체(장중 갱신)를 반영하면 바뀐 행과 그 앞 window 구간만 다시 계산
+    """
+
+    def __init__(self, close, window=20, rsi_period=14):
+        self.window = window
+        self.rsi_period = rsi_period
+        self.columns = close.columns
+        self.index = close.index[:0]
+        self._close = np.empty((0, len(close.columns)))
+        self._shift = first_valid(close.to_numpy(dtype=np.float64))
+        self._stats = {name: np.empty((0, len(close.columns))) for name in ROLLING_FIELDS}
+        # 마지막 행 직전/마지막 행 이후의 RSI 상태 (마지막 봉 교체 시 직전 상태부터 다시 계산)
+        self._rsi_before_last = None
+        self._rsi_state = None
+        self._append(close, 0)
+
+    def _append(self, close, start):
+        """close 의 start 행부터 통계를 계산하여 이어 붙임 (기존 start 이후 행은 교체)"""
+        state = self._rsi_state if start == len(self.index) else self._rsi_before_last
+
+        # 새 행의 구간 통계에 필요한 앞쪽 window - 1 행만 변환하여 계산
+        tail_from = max(0, start - self.window + 1)
+        tail = close.iloc[tail_from:].to_numpy(dtype=np.float64)
+        skip = start - tail_from
+        mean, std = rolling_mean_std(tail, self.window, self._shift)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            zscore = (tail - mean) / std
+        new = {
+            '평균': mean[skip:],
+            '표준편차': std[skip:],
+            'Z-score': zscore[skip:],
+            '최소': rolling_extreme(tail, self.window, np.fmin)[skip:],
+            '최대': rolling_extreme(tail, self.window, np.fmax)[skip:],
+        }
+
+        rows = tail[skip:]
+        head, self._rsi_before_last = wilder_rsi(rows[:-1], self.rsi_period, state)
+        last, self._rsi_state = wilder_rsi(rows[-1:], self.rsi_period, self._rsi_before_last)
+        new['RSI'] = np.concatenate([head, last])
+
+        for name in ROLLING_FIELDS:
+            self._stats[name] = np.concatenate([self._stats[name][:start], new[name]])
+        self._close = np.concatenate([self._close[:start], rows])
+        self.index = close.index
+
+    def update(self, close):
+        """
+        close: 기존 행렬에 봉을 추가(마지막 봉은 교체 가능)한 새 종가 행렬
+        마지막 봉 이전의 날짜나 종가가 같지 않거나(분할/배당 수정 후 재조회) 종목 구성이 바뀌면 전체 재계산
+        반환값: 다시 계산한 행 수
+        """
+        n_old = len(self.index)
+        if (n_old == 0 or len(close) < n_old or not close.columns.equals(self.columns)
+                or not close.index[:n_old - 1].equals(self.index[:n_old - 1])
+                or not np.array_equal(close.iloc[:n_old - 1].to_numpy(dtype=np.float64),
+                                      self._close[:n_old - 1], equal_nan=True)):
+            self.__init__(close, self.window, self.rsi_period)
+            return len(close)
+
+        start = n_old - 1
+        if close.index[start] == self.index[start] and np.array_equal(
+                close.iloc[start].to_numpy(dtype=np.float64), self._close[start], equal_nan=True):
+            start = n_old
+        if start == len(close):
+            return 0
+        self._append(close, start)
+        return len(close) - start
+
+    def frame(self, name):
+        return pd.DataFrame(self._stats[name], index=self.index, columns=self.columns)
+
+    def latest(self):
+        """티커별 마지막 날짜의 통계 (티커 × ROLLING_FIELDS)"""
+        return pd.DataFrame({name: self._stats[name][-1] for name in ROLLING_FIELDS}, index=self.columns)
@@ -0,0 +1,88 @@
+"""
+포트폴리오 표의 서버 측 검색/필터/정렬/페이지 (수천 종목 universe 용)
+- 검색: 티커/기업명/섹터/팀을 합친 소문자 키에서 부분 문자열 검색 (공백으로 나눈 단어를 모두 포함해야 일치)
+  티커가 검색어와 정확히 같은 행은 맨 앞
+- 정렬: 컬럼별 정렬 순서를 처음 요청할 때 한 번만 계산하여 재사용 (값이 없는 행은 항상 마지막, 시가총액은 금액 순)
+표에는 현재 페이지의 행만 포맷/스타일을 적용해 보내므로 전송량은 종목 수가 아닌 페이지 크기에 비례
+"""
+import numpy as np
+import pandas as pd
+
+from indices import parse_market_cap
+
+# 금액 문자열('150.5B') 로 표시하는 컬럼
+MARKET_CAP_COLUMNS = {'시가총액'}
+
+# 값이 없음을 나타내는 표시 문자열
+MISSING_TEXT = ["-", "", "nan", "None"]
+
+
+class TableIndex:
+    """
+    결과 테이블 하나의 검색/정렬 인덱스 (분석 결과가 바뀔 때만 새로 생성)
+    query() 는 조건에 맞는 행 위치(정렬 순서)를 반환
+    """
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.tickers = frame['티커'].astype(str).to_numpy()
+        self.keys = (
+            frame['티커'].astype(str) + " " + frame['기업명'].astype(str) + " "
+            + frame['섹터'].astype(str) + " " + frame['팀'].astype(str)
+        ).str.lower()
+        self._orders = {}
+
+    def __len__(self):
+        return len(self.frame)
+
+    def search(self, text):
+        """검색어의 모든 단어를 포함하는 행 (bool 배열)"""
+        mask = np.ones(len(self.frame), dtype=bool)
+        for word in text.lower().split():
+            mask &= self.keys.str.contains(word, regex=False).to_numpy()
+        return mask
+
+    def order(self, column, ascending=True):
+        """
+        column 기준 정렬 순서 (행 위치 배열)
+        값이 없는 행은 방향과 관계없이 마지막, 같은 값은 방향과 관계없이 원래 순서 유지
+        """
+        key = (column, ascending)
+        if key not in self._orders:
+            values = self.frame[column]
+            if column in MARKET_CAP_COLUMNS:
+                # '1.2T'/'150.5B' 는 문자열이 아닌 금액으로 비교
+                numbers = values.map(parse_market_cap).to_numpy(dtype=np.float64)
+            elif pd.api.types.is_numeric_dtype(values):
+                numbers = values.to_numpy(dtype=np.float64, na_value=np.nan)
+            else:
+                text = values.astype(str).to_numpy()
+                # 문자열 순위 (같은 문자열은 같은 순위) - 내림차순도 부호만 바꿔 안정 정렬
+                _, numbers = np.unique(text, return_inverse=True)
+                numbers = np.where(values.isna().to_numpy() | np.isin(text, MISSING_TEXT), np.nan, numbers)
+            missing = np.isnan(numbers)
+            ranks = np.nan_to_num(numbers if ascending else -numbers)
+            # lexsort 는 마지막 키가 우선, 안정 정렬
+            self._orders[key] = np.lexsort((ranks, missing))
+        return self._orders[key]
+
+    def query(self, text="", sectors=None, sort=None, ascending=True):
+        """검색어/섹터 조건에 맞는 행 위치 (sort 컬럼 순, 없으면 원래 순서)"""
+        mask = self.search(text) if text.strip() else np.ones(len(self.frame), dtype=bool)
+        if sectors:
+            mask &= self.frame['섹터'].astype(str).isin(sectors).to_numpy()
+        order = self.order(sort, ascending) if sort else np.arange(len(self.frame))
+        positions = order[mask[order]]
+
+        exact = text.strip().upper()
+        if exact:
+            first = self.tickers[positions] == exact
+            positions = np.concatenate([positions[first], positions[~first]])
+        return positions
+
+
+def page_slice(positions, page, page_size):
+    """(현재 페이지의 행 위치, 전체 페이지 수) - page 는 1부터, 범위를 벗어나면 마지막 페이지"""
+    pages = max(1, -(-len(positions) // page_size))
+    page = min(max(page, 1), pages)
+    return positions[(page - 1) * page_size: page * page_size], pages
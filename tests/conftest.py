@@ -0,0 +1,7 @@
+import os
+import sys
+
+# 모듈이 저장소 최상위에 있으므로 테스트에서 바로 import 할 수 있도록 경로 추가
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+import charts
+
+pytest.importorskip("streamlit.testing.v1")
+
+
+@pytest.fixture(autouse=True)
+def restore_direct_plotly(monkeypatch):
+    # 테스트 앱이 charts.DIRECT_PLOTLY 를 바꾸므로 테스트가 끝나면 원래 값으로 되돌림
+    monkeypatch.setattr(charts, "DIRECT_PLOTLY", charts.DIRECT_PLOTLY)
+
+
+# AppTest.from_function 은 함수 본문만 스크립트로 실행하므로 경로별로 함수를 따로 둠
+def _direct_app():
+    import plotly.graph_objects as go
+    import streamlit as st
+
+    import charts
+
+    charts.DIRECT_PLOTLY = True
+    fig = go.Figure(go.Scatter(x=[1, 2, 3], y=[3, 1, 2], name="a"))
+    _, right = st.columns(2)
+    with right:
+        charts.show_figure(fig.to_json())
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def _public_app():
+    import plotly.graph_objects as go
+    import streamlit as st
+
+    import charts
+
+    charts.DIRECT_PLOTLY = False
+    fig = go.Figure(go.Scatter(x=[1, 2, 3], y=[3, 1, 2], name="a"))
+    charts.show_figure(fig.to_json())
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def _run(app):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_function(app).run()
+    assert not at.exception
+    return at
+
+
+@pytest.mark.skipif(not charts.DIRECT_PLOTLY, reason="설치된 streamlit 버전에서는 공개 API 경로만 사용")
+def test_direct_message_matches_plotly_chart():
+    at = _run(_direct_app)
+    shown, reference = (chart.proto for chart in at.get("plotly_chart"))
+    assert json.loads(shown.figure.spec) == json.loads(reference.figure.spec)
+    assert shown.figure.config == reference.figure.config
+    assert shown.theme == reference.theme
+    assert shown.use_container_width == reference.use_container_width
+    # with 블록(컬럼) 안에 표시
+    assert len(at.columns[1].get("plotly_chart")) == 1
+
+
+def test_public_fallback():
+    at = _run(_public_app)
+    shown, reference = (chart.proto for chart in at.get("plotly_chart"))
+    assert json.loads(shown.figure.spec) == json.loads(reference.figure.spec)
+
+
+def test_direct_disabled_for_other_versions(monkeypatch):
+    monkeypatch.setattr(charts.st, "__version__", "9.0.0")
+    assert not charts.direct_plotly_supported()
@@ -0,0 +1,79 @@
+import os
+import time
+
+import pytest
+
+from resilience import Quarantine
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "quarantine.json")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """resilience 의 time.time 을 고정/이동할 수 있는 시계로 교체"""
+    now = [1_000_000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    return now
+
+
+def test_backoff_doubles_and_expires(path, clock):
+    q = Quarantine(path, base_ttl=3600, max_ttl=4 * 3600)
+    q.record_failure("yahoo_chart", "DEAD", "HTTP 404")
+    assert q.blocked("yahoo_chart", "DEAD")
+    assert not q.blocked("finviz_quote", "DEAD")  # endpoint 별
+
+    clock[0] += 3600
+    assert not q.blocked("yahoo_chart", "DEAD")  # 기간이 끝나면 한 번 다시 조회
+
+    # 다시 실패할 때마다 두 배, max_ttl 까지
+    for expected in [2, 4, 4]:
+        q.record_failure("yahoo_chart", "DEAD", "No timestamps")
+        (entry,) = q.snapshot()
+        assert entry["remaining"] == expected * 3600
+        assert entry["kind"] == "No timestamps"
+        clock[0] += entry["remaining"]
+    assert entry["failures"] == 4
+
+
+def test_success_releases(path, clock):
+    q = Quarantine(path)
+    q.record_failure("finviz_quote", "OLD", "snapshot 없음")
+    q.record_success("finviz_quote", "OLD")
+    assert not q.blocked("finviz_quote", "OLD")
+    assert q.snapshot() == []
+
+
+def test_persisted_across_instances(path, clock):
+    Quarantine(path).record_failure("finviz_statement", "ETF", "재무제표 없음")
+    other = Quarantine(path)
+    assert other.blocked("finviz_statement", "ETF")
+    assert other.quarantined(["ETF", "AAPL"]) == {"ETF"}
+
+
+def test_success_keeps_records_from_other_processes(path, clock):
+    a, b = Quarantine(path), Quarantine(path)
+    a.record_failure("yahoo_chart", "X", "HTTP 404")
+    assert b.blocked("yahoo_chart", "X")
+    a.record_failure("yahoo_chart", "Y", "HTTP 404")
+    # 파일 시스템 시각 해상도와 관계없이 b 가 변경을 알아차리도록 mtime 을 옮김
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    # b 는 Y 를 모르는 상태에서 X 를 해제해도 Y 기록이 남아야 함
+    b.record_success("yahoo_chart", "X")
+    assert Quarantine(path).quarantined() == {"Y"}
+
+
+def test_release_and_disabled(path, clock):
+    q = Quarantine(path)
+    q.record_failure("yahoo_chart", "A", "HTTP 404")
+    q.record_failure("finviz_quote", "A", "HTTP 404")
+    q.record_failure("yahoo_chart", "B", "HTTP 404")
+    assert q.release("A") == 2
+    assert q.quarantined() == {"B"}
+
+    off = Quarantine(None, enabled=False)
+    off.record_failure("yahoo_chart", "A", "HTTP 404")
+    assert not off.blocked("yahoo_chart", "A")
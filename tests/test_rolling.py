@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rolling import ROLLING_FIELDS, RollingStats
+
+
+@pytest.fixture
+def close():
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2025-01-01", periods=80, freq="B")
+    values = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (80, 3)), axis=0))
+    values[:5, 2] = np.nan  # 늦게 상장한 종목
+    return pd.DataFrame(values, index=index, columns=["A", "B", "C"])
+
+
+def assert_same(stats, close):
+    full = RollingStats(close, stats.window, stats.rsi_period)
+    for name in ROLLING_FIELDS:
+        np.testing.assert_allclose(stats.frame(name).to_numpy(), full.frame(name).to_numpy(),
+                                   rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=name)
+
+
+def test_append_matches_full(close):
+    stats = RollingStats(close.iloc[:60])
+    assert stats.update(close.iloc[:61]) == 1
+    assert stats.update(close.iloc[:70]) == 9
+    assert_same(stats, close.iloc[:70])
+
+
+def test_replace_last_bar(close):
+    stats = RollingStats(close.iloc[:60])
+    intraday = close.iloc[:60].copy()
+    intraday.iloc[-1] *= 1.01
+    # 마지막 봉만 교체 → 한 행만 다시 계산
+    assert stats.update(intraday) == 1
+    assert_same(stats, intraday)
+    assert stats.update(intraday) == 0
+
+
+def test_revised_history_recomputes(close):
+    stats = RollingStats(close.iloc[:60])
+    adjusted = close.iloc[:61].copy()
+    adjusted.iloc[:30] *= 0.5  # 분할/배당 수정으로 앞쪽 종가가 바뀐 재조회
+    assert stats.update(adjusted) == 61
+    assert_same(stats, adjusted)
+
+
+def test_changed_columns_recompute(close):
+    stats = RollingStats(close.iloc[:60, :2])
+    assert stats.update(close.iloc[:61]) == 61
+    assert_same(stats, close.iloc[:61])
@@ -0,0 +1,72 @@
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from trading_calendar import NYSE, TradingCalendar, nyse_holidays
+
+# NYSE 공시 휴장일
+NYSE_2024 = ["2024-01-01", "2024-01-15", "2024-02-19", "2024-03-29", "2024-05-27",
+             "2024-06-19", "2024-07-04", "2024-09-02", "2024-11-28", "2024-12-25"]
+NYSE_2025 = ["2025-01-01", "2025-01-20", "2025-02-17", "2025-04-18", "2025-05-26",
+             "2025-06-19", "2025-07-04", "2025-09-01", "2025-11-27", "2025-12-25"]
+
+
+def test_holidays_match_published_calendar():
+    assert sorted(map(str, nyse_holidays(2024))) == NYSE_2024
+    assert sorted(map(str, nyse_holidays(2025))) == NYSE_2025
+
+
+def test_session_counts():
+    # 2025 는 지미 카터 국장일(1/9) 임시 휴장 포함
+    assert len(NYSE.sessions("2024-01-01", "2024-12-31")) == 252
+    assert len(NYSE.sessions("2025-01-01", "2025-12-31")) == 250
+
+
+def test_observed_holiday_rules():
+    # 일요일 7/4 → 월요일 휴장, 토요일 1/1 은 전년 12/31 로 옮기지 않음
+    assert not NYSE.is_session("2021-07-05")
+    assert NYSE.is_session("2021-12-31")
+    # 1998 년 이전에는 MLK 데이 휴장 없음, Juneteenth 는 2022 년부터
+    assert NYSE.is_session("1997-01-20")
+    assert NYSE.is_session("2021-06-18")
+    assert not NYSE.is_session("2022-06-20")
+
+
+def test_special_closures():
+    for day in ["1994-04-27", "2001-09-11", "2012-10-29", "2012-10-30", "2018-12-05", "2025-01-09"]:
+        assert not NYSE.is_session(day), day
+    assert NYSE.previous_session("2012-10-30") == pd.Timestamp("2012-10-26")
+    assert NYSE.next_session("2012-10-29") == pd.Timestamp("2012-10-31")
+
+
+def test_needs_fetch():
+    after_close = datetime(2025, 1, 10, 17, 0, tzinfo=NYSE.tz)
+    before_close = datetime(2025, 1, 10, 11, 0, tzinfo=NYSE.tz)
+    # 주말만 남은 구간
+    assert not NYSE.needs_fetch("2025-01-11", "2025-01-12", now=after_close)
+    # 마지막 봉이 구간의 마지막 거래일이고 장이 끝났으면 다시 받지 않음
+    assert not NYSE.needs_fetch("2025-01-08", "2025-01-12", last_bar=date(2025, 1, 10), now=after_close)
+    # 장중에는 마지막 봉이 바뀔 수 있으므로 조회
+    assert NYSE.needs_fetch("2025-01-08", "2025-01-10", last_bar=date(2025, 1, 10), now=before_close)
+    # 미래 날짜는 오늘까지만 봄
+    assert not NYSE.needs_fetch("2025-01-11", "2025-01-31", now=after_close)
+
+
+def test_align():
+    index = pd.DatetimeIndex([
+        "2025-01-06 09:30", "2025-01-06 16:00",  # 같은 날 봉 두 개 → 마지막 값
+        "2025-01-08 00:00",                      # 1/7 봉 없음 → NaN 행
+        "2025-01-09 00:00",                      # 임시 휴장일의 봉 → 유지
+    ])
+    frame = pd.DataFrame({"A": [1.0, 2.0, 3.0, 4.0]}, index=index)
+    aligned = NYSE.align(frame)
+    assert list(aligned.index) == list(pd.DatetimeIndex(["2025-01-06", "2025-01-07", "2025-01-08", "2025-01-09"]))
+    assert aligned["A"].iloc[0] == 2.0
+    assert np.isnan(aligned["A"].iloc[1])
+    assert aligned["A"].iloc[3] == 4.0
+
+
+def test_custom_calendar():
+    calendar = TradingCalendar("TEST", [pd.Timestamp("2025-03-03")], first="2025-03-01", last="2025-03-10")
+    assert list(calendar.sessions("2025-03-01", "2025-03-09").strftime("%d")) == ["04", "05", "06", "07"]
@@ -0,0 +1,155 @@
+"""
+거래일 달력 (NYSE/Nasdaq, 미국 OTC)
+- 휴장일 규칙과 임시 휴장일로 거래일(session) 목록 생성
+- 종목별 가격 행렬을 거래일 인덱스로 한 번 정렬 (거래소마다 다른 봉 timestamp, 빠진 봉 → 같은 날짜 행의 NaN)
+- 조회 구간에 거래일이 없으면 HTTP 요청을 하지 않도록 판단 (주말/휴장일만 남은 구간, 이미 마감된 마지막 봉)
+OTC(NSRGY 등 ADR) 도 NYSE 휴장일을 따르므로 같은 달력 사용 (거래가 없는 날은 봉이 빠질 수 있음)
+"""
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+from dateutil.easter import easter
+
+# 정규 휴장일 외 임시 휴장 (국가 애도일, 재해)
+SPECIAL_CLOSURES = [
+    "1994-04-27",
+    "2001-09-11", "2001-09-12", "2001-09-13", "2001-09-14",
+    "2004-06-11", "2007-01-02", "2012-10-29", "2012-10-30",
+    "2018-12-05", "2025-01-09",
+]
+
+
+def _nearest_workday(day):
+    """토요일 → 금요일, 일요일 → 월요일"""
+    return day + timedelta(days={5: -1, 6: 1}.get(day.weekday(), 0))
+
+
+def _weekday_of_month(year, month, weekday, nth):
+    """nth 번째 요일 (nth=-1 이면 마지막)"""
+    if nth > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (nth - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def nyse_holidays(year):
+    """
+    NYSE 정규 휴장일
+    pandas.tseries.holiday 규칙과 같은 결과지만 연도별 직접 계산이 import 시간이 훨씬 짧음
+    """
+    days = [
+        _weekday_of_month(year, 2, 0, 3),    # Presidents' Day
+        easter(year) - timedelta(days=2),    # Good Friday
+        _weekday_of_month(year, 5, 0, -1),   # Memorial Day
+        _nearest_workday(date(year, 7, 4)),  # Independence Day
+        _weekday_of_month(year, 9, 0, 1),    # Labor Day
+        _weekday_of_month(year, 11, 3, 4),   # Thanksgiving
+        _nearest_workday(date(year, 12, 25)),
+    ]
+    # 토요일인 1월 1일은 전날(12/31)로 옮기지 않음
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        days.append(_nearest_workday(new_year))
+    if year >= 1998:
+        days.append(_weekday_of_month(year, 1, 0, 3))  # Martin Luther King Jr. Day
+    if year >= 2022:
+        days.append(_nearest_workday(date(year, 6, 19)))  # Juneteenth
+    return days
+
+
+def as_day(value):
+    """date / datetime / Timestamp / 'YYYY-MM-DD' → 자정 Timestamp"""
+    return pd.Timestamp(value).normalize()
+
+
+class TradingCalendar:
+    """
+    한 시장의 거래일 달력
+    sessions 는 자정(tz 없음) Timestamp 의 DatetimeIndex (가격 행렬의 날짜 인덱스와 같은 형식)
+    """
+
+    def __init__(self, name, holidays, tz="America/New_York", close=time(16, 0), first="1990-01-01", last="2041-01-01"):
+        self.name = name
+        self.tz = ZoneInfo(tz)
+        self.close = close
+        self.holidays = pd.DatetimeIndex(sorted(set(holidays)))
+        # pd.bdate_range(freq="C") 는 날짜를 하나씩 만들어 느리므로 numpy 영업일 계산 사용
+        days = np.arange(first, last, dtype="datetime64[D]")
+        days = days[np.is_busday(days, holidays=self.holidays.values.astype("datetime64[D]"))]
+        self.all_sessions = pd.DatetimeIndex(days.astype("datetime64[ns]"))
+
+    def sessions(self, start, end):
+        """start~end (양끝 포함) 거래일"""
+        return self.all_sessions[self.all_sessions.slice_indexer(as_day(start), as_day(end))]
+
+    def is_session(self, day):
+        return as_day(day) in self.all_sessions
+
+    def has_sessions(self, start, end):
+        return len(self.sessions(start, end)) > 0
+
+    def previous_session(self, day):
+        """day 이전(day 포함)의 마지막 거래일"""
+        position = self.all_sessions.searchsorted(as_day(day), side="right") - 1
+        return self.all_sessions[max(position, 0)]
+
+    def next_session(self, day):
+        """day 이후(day 포함)의 첫 거래일"""
+        position = self.all_sessions.searchsorted(as_day(day), side="left")
+        return self.all_sessions[min(position, len(self.all_sessions) - 1)]
+
+    def session_closed(self, day, now=None):
+        """day 의 장이 끝났는지 (마감 후 봉은 다시 조회해도 바뀌지 않음)"""
+        now = now or datetime.now(self.tz)
+        closes_at = datetime.combine(as_day(day).date(), self.close, tzinfo=self.tz)
+        return now >= closes_at
+
+    def today(self, now=None):
+        """시장 시간대 기준 오늘 (서버 시간대와 날짜가 다를 수 있음)"""
+        return (now or datetime.now(self.tz)).astimezone(self.tz).date()
+
+    def needs_fetch(self, start, end, last_bar=None, now=None):
+        """
+        start~end 구간을 조회해야 하는지
+        - 구간에 거래일이 없으면 False (주말/휴장일만 남은 구간)
+        - last_bar(이미 가진 마지막 봉 날짜) 가 구간의 마지막 거래일이고 장이 끝났으면 False
+        """
+        end = min(as_day(end), as_day(self.today(now)))
+        days = self.sessions(start, end)
+        if len(days) == 0:
+            return False
+        if last_bar is not None and as_day(last_bar) >= days[-1] and self.session_closed(days[-1], now):
+            return False
+        return True
+
+    def align(self, frame):
+        """
+        날짜 × 티커 행렬을 거래일 인덱스로 정렬
+        같은 날의 여러 행(봉 timestamp 차이)은 마지막 값으로 합치고, 빠진 거래일은 NaN 행
+        달력에 없는 날의 봉(임시 개장 등)은 버리지 않고 그대로 유지
+        """
+        if frame.empty:
+            return frame
+        frame = frame.groupby(frame.index.normalize()).last()
+        index = self.sessions(frame.index[0], frame.index[-1]).union(frame.index)
+        index.name = frame.index.name
+        return frame.reindex(index)
+
+
+NYSE = TradingCalendar(
+    "NYSE",
+    [pd.Timestamp(d) for year in range(1990, 2041) for d in nyse_holidays(year)]
+    + [pd.Timestamp(d) for d in SPECIAL_CLOSURES],
+)
+
+# 거래소별 달력 (Nasdaq / OTC 는 NYSE 와 휴장일이 같음)
+CALENDARS = {"NYSE": NYSE, "NASDAQ": NYSE, "OTC": NYSE}
+
+
+def calendar_for(ticker):
+    """티커의 거래일 달력 (현재 universe 는 미국 상장/OTC 종목만 있으므로 모두 NYSE 달력)"""
+    return NYSE
+
@@ -0,0 +1,236 @@
+"""
+종목별 조회 작업을 SQLite 작업 큐로 나누어 여러 워커 프로세스(여러 노드 가능)에서 처리
+- 작업 종류: prices (Yahoo 일봉), quote (Finviz snapshot), statements (Finviz 재무제표)
+- 워커는 lease 를 잡고 작업을 처리하며 결과를 공유 캐시(SHARED_CACHE_DB)에 기록
+- 같은 SHARED_CACHE_DB 로 실행한 대시보드/CLI 는 공유 캐시에 있는 결과를 네트워크 호출 없이 사용
+- 호스트별 초당 요청 수(--rate)는 큐 DB 를 공유하는 모든 워커의 합계 기준
+
+예)
+    # 작업 등록 (여러 universe 를 등록해도 같은 종목/기간은 한 번만 조회)
+    python worker.py enqueue --start 2025-10-09
+    python worker.py enqueue --universe big_universe.csv --start 2025-01-02
+    # 워커 8개로 큐가 빌 때까지 처리
+    python worker.py run --workers 8 --exit-when-empty
+    # 진행 상황 / 실패 목록
+    python worker.py status
+    # 대시보드에서 공유 캐시 사용
+    SHARED_CACHE_DB=.cache/shared.sqlite streamlit run app.py
+"""
+import argparse
+import multiprocessing
+import os
+import socket
+import sys
+import time
+from datetime import datetime
+
+from engine import FINVIZ_HOST, YAHOO_HOST, get_finviz_data, get_finviz_snapshot, get_stock_data, load_universe
+from httpcache import http_stats
+from jobqueue import QUEUE_DB, SHARED_CACHE_DB, JobQueue, SharedCache
+from resilience import CircuitOpenError, DeadlineExceeded, quarantine
+from risk import BENCHMARK
+
+# 작업 종류 → (호스트, 작업당 요청 수)
+JOB_KINDS = {
+    'prices': (YAHOO_HOST, 1),
+    'quote': (FINVIZ_HOST, 1),
+    'statements': (FINVIZ_HOST, 2),
+}
+
+# fetch_fundamentals 가 사용하는 재무제표 항목
+STATEMENT_ITEMS = [("BSQ", "Cash & Short Term Investments"), ("CFA", "Free Cash Flow")]
+
+# 작업 종류 → 격리(quarantine) 기록의 endpoint
+JOB_ENDPOINTS = {
+    'prices': "yahoo_chart",
+    'quote': "finviz_quote",
+    'statements': "finviz_statement",
+}
+
+# 기본 호스트별 초당 요청 수
+DEFAULT_RATES = {YAHOO_HOST: 5.0, FINVIZ_HOST: 2.0}
+
+
+def parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def parse_rate(value):
+    host, _, rate = value.partition("=")
+    return host, float(rate)
+
+
+def universe_jobs(portfolio_df, start_date, end_date, kinds):
+    """universe 의 종목별 작업 목록 (베타 계산용 벤치마크 포함)"""
+    tickers = list(dict.fromkeys(list(portfolio_df['티커']) + [BENCHMARK]))
+    jobs = []
+    for ticker in tickers:
+        for kind in kinds:
+            if ticker == BENCHMARK and kind != 'prices':
+                continue
+            args = [str(start_date), str(end_date)] if kind == 'prices' else []
+            jobs.append((kind, ticker, args))
+    return jobs
+
+
+def run_job(job):
+    """
+    작업 실행 → 실패 사유 (성공이면 None)
+    프로세스 메모리의 SWR 캐시를 거치지 않고 공유 캐시(shared_cache) → 실제 조회 순서로 호출
+    """
+    ticker = job['ticker']
+    if job['kind'] == 'prices':
+        start_date, end_date = job['args']
+        return None if get_stock_data.fn(ticker, start_date, end_date) is not None else "no price data"
+    if job['kind'] == 'quote':
+        return None if get_finviz_snapshot.fn(ticker) is not None else "no snapshot"
+    # 재무제표 항목이 없는 종목도 있으므로 값이 없어도 실패로 보지 않음
+    for statement, item in STATEMENT_ITEMS:
+        get_finviz_data.fn(ticker, statement, item)
+    return None
+
+
+def work(queue_path, cache_path, rates, lease, exit_when_empty, poll=2.0):
+    """워커 프로세스 본체: 큐가 빌 때까지(또는 계속) 작업을 하나씩 가져와 처리"""
+    os.environ["SHARED_CACHE_DB"] = cache_path
+    name = f"{socket.gethostname()}-{os.getpid()}"
+    queue = JobQueue(queue_path)
+    done = failed = skipped = 0
+    while True:
+        jobs = queue.claim(name, lease=lease)
+        if not jobs:
+            if exit_when_empty and queue.pending() == 0:
+                break
+            time.sleep(poll)
+            continue
+        for job in jobs:
+            # 데이터가 없는 종목으로 격리 중이면 요청/재시도 없이 종료
+            endpoint = JOB_ENDPOINTS[job['kind']]
+            if quarantine.blocked(endpoint, job['ticker']):
+                skipped += queue.skip(job, name, f"quarantined ({endpoint})")
+                continue
+            host, requests = JOB_KINDS[job['kind']]
+            queue.throttle(host, rates.get(host, 0), requests)
+            try:
+                error = run_job(job)
+            except (CircuitOpenError, DeadlineExceeded) as e:
+                # 이 워커의 회로가 열려 있음: 시도 횟수를 쓰지 않고 뒤로 미룸
+                queue.release(job, name, 60, f"{type(e).__name__}: {e}")
+                continue
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            if error is None:
+                done += queue.complete(job, name)
+            elif quarantine.blocked(endpoint, job['ticker']):
+                # 이번 조회에서 격리됨 (404/빈 결과): 재시도해도 같은 결과
+                skipped += queue.skip(job, name, f"{error}, quarantined ({endpoint})")
+            else:
+                queue.fail(job, name, error)
+                failed += 1
+    saved = sum(s['saved_bytes'] for s in http_stats().values())
+    print(f"[{name}] 완료 {done}, 실패 {failed}, 건너뜀 {skipped}, HTTP 절약 {saved / 1024:.0f} KB")
+
+
+def cmd_enqueue(args):
+    kinds = args.kinds.split(",")
+    unknown = [k for k in kinds if k not in JOB_KINDS]
+    if unknown:
+        sys.exit(f"알 수 없는 작업 종류: {', '.join(unknown)}")
+    portfolio_df = load_universe(args.universe)
+    jobs = universe_jobs(portfolio_df, args.start, args.end, kinds)
+    added = JobQueue(args.queue).enqueue(jobs, max_attempts=args.max_attempts, refresh_after=args.refresh_after)
+    print(f"작업 {len(jobs)}개 중 {added}개 등록 (나머지는 대기/처리 중이거나 최근 완료)")
+
+
+def cmd_run(args):
+    rates = dict(DEFAULT_RATES)
+    rates.update(dict(args.rate or []))
+    print(f"워커 {args.workers}개 시작 (초당 요청 한도: {rates})")
+    started = time.monotonic()
+    # 워커는 각자 네트워크/파싱을 하므로 스레드 대신 프로세스 (spawn: 부모 상태를 복사하지 않음)
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=work, args=(args.queue, args.cache, rates, args.lease, args.exit_when_empty))
+        for _ in range(args.workers)
+    ]
+    for p in processes:
+        p.start()
+    try:
+        for p in processes:
+            p.join()
+    except KeyboardInterrupt:
+        # 처리 중이던 작업은 lease 가 끝나면 다른 워커가 다시 가져감
+        for p in processes:
+            p.terminate()
+    print(f"종료 ({time.monotonic() - started:.1f}초)")
+    print_status(JobQueue(args.queue))
+
+
+def print_status(queue):
+    statuses = ['queued', 'leased', 'done', 'failed', 'skipped']
+    print(f"{'작업':<12}" + "".join(f"{s:>10}" for s in statuses))
+    for kind, counts in sorted(queue.stats().items()):
+        print(f"{kind:<12}" + "".join(f"{counts.get(s, 0):>10}" for s in statuses))
+
+
+def cmd_status(args):
+    queue = JobQueue(args.queue)
+    print_status(queue)
+    failures = queue.failures()
+    if failures:
+        print("\n최근 실패:")
+        for f in failures:
+            print(f"  {f['kind']:<12}{f['ticker']:<8}시도 {f['attempts']}회  {f['error']}")
+    if os.path.exists(args.cache):
+        print(f"\n공유 캐시 ({args.cache}): {SharedCache(args.cache).count()}")
+
+
+def cmd_purge(args):
+    max_age = args.days * 86400
+    removed = JobQueue(args.queue).purge(max_age)
+    print(f"완료/실패 작업 {removed}개 삭제")
+    if os.path.exists(args.cache):
+        print(f"공유 캐시 항목 {SharedCache(args.cache).purge(max_age)}개 삭제")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="종목별 조회 작업 큐 / 워커")
+    parser.add_argument("--queue", default=QUEUE_DB, help="작업 큐 SQLite 파일")
+    parser.add_argument("--cache", default=os.environ.get("SHARED_CACHE_DB", SHARED_CACHE_DB),
+                        help="공유 캐시 SQLite 파일 (대시보드의 SHARED_CACHE_DB 와 같게)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = commands.add_parser("enqueue", help="universe 의 종목별 작업 등록")
+    enqueue.add_argument("--universe", help="종목 구성 CSV (팀,자산,섹터,기업명,티커). 없으면 기본 포트폴리오")
+    enqueue.add_argument("--start", type=parse_date, required=True, help="시작일 (YYYY-MM-DD)")
+    enqueue.add_argument("--end", type=parse_date, default=datetime.now().date(), help="종료일 (기본: 오늘)")
+    enqueue.add_argument("--kinds", default=",".join(JOB_KINDS), help="작업 종류 (쉼표 구분)")
+    enqueue.add_argument("--max-attempts", type=int, default=5)
+    enqueue.add_argument("--refresh-after", type=float, default=3600,
+                         help="완료 후 이 시간(초)이 지난 작업만 다시 등록")
+    enqueue.set_defaults(handler=cmd_enqueue)
+
+    run = commands.add_parser("run", help="워커 프로세스 실행")
+    run.add_argument("--workers", type=int, default=4)
+    run.add_argument("--lease", type=float, default=120, help="작업 lease 시간(초)")
+    run.add_argument("--rate", type=parse_rate, action="append", metavar="HOST=N",
+                     help="호스트별 초당 요청 수 (예: finviz.com=1.5, 0 = 제한 없음)")
+    run.add_argument("--exit-when-empty", action="store_true", help="큐가 비면 종료")
+    run.set_defaults(handler=cmd_run)
+
+    status = commands.add_parser("status", help="작업 상태")
+    status.set_defaults(handler=cmd_status)
+
+    purge = commands.add_parser("purge", help="오래된 완료 작업/공유 캐시 항목 삭제")
+    purge.add_argument("--days", type=float, default=30)
+    purge.set_defaults(handler=cmd_purge)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()